@@ -6,7 +6,8 @@ a = Analysis(
     pathex=[],
     binaries=[],
     datas=[],
-    hiddenimports=[],
+    # matplotlib y scipy se importan dentro de funciones (carga diferida)
+    hiddenimports=['matplotlib.backends.backend_tkagg', 'scipy.interpolate'],
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
@@ -0,0 +1,168 @@
+"""
+Módulo de Adquisición
+Punto de entrada sin interfaz gráfica: lee los puertos seriales y guarda los datos.
+
+Solo importa la lógica y el almacenamiento (nunca customtkinter, matplotlib
+ni scipy), por lo que sirve para pasarelas desatendidas:
+
+    python adquisicion.py --puerto /dev/ttyUSB0 --salida datos.csv
+"""
+
+import time
+
+# Referencia para el tiempo de arranque (antes de importar numpy y la lógica)
+INICIO_PROCESO = time.perf_counter()
+
+import argparse
+import signal
+import threading
+from datetime import datetime
+from estilos import ARCHIVO_CSV, ConfigAdquisicion, ConfigSerial
+from almacenamiento import ruta_por_dispositivo
+from logica import ControladorSistema
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def memoria_maxima_mb():
+    """Memoria residente máxima del proceso en MB (None si no se puede medir)."""
+    if resource is None:
+        return None
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+class AdquisicionSinInterfaz:
+    """Conecta los puertos, drena las colas y vuelca el almacenamiento al detenerse."""
+
+    def __init__(self, puertos, salida=ARCHIVO_CSV, protocolo=ConfigSerial.PROTOCOLO,
+                 reintento=ConfigAdquisicion.REINTENTO):
+        self.puertos = list(puertos)
+        self.salida = salida
+        self.protocolo = protocolo
+        self.reintento = reintento
+        self.controlador = ControladorSistema()
+        self._detener = threading.Event()
+        self._ultimo_intento = {}
+        self.muestras_procesadas = 0
+
+    def iniciar(self):
+        """Registra un dispositivo por puerto (sin precarga de historial) y los conecta."""
+        self.controlador.inicializar()
+        self.controlador.registrar_callback_comunicacion(
+            'on_connection_success', lambda puerto: self.informar(f"Conectado a {puerto}"))
+        self.controlador.registrar_callback_comunicacion('on_connection_error', self.informar)
+        self.controlador.registrar_callback_comunicacion(
+            'on_disconnect', lambda: self.informar("Puerto desconectado"))
+        for i, puerto in enumerate(self.puertos):
+            archivo = self.salida if i == 0 else ruta_por_dispositivo(self.salida, puerto)
+            dispositivo = self.controlador.agregar_dispositivo(puerto, archivo, precargar=False)
+            dispositivo.comunicacion.protocolo = self.protocolo
+            self._conectar(puerto)
+
+    def detener(self, *argumentos):
+        """Pide la detención ordenada (seguro desde un manejador de señales)."""
+        self._detener.set()
+
+    def ejecutar(self, duracion=None, intervalo_estado=ConfigAdquisicion.INTERVALO_ESTADO):
+        """Drena las colas hasta recibir una señal o cumplir `duracion` segundos."""
+        inicio = time.monotonic()
+        proximo_estado = inicio + intervalo_estado if intervalo_estado else None
+
+        while not self._detener.wait(ConfigAdquisicion.INTERVALO_BOMBEO):
+            self._drenar()
+            ahora = time.monotonic()
+
+            if self.reintento:
+                for puerto, dispositivo in self.controlador.dispositivos.items():
+                    if not dispositivo.conectando and not dispositivo.comunicacion.is_running:
+                        self._reconectar(puerto, ahora)
+
+            if proximo_estado is not None and ahora >= proximo_estado:
+                self.informar(self.estado())
+                proximo_estado += intervalo_estado
+
+            if duracion is not None and ahora - inicio >= duracion:
+                break
+
+    def cerrar(self):
+        """Drena lo pendiente, desconecta y vuelca los escritores a disco."""
+        self._drenar()
+        self.controlador.cerrar()
+        self.informar(self.estado())
+
+    def estado(self):
+        """Línea de estado: tasa, muestras, filas escritas, descartes y memoria."""
+        tasa = self.controlador.obtener_latencias()['muestras_por_segundo']
+        partes = [f"{tasa:.1f} muestras/s", f"{self.muestras_procesadas} procesadas"]
+        for puerto, dispositivo in self.controlador.dispositivos.items():
+            escritor = dispositivo.gestor_datos.obtener_estadisticas_csv()
+            conexion = "conectado" if dispositivo.comunicacion.is_running else "desconectado"
+            partes.append(f"{puerto}: {conexion}, {escritor['filas_escritas']} filas, "
+                          f"{dispositivo.muestras_descartadas} descartadas")
+        memoria = memoria_maxima_mb()
+        if memoria is not None:
+            partes.append(f"{memoria:.0f} MB")
+        return " | ".join(partes)
+
+    def _drenar(self):
+        """Vacía las colas de los dispositivos (estadísticas, tasa y latencias al día)."""
+        while True:
+            procesadas = self.controlador.procesar_pendientes()
+            self.muestras_procesadas += procesadas
+            if not procesadas:
+                break
+
+    def _conectar(self, puerto):
+        self._ultimo_intento[puerto] = time.monotonic()
+        exito, mensaje = self.controlador.conectar_esp32(puerto)
+        self.informar(mensaje)
+        return exito
+
+    def _reconectar(self, puerto, ahora):
+        """Reintenta un puerto caído como máximo una vez cada `reintento` segundos."""
+        if ahora - self._ultimo_intento.get(puerto, 0.0) < self.reintento:
+            return
+        comunicacion = self.controlador.dispositivos[puerto].comunicacion
+        if comunicacion.serial_port is not None:
+            comunicacion.desconectar()
+        self._conectar(puerto)
+
+    def informar(self, mensaje):
+        """Imprime un mensaje con fecha y hora (salida sin búfer para servicios)."""
+        print(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {mensaje}", flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Adquisición de sensores ESP32 sin interfaz gráfica")
+    parser.add_argument('--puerto', action='append', required=True,
+                        help="Puerto serial (se puede repetir o separar con comas)")
+    parser.add_argument('--salida', default=ARCHIVO_CSV,
+                        help="CSV del primer puerto; los demás agregan su nombre como sufijo")
+    parser.add_argument('--protocolo', choices=('auto', 'ascii', 'binario'), default=ConfigSerial.PROTOCOLO)
+    parser.add_argument('--duracion', type=float, help="Segundos de adquisición (por defecto sin límite)")
+    parser.add_argument('--estado', type=float, default=ConfigAdquisicion.INTERVALO_ESTADO,
+                        help="Segundos entre líneas de estado (0: solo al terminar)")
+    parser.add_argument('--reintento', type=float, default=ConfigAdquisicion.REINTENTO,
+                        help="Segundos entre reintentos de un puerto caído (0: no reintentar)")
+    argumentos = parser.parse_args()
+
+    puertos = [p.strip() for valor in argumentos.puerto for p in valor.split(',') if p.strip()]
+    adquisicion = AdquisicionSinInterfaz(puertos, argumentos.salida, argumentos.protocolo, argumentos.reintento)
+
+    # Cierre ordenado: la señal solo marca la detención; el volcado ocurre en el hilo principal
+    for nombre in ('SIGINT', 'SIGTERM', 'SIGHUP'):
+        if hasattr(signal, nombre):
+            signal.signal(getattr(signal, nombre), adquisicion.detener)
+
+    memoria = memoria_maxima_mb()
+    adquisicion.informar(f"Iniciado en {time.perf_counter() - INICIO_PROCESO:.2f} s"
+                         + (f", {memoria:.0f} MB" if memoria is not None else ""))
+    adquisicion.iniciar()
+    try:
+        adquisicion.ejecutar(argumentos.duracion, argumentos.estado)
+    finally:
+        adquisicion.cerrar()
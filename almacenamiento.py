@@ -0,0 +1,858 @@
+"""
+Módulo de Almacenamiento
+Persistencia de los datos de sensores fuera del hilo de adquisición.
+
+Formatos:
+    CSV      Fecha,Hora,Temperatura_C,... (legible, usado también como exportación).
+             El archivo activo rota por día o por tamaño; los segmentos cerrados
+             se renombran con su fecha de inicio, se comprimen con gzip en
+             segundo plano y se registran en un índice JSON con su rango.
+             Cada segmento tiene además un índice disperso <segmento>.idx
+             (registros DTYPE_INDICE_DISPERSO) con el desplazamiento en bytes
+             de la primera fila de cada minuto, mantenido al anexar.
+    Binario  segmentos .bin con un encabezado de TAM_ENCABEZADO bytes
+             (MAGIA_REGISTRO + longitud u16 + esquema JSON) seguido de registros
+             de ancho fijo DTYPE_REGISTRO, legibles con np.memmap.
+"""
+
+import csv
+import gzip
+import json
+import mmap
+import os
+import queue
+import re
+import shutil
+import struct
+import threading
+import time
+from datetime import datetime, timedelta
+import numpy as np
+from estilos import ENCABEZADOS_CSV, ConfigAlmacenamiento
+from protocolo import CAMPOS_MUESTRA, muestras_vacias
+
+
+MAGIA_REGISTRO = b'ESP32REG'
+TAM_ENCABEZADO = 256
+EXTENSION_SEGMENTO = '.bin'
+
+# Índice disperso de un CSV: inicio de cada minuto -> desplazamiento en bytes
+DTYPE_INDICE_DISPERSO = np.dtype([('marca', '<f8'), ('desplazamiento', '<i8')])
+ANCHO_CUBETA = 16   # 'AAAA-MM-DD,HH:MM' identifica el minuto de una fila
+
+# Registro binario: marca de tiempo + 4 canales (24 bytes por muestra)
+DTYPE_REGISTRO = np.dtype([
+    ('marca', '<f8'),
+    ('temperatura', '<f4'),
+    ('humedad_amb', '<f4'),
+    ('humedad_suelo', '<f4'),
+    ('potenciometro', '<f4'),
+])
+
+
+def ruta_por_dispositivo(ruta, nombre):
+    """Deriva un archivo por dispositivo: datos.csv + COM4 -> datos_COM4.csv."""
+    base, extension = os.path.splitext(ruta)
+    sufijo = re.sub(r'[^A-Za-z0-9_-]+', '_', nombre).strip('_')
+    return f"{base}_{sufijo}{extension}"
+
+
+def directorio_registro(ruta_csv):
+    """Directorio del registro binario asociado a un CSV: datos.csv -> datos_registro."""
+    return f"{os.path.splitext(ruta_csv)[0]}_registro"
+
+
+def ruta_indice(ruta_csv):
+    """Índice de segmentos asociado a un CSV: datos.csv -> datos_indice.json."""
+    return f"{os.path.splitext(ruta_csv)[0]}_indice.json"
+
+
+def ruta_indice_disperso(ruta_csv):
+    """Índice disperso de un segmento CSV (comprimido o no): datos.csv -> datos.csv.idx."""
+    if ruta_csv.endswith('.gz'):
+        ruta_csv = ruta_csv[:-3]
+    return f"{ruta_csv}.idx"
+
+
+def leer_indice_disperso(ruta_csv):
+    """Retorna el índice disperso de un segmento CSV, o None si no existe."""
+    try:
+        return np.fromfile(ruta_indice_disperso(ruta_csv), dtype=DTYPE_INDICE_DISPERSO)
+    except FileNotFoundError:
+        return None
+
+
+def construir_indice_disperso(ruta_csv, tam_bloque=ConfigAlmacenamiento.BLOQUE_INDICE):
+    """
+    Genera el índice disperso de un CSV sin comprimir recorriéndolo una vez
+    (archivos escritos antes de que existiera el índice). El archivo se
+    mapea en memoria y se procesa por bloques de líneas completas de unos
+    `tam_bloque` bytes, sin cargarlo entero.
+    """
+    partes = []
+    ultima_clave = None
+    with open(ruta_csv, 'rb') as archivo:
+        tamano = os.fstat(archivo.fileno()).st_size
+        if tamano:
+            with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+                inicio = 0
+                while inicio < tamano:
+                    fin = min(inicio + tam_bloque, tamano)
+                    if fin < tamano:
+                        # Cortar tras el último salto de línea (o el siguiente si la línea es más larga)
+                        corte = mapa.rfind(b'\n', inicio, fin)
+                        if corte < 0:
+                            corte = mapa.find(b'\n', fin)
+                        fin = tamano if corte < 0 else corte + 1
+                    indice, ultima_clave = _indice_bloque(mapa[inicio:fin], inicio, ultima_clave)
+                    partes.append(indice)
+                    inicio = fin
+    
+    indice = np.concatenate(partes) if partes else np.empty(0, dtype=DTYPE_INDICE_DISPERSO)
+    indice.tofile(ruta_indice_disperso(ruta_csv))
+    return indice
+
+
+def _indice_bloque(bloque, desplazamiento, ultima_clave):
+    """
+    Entradas del índice disperso de un bloque de líneas que empieza en el
+    byte `desplazamiento`. `ultima_clave` es el minuto de la última fila del
+    bloque anterior; retorna (entradas, minuto de la última fila).
+    """
+    datos = np.frombuffer(bloque, dtype=np.uint8)
+    finales = np.flatnonzero(datos == ord('\n'))
+    if not len(finales):
+        return np.empty(0, dtype=DTYPE_INDICE_DISPERSO), ultima_clave
+    inicios = np.concatenate(([0], finales[:-1] + 1))
+    inicios = inicios[finales - inicios > ANCHO_CUBETA]
+    inicios = inicios[(datos[inicios + 4] == ord('-')) & (datos[inicios + 13] == ord(':'))]
+    if not len(inicios):
+        return np.empty(0, dtype=DTYPE_INDICE_DISPERSO), ultima_clave
+    
+    # Primera fila de cada minuto: donde cambia el prefijo 'AAAA-MM-DD,HH:MM'
+    claves = np.ascontiguousarray(datos[inicios[:, None] + np.arange(ANCHO_CUBETA)])
+    claves = claves.view(f'S{ANCHO_CUBETA}').ravel()
+    cambios = np.flatnonzero(np.concatenate(([claves[0] != ultima_clave], claves[1:] != claves[:-1])))
+    
+    indice = np.empty(len(cambios), dtype=DTYPE_INDICE_DISPERSO)
+    for i, fila in enumerate(cambios):
+        clave = claves[fila].decode('ascii')
+        indice[i] = (marca_fila(clave[:10], clave[11:] + ':00'), desplazamiento + inicios[fila])
+    return indice, claves[-1]
+
+
+def abrir_csv(ruta):
+    """Abre un CSV de datos en modo texto, esté comprimido (.gz) o no."""
+    if ruta.endswith('.gz'):
+        return gzip.open(ruta, 'rt', newline='')
+    return open(ruta, 'r', newline='')
+
+
+def marca_fila(fecha, hora):
+    """Marca de tiempo de una fila CSV a partir de sus columnas Fecha y Hora."""
+    return datetime.strptime(f"{fecha} {hora}", '%Y-%m-%d %H:%M:%S').timestamp()
+
+
+def _inicio_dia_siguiente(marca):
+    """Marca de la medianoche posterior a `marca` (hora local)."""
+    dia = datetime.fromtimestamp(marca).date() + timedelta(days=1)
+    return datetime.combine(dia, datetime.min.time()).timestamp()
+
+
+def muestras_a_registros(muestras):
+    """Convierte un arreglo DTYPE_MUESTRA en registros DTYPE_REGISTRO."""
+    registros = np.empty(len(muestras), dtype=DTYPE_REGISTRO)
+    registros['marca'] = muestras['t_recv']
+    for campo in DTYPE_REGISTRO.names[1:]:
+        registros[campo] = muestras[campo]
+    return registros
+
+
+def registros_a_muestras(registros):
+    """Convierte registros DTYPE_REGISTRO en un arreglo DTYPE_MUESTRA."""
+    muestras = muestras_vacias(len(registros))
+    muestras['t_recv'] = registros['marca']
+    for campo in DTYPE_REGISTRO.names[1:]:
+        muestras[campo] = registros[campo]
+    return muestras
+
+
+def codificar_encabezado(dtype=DTYPE_REGISTRO):
+    """Construye el encabezado de un segmento con el esquema de sus registros."""
+    esquema = json.dumps({
+        'version': 1,
+        'campos': [[nombre, dtype[nombre].str] for nombre in dtype.names]
+    }).encode()
+    encabezado = MAGIA_REGISTRO + struct.pack('<H', len(esquema)) + esquema
+    if len(encabezado) > TAM_ENCABEZADO:
+        raise ValueError("El esquema no cabe en el encabezado")
+    return encabezado.ljust(TAM_ENCABEZADO, b'\0')
+
+
+def leer_encabezado(ruta):
+    """Lee el esquema de un segmento y retorna su dtype."""
+    with open(ruta, 'rb') as archivo:
+        encabezado = archivo.read(TAM_ENCABEZADO)
+    if len(encabezado) < TAM_ENCABEZADO or not encabezado.startswith(MAGIA_REGISTRO):
+        raise ValueError(f"{ruta} no es un segmento de registro válido")
+    inicio = len(MAGIA_REGISTRO)
+    (longitud,) = struct.unpack_from('<H', encabezado, inicio)
+    esquema = json.loads(encabezado[inicio + 2:inicio + 2 + longitud])
+    return np.dtype([tuple(campo) for campo in esquema['campos']])
+
+
+def abrir_segmento(ruta):
+    """
+    Abre un segmento como np.memmap de solo lectura (sin copiar).
+    
+    Un registro incompleto al final (escritura interrumpida) se ignora.
+    """
+    dtype = leer_encabezado(ruta)
+    cantidad = (os.path.getsize(ruta) - TAM_ENCABEZADO) // dtype.itemsize
+    if cantidad <= 0:
+        return np.empty(0, dtype=dtype)
+    return np.memmap(ruta, dtype=dtype, mode='r', offset=TAM_ENCABEZADO, shape=(cantidad,))
+
+
+def segmentos_registro(directorio):
+    """Rutas de los segmentos de un registro binario en orden temporal."""
+    return sorted(
+        os.path.join(directorio, nombre) for nombre in os.listdir(directorio)
+        if nombre.endswith(EXTENSION_SEGMENTO)
+    )
+
+
+def inicio_segmento(ruta):
+    """Marca del primer registro de un segmento binario (según su nombre)."""
+    nombre = os.path.basename(ruta)[:-len(EXTENSION_SEGMENTO)]
+    return datetime.strptime(nombre, '%Y%m%d_%H%M%S_%f').timestamp()
+
+
+def leer_registro(directorio, desde=None, hasta=None):
+    """
+    Retorna los registros con marca en [desde, hasta) como una lista de
+    vistas np.memmap, una por segmento (sin copiar ni parsear).
+    """
+    rutas = segmentos_registro(directorio)
+    resultado = []
+    for i, ruta in enumerate(rutas):
+        # El segmento siguiente empieza antes de `desde`: este no aporta
+        if desde is not None and i + 1 < len(rutas) and inicio_segmento(rutas[i + 1]) <= desde:
+            continue
+        registros = abrir_segmento(ruta)
+        if not len(registros):
+            continue
+        if hasta is not None and registros['marca'][0] >= hasta:
+            break
+        marcas = registros['marca']
+        inicio = 0 if desde is None else np.searchsorted(marcas, desde, 'left')
+        fin = len(registros) if hasta is None else np.searchsorted(marcas, hasta, 'left')
+        if fin > inicio:
+            resultado.append(registros[inicio:fin])
+    return resultado
+
+
+def segmentos_csv(ruta, desde=None, hasta=None):
+    """
+    Rutas de los CSV (segmentos rotados según el índice y el archivo activo)
+    que pueden contener filas en [desde, hasta), en orden temporal.
+    """
+    rutas = []
+    if os.path.exists(ruta_indice(ruta)):
+        rutas = IndiceSegmentos(ruta_indice(ruta)).en_rango(desde, hasta)
+    if os.path.exists(ruta):
+        rutas.append(ruta)
+    return rutas
+
+
+class IndiceSegmentos:
+    """
+    Índice JSON de los segmentos cerrados de un registro con su rango de tiempo.
+    
+    Cada entrada guarda el nombre del archivo (relativo al índice), las marcas
+    de su primera y última fila, su tamaño y si ya fue comprimido.
+    """
+    
+    def __init__(self, ruta):
+        self.ruta = ruta
+        self.directorio = os.path.dirname(os.path.abspath(ruta))
+        self._lock = threading.Lock()
+        self.entradas = self._cargar()
+    
+    def agregar(self, archivo, desde, hasta):
+        """Registra un segmento recién cerrado."""
+        with self._lock:
+            self.entradas.append({
+                'archivo': os.path.basename(archivo),
+                'desde': desde,
+                'hasta': hasta,
+                'bytes': os.path.getsize(archivo),
+                'comprimido': archivo.endswith('.gz')
+            })
+            self.entradas.sort(key=lambda entrada: entrada['desde'])
+            self._guardar()
+    
+    def marcar_comprimido(self, archivo, archivo_comprimido):
+        """Reemplaza un segmento por su versión comprimida en el índice."""
+        nombre = os.path.basename(archivo)
+        with self._lock:
+            for entrada in self.entradas:
+                if entrada['archivo'] == nombre:
+                    entrada['archivo'] = os.path.basename(archivo_comprimido)
+                    entrada['bytes'] = os.path.getsize(archivo_comprimido)
+                    entrada['comprimido'] = True
+            self._guardar()
+    
+    def en_rango(self, desde=None, hasta=None):
+        """Retorna las rutas de los segmentos que se solapan con [desde, hasta)."""
+        with self._lock:
+            return [
+                self.ruta_de(entrada) for entrada in self.entradas
+                if (desde is None or entrada['hasta'] >= desde)
+                and (hasta is None or entrada['desde'] < hasta)
+            ]
+    
+    def sin_comprimir(self):
+        """Rutas de los segmentos cerrados que aún no se comprimieron."""
+        with self._lock:
+            return [self.ruta_de(e) for e in self.entradas if not e['comprimido']]
+    
+    def eliminar_anteriores(self, limite):
+        """Borra los segmentos cuya última fila es anterior a `limite`."""
+        with self._lock:
+            conservar = []
+            eliminados = 0
+            for entrada in self.entradas:
+                if entrada['hasta'] >= limite:
+                    conservar.append(entrada)
+                    continue
+                for ruta in (self.ruta_de(entrada), ruta_indice_disperso(self.ruta_de(entrada))):
+                    try:
+                        os.remove(ruta)
+                    except FileNotFoundError:
+                        pass
+                eliminados += 1
+            self.entradas = conservar
+            self._guardar()
+        return eliminados
+    
+    def ruta_de(self, entrada):
+        return os.path.join(self.directorio, entrada['archivo'])
+    
+    def _cargar(self):
+        try:
+            with open(self.ruta, 'r') as archivo:
+                return json.load(archivo)['segmentos']
+        except (FileNotFoundError, ValueError, KeyError):
+            return []
+    
+    def _guardar(self):
+        """Escribe el índice de forma atómica (archivo temporal + reemplazo)."""
+        temporal = f"{self.ruta}.tmp"
+        with open(temporal, 'w') as archivo:
+            json.dump({'version': 1, 'segmentos': self.entradas}, archivo, indent=1)
+        os.replace(temporal, self.ruta)
+
+
+class FormatoCSV:
+    """Convierte muestras en filas CSV con la fecha y hora en caché por segundo."""
+    
+    def __init__(self):
+        self._ultimo_segundo = None
+        self._fecha = ''
+        self._hora = ''
+    
+    def fila(self, marca, temp, hum_amb, hum_suelo, pot):
+        """Retorna la fila CSV de una muestra."""
+        segundo = int(marca)
+        if segundo != self._ultimo_segundo:
+            instante = datetime.fromtimestamp(segundo)
+            self._fecha = instante.strftime('%Y-%m-%d')
+            self._hora = instante.strftime('%H:%M:%S')
+            self._ultimo_segundo = segundo
+        return [
+            self._fecha,
+            self._hora,
+            f"{temp:.2f}",
+            f"{hum_amb:.2f}",
+            f"{hum_suelo:.2f}",
+            int(pot)
+        ]
+
+
+class _EscritorSegundoPlano:
+    """
+    Base de los escritores: cola sin bloqueo, hilo dedicado y volcado
+    por cantidad de filas o por tiempo.
+    
+    Las subclases implementan _abrir, _convertir, _escribir y _cerrar_archivo.
+    """
+    
+    _FIN = object()
+    
+    def __init__(self, filas_por_lote, intervalo_flush):
+        self.filas_por_lote = filas_por_lote
+        self.intervalo_flush = intervalo_flush
+        
+        self._cola = queue.SimpleQueue()
+        self._cerrado = False
+        
+        # Estadísticas
+        self.filas_escritas = 0
+        self.volcados = 0
+        self.errores = 0
+        self.filas_descartadas = 0
+        self.ultimo_error = None
+        self.latencia_ultimo_volcado = 0.0
+        self.latencia_max_volcado = 0.0
+        
+        self._hilo = threading.Thread(target=self._ejecutar, daemon=True)
+        self._hilo.start()
+    
+    def escribir_lote(self, muestras):
+        """Encola un arreglo DTYPE_MUESTRA completo como un solo elemento."""
+        if not self._cerrado and len(muestras):
+            self._cola.put(muestras)
+    
+    def cerrar(self, timeout=5.0):
+        """Vuelca las filas pendientes, cierra el archivo y detiene el hilo."""
+        if self._cerrado:
+            return
+        self._cerrado = True
+        self._cola.put(self._FIN)
+        self._hilo.join(timeout)
+    
+    def obtener_estadisticas(self):
+        """Retorna las estadísticas del escritor."""
+        return {
+            'filas_escritas': self.filas_escritas,
+            'volcados': self.volcados,
+            'errores': self.errores,
+            'filas_descartadas': self.filas_descartadas,
+            'ultimo_error': self.ultimo_error,
+            'latencia_ultimo_volcado_ms': self.latencia_ultimo_volcado * 1000,
+            'latencia_max_volcado_ms': self.latencia_max_volcado * 1000,
+            'profundidad_cola': self._cola.qsize()
+        }
+    
+    def _volcar(self, pendientes, cantidad):
+        """Escribe un lote y lo envía al sistema operativo."""
+        if not pendientes:
+            return
+        inicio = time.perf_counter()
+        try:
+            self._escribir(pendientes)
+            self.filas_escritas += cantidad
+            self.volcados += 1
+        except Exception as e:
+            # Cualquier fallo se cuenta y el hilo sigue atendiendo la cola
+            self._registrar_error(e, cantidad)
+        latencia = time.perf_counter() - inicio
+        self.latencia_ultimo_volcado = latencia
+        self.latencia_max_volcado = max(self.latencia_max_volcado, latencia)
+    
+    def _registrar_error(self, error, filas, accion="escribiendo"):
+        """Cuenta y muestra un lote perdido sin detener el hilo escritor."""
+        self.errores += 1
+        self.filas_descartadas += filas
+        self.ultimo_error = f"{type(error).__name__}: {error}"
+        print(f"Error {accion} {self.ruta}: {self.ultimo_error}")
+    
+    @staticmethod
+    def _filas(elemento):
+        """Filas de un elemento de la cola (arreglo DTYPE_MUESTRA o muestra suelta)."""
+        return len(elemento) if isinstance(elemento, np.ndarray) else 1
+    
+    def _ejecutar(self):
+        """Hilo escritor: acumula filas y las vuelca por tamaño o por tiempo."""
+        try:
+            self._abrir()
+        except Exception as e:
+            # Sin archivo no hay dónde volcar: dejar de aceptar filas para que la cola no crezca
+            self._cerrado = True
+            self._registrar_error(e, 0, "abriendo")
+            self._descartar_cola()
+            return
+        
+        pendientes = []
+        cantidad = 0
+        ultimo_volcado = time.monotonic()
+        terminar = False
+        
+        while not terminar:
+            espera = self.intervalo_flush
+            if pendientes:
+                espera = max(0.0, ultimo_volcado + self.intervalo_flush - time.monotonic())
+            try:
+                elemento = self._cola.get(timeout=espera)
+                # Drenar lo que ya esté en cola sin volver a esperar
+                while elemento is not self._FIN:
+                    try:
+                        elementos, n = self._convertir(elemento)
+                        pendientes.extend(elementos)
+                        cantidad += n
+                    except Exception as e:
+                        self._registrar_error(e, self._filas(elemento))
+                    if cantidad >= self.filas_por_lote:
+                        break
+                    elemento = self._cola.get_nowait()
+                terminar = elemento is self._FIN
+            except queue.Empty:
+                pass
+            
+            ahora = time.monotonic()
+            if (terminar or cantidad >= self.filas_por_lote
+                    or ahora - ultimo_volcado >= self.intervalo_flush):
+                self._volcar(pendientes, cantidad)
+                pendientes = []
+                cantidad = 0
+                ultimo_volcado = ahora
+        
+        self._cerrar_archivo()
+    
+    def _descartar_cola(self):
+        """Vacía la cola contando como descartadas las filas que quedaban."""
+        while True:
+            try:
+                elemento = self._cola.get_nowait()
+            except queue.Empty:
+                return
+            if elemento is not self._FIN:
+                self.filas_descartadas += self._filas(elemento)
+
+
+class EscritorCSV(_EscritorSegundoPlano):
+    """
+    Escribe filas CSV por lotes desde un hilo dedicado con el archivo abierto.
+    
+    Con rotación activa el archivo `ruta` es siempre el segmento en curso;
+    al cerrarse se renombra como base_AAAAmmdd_HHMMSS.csv, se comprime en
+    segundo plano y se agrega al índice.
+    """
+    
+    def __init__(self, ruta, encabezados=ENCABEZADOS_CSV,
+                 filas_por_lote=ConfigAlmacenamiento.CSV_FILAS_POR_LOTE,
+                 intervalo_flush=ConfigAlmacenamiento.CSV_INTERVALO_FLUSH,
+                 rotacion=ConfigAlmacenamiento.ROTACION,
+                 max_bytes=ConfigAlmacenamiento.ROTACION_MAX_BYTES,
+                 comprimir=ConfigAlmacenamiento.COMPRIMIR_SEGMENTOS,
+                 retencion_dias=ConfigAlmacenamiento.RETENCION_DIAS):
+        self.ruta = ruta
+        self.encabezados = encabezados
+        self.rotacion = rotacion
+        self.max_bytes = max_bytes
+        self.comprimir = comprimir
+        self.retencion_dias = retencion_dias
+        self.indice = IndiceSegmentos(ruta_indice(ruta)) if rotacion else None
+        self.rotaciones = 0
+        self._formato = FormatoCSV()
+        self._archivo = None
+        self._writer = None
+        self._indice_disperso = None
+        self._cubeta = None
+        
+        # Rango del segmento en curso
+        self._desde = None
+        self._hasta = None
+        self._fecha_segmento = None
+        super().__init__(filas_por_lote, intervalo_flush)
+    
+    def escribir(self, marca, temp, hum_amb, hum_suelo, pot):
+        """Encola una muestra para ser escrita (no bloquea)."""
+        if not self._cerrado:
+            self._cola.put((marca, temp, hum_amb, hum_suelo, pot))
+    
+    def segmentos(self, desde=None, hasta=None):
+        """Rutas de los segmentos (cerrados y el activo) que cubren [desde, hasta)."""
+        rutas = self.indice.en_rango(desde, hasta) if self.indice else []
+        if hasta is None or self._desde is None or self._desde < hasta:
+            rutas.append(self.ruta)
+        return rutas
+    
+    def obtener_estadisticas(self):
+        """Retorna las estadísticas del escritor."""
+        estadisticas = super().obtener_estadisticas()
+        estadisticas['rotaciones'] = self.rotaciones
+        return estadisticas
+    
+    def _abrir(self):
+        """Abre el archivo y retoma las compresiones que quedaron pendientes."""
+        self._abrir_archivo()
+        
+        # Segmentos que quedaron sin comprimir (p. ej. cierre durante la compresión)
+        if self.indice and self.comprimir:
+            for ruta in self.indice.sin_comprimir():
+                self._comprimir_en_segundo_plano(ruta)
+    
+    def _abrir_archivo(self):
+        """Abre el archivo en modo anexar y escribe encabezados si es nuevo."""
+        nuevo = not os.path.exists(self.ruta) or os.path.getsize(self.ruta) == 0
+        self._archivo = open(self.ruta, 'a', newline='')
+        self._writer = csv.writer(self._archivo)
+        if nuevo:
+            self._writer.writerow(self.encabezados)
+            self._archivo.flush()
+        elif self.rotacion:
+            self._leer_rango_existente()
+        self._abrir_indice_disperso(nuevo)
+    
+    def _abrir_indice_disperso(self, nuevo):
+        """Abre (o reconstruye si falta) el índice disperso del archivo activo."""
+        ruta = ruta_indice_disperso(self.ruta)
+        self._cubeta = None
+        if nuevo:
+            open(ruta, 'wb').close()
+        elif not os.path.exists(ruta):
+            try:
+                construir_indice_disperso(self.ruta)
+            except (OSError, ValueError) as e:
+                print(f"Error reconstruyendo índice de {self.ruta}: {e}")
+                open(ruta, 'wb').close()
+        
+        # Continuar el minuto de la última entrada si el archivo ya tenía filas
+        indice = leer_indice_disperso(self.ruta)
+        if indice is not None and len(indice):
+            instante = datetime.fromtimestamp(indice['marca'][-1])
+            self._cubeta = (instante.strftime('%Y-%m-%d'), instante.strftime('%H:%M'))
+        self._indice_disperso = open(ruta, 'ab')
+    
+    def _leer_rango_existente(self):
+        """Obtiene fecha y rango del archivo activo heredado de una ejecución previa."""
+        try:
+            with open(self.ruta, 'r', newline='') as archivo:
+                archivo.readline()
+                primera = next(csv.reader([archivo.readline()]), None)
+                archivo.seek(max(0, os.path.getsize(self.ruta) - 256))
+                ultima = next(csv.reader([archivo.read().splitlines()[-1]]), None)
+            if primera and ultima:
+                self._desde = marca_fila(primera[0], primera[1])
+                self._hasta = marca_fila(ultima[0], ultima[1])
+                self._fecha_segmento = primera[0]
+        except (OSError, ValueError, IndexError):
+            pass
+    
+    def _convertir(self, elemento):
+        """Convierte una muestra suelta o un arreglo DTYPE_MUESTRA en filas CSV."""
+        if isinstance(elemento, np.ndarray):
+            filas = [
+                self._formato.fila(marca, temp, hum_amb, hum_suelo, pot)
+                for temp, hum_amb, hum_suelo, pot, marca in elemento[CAMPOS_MUESTRA].tolist()
+            ]
+            return filas, len(filas)
+        return [self._formato.fila(*elemento)], 1
+    
+    def _escribir(self, filas):
+        if self.rotacion == 'dia':
+            # Partir el lote en los cambios de fecha (columna Fecha)
+            inicio = 0
+            for i, fila in enumerate(filas):
+                if self._fecha_segmento is None:
+                    self._fecha_segmento = fila[0]
+                elif fila[0] != self._fecha_segmento:
+                    self._escribir_filas(filas[inicio:i])
+                    self._rotar()
+                    self._fecha_segmento = fila[0]
+                    inicio = i
+            filas = filas[inicio:]
+        
+        self._escribir_filas(filas)
+        
+        if self.rotacion == 'tamano' and self._archivo.tell() >= self.max_bytes:
+            self._rotar()
+    
+    def _escribir_filas(self, filas):
+        if not filas:
+            return
+        
+        # Anotar en el índice disperso el desplazamiento de cada minuto nuevo
+        entradas = []
+        primera, ultima = filas[0], filas[-1]
+        if (primera[0], primera[1][:5]) != self._cubeta or (ultima[0], ultima[1][:5]) != self._cubeta:
+            inicio = 0
+            for i, fila in enumerate(filas):
+                cubeta = (fila[0], fila[1][:5])
+                if cubeta != self._cubeta:
+                    self._writer.writerows(filas[inicio:i])
+                    self._archivo.flush()
+                    entradas.append((marca_fila(cubeta[0], cubeta[1] + ':00'), self._archivo.tell()))
+                    self._cubeta = cubeta
+                    inicio = i
+            filas_restantes = filas[inicio:]
+        else:
+            filas_restantes = filas
+        
+        self._writer.writerows(filas_restantes)
+        self._archivo.flush()
+        if entradas:
+            self._indice_disperso.write(np.array(entradas, dtype=DTYPE_INDICE_DISPERSO).tobytes())
+            self._indice_disperso.flush()
+        
+        if self.rotacion:
+            if self._desde is None:
+                self._desde = marca_fila(filas[0][0], filas[0][1])
+            self._hasta = marca_fila(filas[-1][0], filas[-1][1])
+    
+    def _rotar(self):
+        """Cierra el segmento en curso, lo indexa y abre uno nuevo."""
+        self._archivo.close()
+        self._indice_disperso.close()
+        if self._desde is not None:
+            sello = datetime.fromtimestamp(self._desde).strftime('%Y%m%d_%H%M%S')
+            base, extension = os.path.splitext(self.ruta)
+            destino = f"{base}_{sello}{extension}"
+            sufijo = 1
+            while os.path.exists(destino) or os.path.exists(destino + '.gz'):
+                destino = f"{base}_{sello}_{sufijo}{extension}"
+                sufijo += 1
+            os.replace(self.ruta, destino)
+            os.replace(ruta_indice_disperso(self.ruta), ruta_indice_disperso(destino))
+            self.indice.agregar(destino, self._desde, self._hasta)
+            self.rotaciones += 1
+            
+            if self.comprimir:
+                self._comprimir_en_segundo_plano(destino)
+            if self.retencion_dias:
+                self.indice.eliminar_anteriores(time.time() - self.retencion_dias * 86400)
+        
+        self._desde = None
+        self._hasta = None
+        self._fecha_segmento = None
+        self._abrir_archivo()
+    
+    def _comprimir_en_segundo_plano(self, ruta):
+        threading.Thread(target=self._comprimir, args=(ruta,), daemon=True).start()
+    
+    def _comprimir(self, ruta):
+        """Comprime un segmento cerrado con gzip y actualiza el índice."""
+        destino = ruta + '.gz'
+        temporal = destino + '.tmp'
+        try:
+            with open(ruta, 'rb') as origen, gzip.open(temporal, 'wb') as comprimido:
+                shutil.copyfileobj(origen, comprimido)
+            os.replace(temporal, destino)
+            self.indice.marcar_comprimido(ruta, destino)
+            os.remove(ruta)
+        except OSError as e:
+            print(f"Error comprimiendo {ruta}: {e}")
+    
+    def _cerrar_archivo(self):
+        self._archivo.close()
+        self._indice_disperso.close()
+
+
+class RegistroBinario(_EscritorSegundoPlano):
+    """
+    Registro binario de solo anexado en segmentos de tamaño acotado.
+    
+    Cada segmento se nombra por la marca de su primer registro, por lo que
+    el orden alfabético de los archivos es el orden temporal. Con rotación
+    diaria un segmento nunca cruza la medianoche. Los segmentos no se
+    comprimen para poder abrirlos con np.memmap.
+    """
+    
+    def __init__(self, directorio,
+                 registros_por_segmento=ConfigAlmacenamiento.BIN_REGISTROS_POR_SEGMENTO,
+                 filas_por_lote=ConfigAlmacenamiento.CSV_FILAS_POR_LOTE,
+                 intervalo_flush=ConfigAlmacenamiento.CSV_INTERVALO_FLUSH,
+                 rotacion=ConfigAlmacenamiento.ROTACION):
+        self.ruta = directorio
+        self.registros_por_segmento = registros_por_segmento
+        self.rotacion = rotacion
+        self._archivo = None
+        self._registros_segmento = 0
+        self._limite_segmento = np.inf
+        self.segmentos_creados = 0
+        super().__init__(filas_por_lote, intervalo_flush)
+    
+    def segmentos(self):
+        """Retorna las rutas de los segmentos en orden temporal."""
+        return segmentos_registro(self.ruta)
+    
+    def leer(self, desde=None, hasta=None):
+        """Registros con marca en [desde, hasta) como vistas np.memmap por segmento."""
+        return leer_registro(self.ruta, desde, hasta)
+    
+    def leer_dia(self, fecha):
+        """Retorna los registros de un día (datetime.date o 'AAAA-MM-DD')."""
+        if isinstance(fecha, str):
+            fecha = datetime.strptime(fecha, '%Y-%m-%d').date()
+        inicio = datetime.combine(fecha, datetime.min.time())
+        return self.leer(inicio.timestamp(), (inicio + timedelta(days=1)).timestamp())
+    
+    def exportar_csv(self, ruta_csv, desde=None, hasta=None, encabezados=ENCABEZADOS_CSV):
+        """Exporta un rango del registro al formato CSV habitual."""
+        formato = FormatoCSV()
+        filas_exportadas = 0
+        with open(ruta_csv, 'w', newline='') as archivo:
+            writer = csv.writer(archivo)
+            writer.writerow(encabezados)
+            for registros in self.leer(desde, hasta):
+                writer.writerows(formato.fila(*registro) for registro in registros.tolist())
+                filas_exportadas += len(registros)
+        return filas_exportadas
+    
+    def obtener_estadisticas(self):
+        """Retorna las estadísticas del registro."""
+        estadisticas = super().obtener_estadisticas()
+        estadisticas['segmentos_creados'] = self.segmentos_creados
+        return estadisticas
+    
+    def _abrir(self):
+        """Continúa el último segmento si tiene espacio; si no, se crea al escribir."""
+        os.makedirs(self.ruta, exist_ok=True)
+        rutas = self.segmentos()
+        if not rutas:
+            return
+        ruta = rutas[-1]
+        try:
+            dtype = leer_encabezado(ruta)
+        except ValueError:
+            return
+        if dtype != DTYPE_REGISTRO:
+            return
+        registros = (os.path.getsize(ruta) - TAM_ENCABEZADO) // DTYPE_REGISTRO.itemsize
+        if registros >= self.registros_por_segmento:
+            return
+        self._archivo = open(ruta, 'r+b')
+        # Descartar un registro incompleto de una escritura interrumpida
+        self._archivo.truncate(TAM_ENCABEZADO + registros * DTYPE_REGISTRO.itemsize)
+        self._archivo.seek(0, os.SEEK_END)
+        self._registros_segmento = registros
+        self._limite_segmento = self._calcular_limite(inicio_segmento(ruta))
+    
+    def _nuevo_segmento(self, marca):
+        """Cierra el segmento actual y abre uno nuevo con su encabezado."""
+        if self._archivo is not None:
+            self._archivo.close()
+        nombre = datetime.fromtimestamp(marca).strftime('%Y%m%d_%H%M%S_%f') + EXTENSION_SEGMENTO
+        self._archivo = open(os.path.join(self.ruta, nombre), 'ab')
+        self._archivo.write(codificar_encabezado())
+        self._registros_segmento = 0
+        self._limite_segmento = self._calcular_limite(marca)
+        self.segmentos_creados += 1
+    
+    def _calcular_limite(self, marca):
+        """Marca a partir de la cual se debe abrir otro segmento."""
+        return _inicio_dia_siguiente(marca) if self.rotacion == 'dia' else np.inf
+    
+    def _convertir(self, elemento):
+        return [muestras_a_registros(elemento)], len(elemento)
+    
+    def _escribir(self, lotes):
+        registros = np.concatenate(lotes)
+        while len(registros):
+            if (self._archivo is None or self._registros_segmento >= self.registros_por_segmento
+                    or registros['marca'][0] >= self._limite_segmento):
+                self._nuevo_segmento(registros['marca'][0])
+            espacio = min(
+                self.registros_por_segmento - self._registros_segmento,
+                np.searchsorted(registros['marca'], self._limite_segmento, 'left')
+            )
+            parte, registros = registros[:espacio], registros[espacio:]
+            self._archivo.write(parte.tobytes())
+            self._registros_segmento += len(parte)
+        self._archivo.flush()
+    
+    def _cerrar_archivo(self):
+        if self._archivo is not None:
+            self._archivo.close()
@@ -0,0 +1,172 @@
+"""
+Módulo de Benchmark
+Mide la ruta de adquisición completa (ComunicacionSerial -> ControladorSistema ->
+almacenamiento y bombeo de la interfaz) alimentada por el ESP32 simulado.
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import time
+from collections import Counter
+from estilos import ConfigInterfaz, ConfigSimulador
+from logica import ControladorSistema
+from simulador import SimuladorESP32
+
+# (nombre, parámetros de SimuladorESP32)
+ESCENARIOS = [
+    ('ascii 100 Hz', {'formato': 'ascii', 'frecuencia': 100}),
+    ('ascii 1 kHz', {'formato': 'ascii', 'frecuencia': 1000}),
+    ('ascii 5 kHz', {'formato': 'ascii', 'frecuencia': 5000}),
+    ('ascii ruidoso 1 kHz', {'formato': 'ascii', 'frecuencia': 1000,
+                             'tasa_corruptas': 0.01, 'tasa_errores': 0.001}),
+    ('ascii ráfagas', {'formato': 'ascii', 'frecuencia': 200,
+                       'rafaga_cada': 1.0, 'rafaga_muestras': 500}),
+    ('binario 5 kHz', {'formato': 'binario', 'frecuencia': 5000}),
+    ('binario 20 kHz', {'formato': 'binario', 'frecuencia': 20000}),
+    ('binario ruidoso 5 kHz', {'formato': 'binario', 'frecuencia': 5000, 'tasa_corruptas': 0.01}),
+]
+
+
+def _contador(notificaciones, evento):
+    """Callback de interfaz que solo cuenta sus llamadas."""
+    def contar(*argumentos):
+        notificaciones[evento] += 1
+    return contar
+
+
+def ejecutar_escenario(nombre, parametros, directorio, duracion=ConfigSimulador.DURACION_BENCHMARK,
+                       drenado=ConfigSimulador.DRENADO_BENCHMARK):
+    """
+    Emite durante `duracion` segundos y bombea como lo haría la interfaz.
+
+    Retorna un dict con la tasa sostenida (muestras procesadas por segundo) y
+    la tasa de pérdida respecto de las muestras válidas generadas (incluye
+    las que se perdieron por desbordamiento del pty).
+    """
+    simulador = SimuladorESP32(semilla=0, **parametros)
+    ruta = simulador.abrir()
+
+    controlador = ControladorSistema()
+    controlador.inicializar()
+
+    # Callbacks de interfaz sin widgets: conservan el costo de formateo del registro
+    notificaciones = Counter()
+    for evento in ('actualizar_valores', 'actualizar_estadisticas', 'agregar_registro'):
+        controlador.registrar_callback_ui(evento, _contador(notificaciones, evento))
+
+    # Render instantáneo: la etapa de render mide solo la espera hasta el aviso
+    contar_graficas = _contador(notificaciones, 'actualizar_graficas')
+
+    def renderizar(datos):
+        contar_graficas()
+        controlador.marcar_render()
+    controlador.registrar_callback_ui('actualizar_graficas', renderizar)
+
+    dispositivo = controlador.agregar_dispositivo('simulado', os.path.join(directorio, 'simulado.csv'))
+    exito, mensaje = controlador.conectar_esp32(ruta, 'simulado', esperar=True)
+    if not exito:
+        simulador.cerrar()
+        controlador.cerrar()
+        raise RuntimeError(mensaje)
+
+    intervalo = ConfigInterfaz.INTERVALO_BOMBEO / 1000
+    procesadas = 0
+    ciclos = 0
+    led = False
+
+    cpu_inicio = time.process_time()
+    inicio = time.monotonic()
+    simulador.iniciar()
+
+    # Emisión: bombeo periódico y un comando de LED por segundo
+    siguiente_led = inicio + 1.0
+    while time.monotonic() - inicio < duracion:
+        procesadas += controlador.procesar_pendientes()
+        ciclos += 1
+        if time.monotonic() >= siguiente_led:
+            led = not led
+            if led:
+                controlador.encender_led()
+            else:
+                controlador.apagar_led()
+            siguiente_led += 1.0
+        time.sleep(intervalo)
+    simulador.detener()
+    emision = time.monotonic() - inicio
+
+    # Drenado de lo que quede en el pty y en las colas
+    limite = time.monotonic() + drenado
+    while time.monotonic() < limite:
+        procesadas += controlador.procesar_pendientes()
+        time.sleep(intervalo)
+    cpu = time.process_time() - cpu_inicio
+
+    latencias = controlador.obtener_latencias()['etapas']
+    recepcion = dispositivo.comunicacion.obtener_estadisticas()
+    descartadas = dispositivo.muestras_descartadas
+    controlador.cerrar()
+    escritura = dispositivo.gestor_datos.escritor_csv.obtener_estadisticas()
+    emitidas = simulador.obtener_estadisticas()
+    simulador.cerrar()
+
+    enviadas = emitidas['muestras_enviadas']
+    generadas = enviadas + emitidas['muestras_desbordadas']
+    recibidas = recepcion['lineas_validas'] + recepcion['tramas_validas']
+    return {
+        'escenario': nombre,
+        'enviadas': enviadas,
+        'recibidas': recibidas,
+        'procesadas': procesadas,
+        'guardadas_csv': escritura['filas_escritas'],
+        'descartadas_cola': descartadas,
+        'desbordadas_pty': emitidas['muestras_desbordadas'],
+        'corruptas_enviadas': emitidas['muestras_corruptas'],
+        'invalidas_detectadas': recepcion['lineas_invalidas'] + recepcion['tramas_corruptas'],
+        'comandos_led': sum(emitidas['comandos'].values()),
+        'muestras_por_segundo': procesadas / emision,
+        'tasa_perdida': 1 - procesadas / generadas if generadas else 0.0,
+        'cpu_porcentaje': 100 * cpu / (emision + drenado),
+        'ciclos_bombeo': ciclos,
+        'latencia_p95_ms': {etapa: resumen['p95_ms'] for etapa, resumen in latencias.items()},
+        'notificaciones': dict(notificaciones)
+    }
+
+
+def imprimir_resultados(resultados):
+    """Tabla resumen de los escenarios."""
+    print(f"{'Escenario':<24}{'Enviadas':>10}{'Desbordadas':>13}{'Procesadas':>12}{'Guardadas':>11}"
+          f"{'muestras/s':>12}{'Pérdida':>10}{'CPU':>7}{'p95 total ms':>14}")
+    for r in resultados:
+        print(f"{r['escenario']:<24}{r['enviadas']:>10}{r['desbordadas_pty']:>13}{r['procesadas']:>12}"
+              f"{r['guardadas_csv']:>11}{r['muestras_por_segundo']:>12.0f}{r['tasa_perdida']:>10.2%}"
+              f"{r['cpu_porcentaje']:>6.0f}%{r['latencia_p95_ms']['total'] or 0:>14.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de adquisición con el ESP32 simulado")
+    parser.add_argument('--escenario', action='append',
+                        help="Nombre (o parte) del escenario a ejecutar; se puede repetir")
+    parser.add_argument('--duracion', type=float, default=ConfigSimulador.DURACION_BENCHMARK)
+    parser.add_argument('--json', help="Guardar los resultados en un archivo JSON")
+    argumentos = parser.parse_args()
+
+    escenarios = [
+        (nombre, parametros) for nombre, parametros in ESCENARIOS
+        if not argumentos.escenario or any(filtro in nombre for filtro in argumentos.escenario)
+    ]
+
+    resultados = []
+    for nombre, parametros in escenarios:
+        with tempfile.TemporaryDirectory() as directorio:
+            resultado = ejecutar_escenario(nombre, parametros, directorio, argumentos.duracion)
+        resultados.append(resultado)
+        print(f"{nombre}: {resultado['muestras_por_segundo']:.0f} muestras/s, "
+              f"pérdida {resultado['tasa_perdida']:.2%}")
+
+    print()
+    imprimir_resultados(resultados)
+    if argumentos.json:
+        with open(argumentos.json, 'w', encoding='utf-8') as archivo:
+            json.dump(resultados, archivo, indent=2, ensure_ascii=False)
@@ -0,0 +1,293 @@
+"""
+Módulo de Carga
+Lectura masiva de CSV históricos con mmap y parseo vectorizado en NumPy.
+
+Uso desde scripts:
+    from cargador import cargar_csv
+    datos = cargar_csv('datos_sensores.csv', desde=t0, hasta=t1)
+    datos['temperatura'].mean()
+
+    # Rango corto por índice disperso (solo lee los minutos pedidos)
+    datos = consultar('datos_sensores.csv', t0, t1, ['humedad_suelo'])
+
+o desde la terminal:
+    python cargador.py datos_sensores.csv --desde "2026-10-01 00:00:00" --npz salida.npz
+"""
+
+import argparse
+import gzip
+import mmap
+import os
+import time
+from datetime import datetime
+import numpy as np
+from estilos import ARCHIVO_CSV
+from almacenamiento import leer_indice_disperso, marca_fila, segmentos_csv
+
+
+COLUMNAS = ('marca', 'temperatura', 'humedad_amb', 'humedad_suelo', 'potenciometro')
+
+ANCHO_FECHA_HORA = 20           # 'AAAA-MM-DD,HH:MM:SS,'
+VENTANA_BISECCION = 64 * 1024   # bytes por debajo de los cuales se deja de bisecar
+
+
+def cargar_csv(ruta=ARCHIVO_CSV, desde=None, hasta=None):
+    """
+    Carga las filas con marca en [desde, hasta) como arreglos columnares.
+
+    Incluye los segmentos rotados registrados en el índice. El archivo debe
+    estar ordenado por tiempo (solo anexado), lo que permite ubicar el rango
+    por bisección sin recorrerlo completo. Retorna un dict con una clave por
+    columna de COLUMNAS.
+    """
+    marcas = []
+    valores = []
+    for segmento in segmentos_csv(ruta, desde, hasta):
+        marcas_segmento, valores_segmento = _cargar_segmento(segmento, desde, hasta)
+        if len(marcas_segmento):
+            marcas.append(marcas_segmento)
+            valores.append(valores_segmento)
+
+    if not marcas:
+        return {columna: np.empty(0) for columna in COLUMNAS}
+
+    # (4, n) contiguo: cada canal es una fila contigua en memoria
+    canales = np.ascontiguousarray(np.concatenate(valores).T)
+    datos = {'marca': np.concatenate(marcas)}
+    datos.update(zip(COLUMNAS[1:], canales))
+    return datos
+
+
+def consultar(ruta=ARCHIVO_CSV, t0=None, t1=None, canales=None):
+    """
+    Retorna las filas con marca en [t0, t1) de los canales pedidos.
+
+    El índice disperso de cada segmento (un desplazamiento por minuto) indica
+    qué bytes leer, de modo que el costo depende del rango y no del tamaño
+    del registro. Los segmentos sin índice se resuelven por bisección.
+    Retorna un dict con 'marca' y una clave por canal.
+    """
+    canales = list(canales or COLUMNAS[1:])
+    desconocidos = set(canales) - set(COLUMNAS[1:])
+    if desconocidos:
+        raise ValueError(f"Canales desconocidos: {', '.join(sorted(desconocidos))}")
+
+    marcas = []
+    valores = []
+    for segmento in segmentos_csv(ruta, t0, t1):
+        indice = leer_indice_disperso(segmento)
+        if indice is None or not len(indice):
+            marcas_segmento, valores_segmento = _cargar_segmento(segmento, t0, t1)
+        else:
+            marcas_segmento, valores_segmento = _consultar_segmento(segmento, indice, t0, t1)
+        if len(marcas_segmento):
+            marcas.append(marcas_segmento)
+            valores.append(valores_segmento)
+
+    if not marcas:
+        return {columna: np.empty(0) for columna in ['marca'] + canales}
+
+    valores = np.concatenate(valores)
+    datos = {'marca': np.concatenate(marcas)}
+    for canal in canales:
+        datos[canal] = np.ascontiguousarray(valores[:, COLUMNAS.index(canal) - 1])
+    return datos
+
+
+def _consultar_segmento(ruta, indice, t0, t1):
+    """Lee solo los minutos de un segmento que cubren [t0, t1)."""
+    marcas_indice = indice['marca']
+    inicio = indice['desplazamiento'][0]
+    if t0 is not None:
+        i = np.searchsorted(marcas_indice, t0, 'right') - 1
+        inicio = indice['desplazamiento'][max(i, 0)]
+    cantidad = -1
+    if t1 is not None:
+        j = np.searchsorted(marcas_indice, t1, 'left')
+        if j < len(indice):
+            cantidad = indice['desplazamiento'][j] - inicio
+            if cantidad <= 0:
+                return np.empty(0), np.empty((0, 4))
+
+    abrir = gzip.open if ruta.endswith('.gz') else open
+    with abrir(ruta, 'rb') as archivo:
+        archivo.seek(inicio)
+        contenido = archivo.read(cantidad)
+
+    # Una última línea sin salto puede estar a medio escribir
+    contenido = contenido[:contenido.rfind(b'\n') + 1]
+    marcas, valores = _parsear_bloque(bytearray(contenido))
+    mascara = np.ones(len(marcas), dtype=bool)
+    if t0 is not None:
+        mascara &= marcas >= t0
+    if t1 is not None:
+        mascara &= marcas < t1
+    return marcas[mascara], valores[mascara]
+
+
+def _cargar_segmento(ruta, desde, hasta):
+    """Carga un CSV (mapeado en memoria) o un segmento comprimido (.gz)."""
+    if ruta.endswith('.gz'):
+        with gzip.open(ruta, 'rb') as archivo:
+            return _parsear(archivo.read(), desde, hasta)
+
+    with open(ruta, 'rb') as archivo:
+        if os.fstat(archivo.fileno()).st_size == 0:
+            return np.empty(0), np.empty((0, 4))
+        with mmap.mmap(archivo.fileno(), 0, access=mmap.ACCESS_READ) as mapa:
+            return _parsear(mapa, desde, hasta)
+
+
+def _parsear(contenido, desde, hasta):
+    """Ubica el rango pedido por bisección y parsea solo esos bytes."""
+    inicio = contenido.find(b'\n') + 1 if contenido[:5] == b'Fecha' else 0
+    # Una última línea sin salto puede estar a medio escribir
+    fin = contenido.rfind(b'\n') + 1
+    if fin <= inicio:
+        return np.empty(0), np.empty((0, 4))
+
+    if desde is not None:
+        inicio = _bisecar(contenido, inicio, fin, desde)[0]
+    if hasta is not None:
+        fin = _bisecar(contenido, inicio, fin, hasta)[1]
+
+    # Copia mutable del rango (una rebanada de mmap retorna bytes)
+    marcas, valores = _parsear_bloque(bytearray(contenido[inicio:fin]))
+
+    # La bisección deja un margen de hasta VENTANA_BISECCION bytes
+    mascara = np.ones(len(marcas), dtype=bool)
+    if desde is not None:
+        mascara &= marcas >= desde
+    if hasta is not None:
+        mascara &= marcas < hasta
+    return marcas[mascara], valores[mascara]
+
+
+def _bisecar(contenido, inicio, fin, marca):
+    """
+    Acota por bisección la posición de la primera fila con marca >= `marca`.
+
+    Retorna (bajo, alto): `bajo` es un inicio de línea anterior a la fila
+    buscada y `alto` un inicio de línea igual o posterior.
+    """
+    bajo, alto = inicio, fin
+    while alto - bajo > VENTANA_BISECCION:
+        medio = (bajo + alto) // 2
+        posicion = contenido.find(b'\n', medio, alto) + 1
+        if posicion <= 0 or posicion >= alto:
+            alto = medio
+            continue
+        try:
+            linea = contenido[posicion:posicion + ANCHO_FECHA_HORA - 1].decode('ascii')
+            marca_linea = marca_fila(linea[:10], linea[11:19])
+        except ValueError:
+            # Línea irregular: se descarta el lado superior y se sigue acotando
+            alto = medio
+            continue
+        if marca_linea < marca:
+            bajo = posicion
+        else:
+            alto = posicion
+    return bajo, alto
+
+
+def _parsear_bloque(bloque):
+    """
+    Parsea líneas completas 'AAAA-MM-DD,HH:MM:SS,t,ha,hs,pot' en arreglos.
+
+    Fecha y hora tienen ancho fijo y se convierten dígito a dígito; los
+    cuatro valores numéricos se leen de una sola vez con np.fromstring.
+    """
+    datos = np.frombuffer(bloque, dtype=np.uint8)
+    finales = np.flatnonzero(datos == ord('\n'))
+    inicios = np.concatenate(([0], finales[:-1] + 1))
+
+    # Líneas con la forma esperada (descarta vacías y encabezados repetidos)
+    largas = finales - inicios > ANCHO_FECHA_HORA
+    validas = np.zeros(len(inicios), dtype=bool)
+    validas[largas] = (
+        (datos[inicios[largas] + 4] == ord('-'))
+        & (datos[inicios[largas] + 10] == ord(','))
+        & (datos[inicios[largas] + 13] == ord(':'))
+        & (datos[inicios[largas] + 19] == ord(','))
+    )
+    for i in np.flatnonzero(~validas):
+        datos[inicios[i]:finales[i]] = ord(' ')
+    inicios = inicios[validas]
+    if not len(inicios):
+        return np.empty(0), np.empty((0, 4))
+
+    # Dígitos de fecha y hora: una fila de 19 caracteres por línea
+    d = datos[inicios[:, None] + np.arange(ANCHO_FECHA_HORA - 1)].astype(np.int64) - ord('0')
+    anio = d[:, 0] * 1000 + d[:, 1] * 100 + d[:, 2] * 10 + d[:, 3]
+    mes = d[:, 5] * 10 + d[:, 6]
+    dia = d[:, 8] * 10 + d[:, 9]
+    segundos = (d[:, 11] * 10 + d[:, 12]) * 3600 + (d[:, 14] * 10 + d[:, 15]) * 60 + d[:, 17] * 10 + d[:, 18]
+    dias = ((anio - 1970) * 12 + mes - 1).astype('datetime64[M]').astype('datetime64[D]').astype(np.int64) + dia - 1
+    marcas = _hora_local_a_marca(dias * 86400 + segundos)
+
+    # Blanquear fecha/hora y comas: quedan solo los números separados por espacios
+    datos[inicios[:, None] + np.arange(ANCHO_FECHA_HORA)] = ord(' ')
+    datos[datos == ord(',')] = ord(' ')
+    valores = np.fromstring(bytes(bloque), dtype=np.float64, sep=' ')
+
+    if len(valores) != 4 * len(inicios):
+        return _parsear_lineas(bloque, marcas)
+    return marcas, valores.reshape(-1, 4)
+
+
+def _parsear_lineas(bloque, marcas):
+    """Camino lento para bloques con filas de largo irregular."""
+    lineas = [linea.split() for linea in bytes(bloque).splitlines() if linea.strip()]
+    conservar = []
+    valores = []
+    for i, campos in enumerate(lineas):
+        try:
+            valores.append([float(campo) for campo in campos[:4]] + [np.nan] * (4 - len(campos)))
+            conservar.append(i)
+        except ValueError:
+            continue
+    return marcas[conservar], np.array(valores, dtype=np.float64).reshape(-1, 4)
+
+
+def _hora_local_a_marca(ingenuas):
+    """
+    Convierte segundos 'de reloj' locales en marcas de tiempo reales.
+
+    El desfase se calcula una vez por hora distinta (cubre cambios de horario).
+    """
+    horas, inversa = np.unique(ingenuas // 3600, return_inverse=True)
+    desfases = np.array([
+        time.mktime(time.gmtime(int(hora) * 3600)[:8] + (-1,)) - int(hora) * 3600
+        for hora in horas
+    ])
+    return (ingenuas + desfases[inversa]).astype(np.float64)
+
+
+def _leer_fecha(texto):
+    return datetime.strptime(texto, '%Y-%m-%d %H:%M:%S').timestamp()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Carga masiva de CSV de sensores")
+    parser.add_argument('ruta', nargs='?', default=ARCHIVO_CSV)
+    parser.add_argument('--desde', type=_leer_fecha, help="AAAA-MM-DD HH:MM:SS")
+    parser.add_argument('--hasta', type=_leer_fecha, help="AAAA-MM-DD HH:MM:SS")
+    parser.add_argument('--npz', help="Guardar las columnas en un archivo .npz")
+    argumentos = parser.parse_args()
+
+    inicio = time.perf_counter()
+    datos = cargar_csv(argumentos.ruta, argumentos.desde, argumentos.hasta)
+    duracion = time.perf_counter() - inicio
+
+    filas = len(datos['marca'])
+    print(f"{filas} filas en {duracion:.3f} s")
+    if filas:
+        print(f"Desde {datetime.fromtimestamp(datos['marca'][0])} hasta "
+              f"{datetime.fromtimestamp(datos['marca'][-1])}")
+        for columna in COLUMNAS[1:]:
+            valores = datos[columna]
+            print(f"  {columna:<14} min {np.nanmin(valores):9.2f}  "
+                  f"media {np.nanmean(valores):9.2f}  max {np.nanmax(valores):9.2f}")
+    if argumentos.npz:
+        np.savez(argumentos.npz, **datos)
@@ -0,0 +1,127 @@
+"""
+Módulo de Componentes
+Componentes de interfaz reutilizables del dashboard.
+"""
+
+import time
+from collections import deque
+from estilos import ConfigConsola
+
+
+class ConsolaEventos:
+    """Registro acotado en memoria que solo muestra la cola reciente en el widget."""
+
+    def __init__(self, widget, max_lineas=ConfigConsola.MAX_LINEAS,
+                 lineas_visibles=ConfigConsola.LINEAS_VISIBLES):
+        self.widget = widget
+        self.lineas_visibles = lineas_visibles
+        self._lineas = deque(maxlen=max_lineas)
+        self._pendientes = deque(maxlen=lineas_visibles)
+        self._lineas_en_widget = 0
+        self._filtro = ''
+
+    def registrar(self, mensaje):
+        """Guarda un mensaje; se mostrará en el próximo volcado."""
+        self._lineas.append(mensaje)
+        if self._coincide(mensaje):
+            self._pendientes.append(mensaje)
+
+    def volcar(self):
+        """Inserta los mensajes pendientes en una sola operación y recorta el widget."""
+        if not self._pendientes:
+            return
+
+        nuevas = len(self._pendientes)
+        self.widget.insert("end", "\n".join(self._pendientes) + "\n")
+        self._pendientes.clear()
+        self._lineas_en_widget += nuevas
+
+        exceso = self._lineas_en_widget - self.lineas_visibles
+        if exceso > 0:
+            self.widget.delete("1.0", f"{exceso + 1}.0")
+            self._lineas_en_widget = self.lineas_visibles
+
+        self.widget.see("end")
+
+    def filtrar(self, texto):
+        """Muestra solo las líneas del registro que contienen `texto`."""
+        filtro = texto.strip().lower()
+        if filtro == self._filtro:
+            return
+        self._filtro = filtro
+        self._pendientes.clear()
+
+        lineas = self.buscar(filtro, self.lineas_visibles)
+        self.widget.delete("1.0", "end")
+        if lineas:
+            self.widget.insert("end", "\n".join(lineas) + "\n")
+            self.widget.see("end")
+        self._lineas_en_widget = len(lineas)
+
+    def buscar(self, texto, limite=None):
+        """Retorna las líneas más recientes del registro que contienen `texto`."""
+        texto = texto.lower()
+        encontradas = []
+        for linea in reversed(self._lineas):
+            if texto in linea.lower():
+                encontradas.append(linea)
+                if limite is not None and len(encontradas) >= limite:
+                    break
+        encontradas.reverse()
+        return encontradas
+
+    def limpiar(self):
+        """Descarta el registro y vacía el widget."""
+        self._lineas.clear()
+        self._pendientes.clear()
+        self.widget.delete("1.0", "end")
+        self._lineas_en_widget = 0
+
+    def _coincide(self, mensaje):
+        return not self._filtro or self._filtro in mensaje.lower()
+
+
+class ActualizadorTarjetas:
+    """
+    Capa de actualización de etiquetas: recuerda el último texto dibujado,
+    omite los valores sin cambios y aplica el resto una vez por ciclo de UI.
+    """
+
+    def __init__(self):
+        self._etiquetas = {}   # clave -> (widget, intervalo mínimo)
+        self._dibujado = {}
+        self._pendientes = {}
+        self._ultimo_dibujo = {}
+        self.omitidas = 0
+        self.aplicadas = 0
+
+    def registrar(self, clave, widget, intervalo_minimo=None):
+        """Asocia una etiqueta a una clave con un límite opcional de frecuencia (s)."""
+        self._etiquetas[clave] = (widget, intervalo_minimo)
+        self._dibujado[clave] = widget.cget("text")
+        self._ultimo_dibujo[clave] = 0.0
+
+    def fijar(self, clave, texto):
+        """Guarda el texto de una etiqueta; se dibujará en el próximo volcado."""
+        if texto == self._dibujado.get(clave):
+            self._pendientes.pop(clave, None)
+            self.omitidas += 1
+        else:
+            self._pendientes[clave] = texto
+
+    def volcar(self):
+        """Configura solo las etiquetas cuyo texto cambió y cuyo límite lo permite."""
+        if not self._pendientes:
+            return
+
+        ahora = time.monotonic()
+        for clave in list(self._pendientes):
+            widget, intervalo = self._etiquetas[clave]
+            if intervalo and ahora - self._ultimo_dibujo[clave] < intervalo:
+                continue
+            texto = self._pendientes.pop(clave)
+            widget.configure(text=texto)
+            self._dibujado[clave] = texto
+            self._ultimo_dibujo[clave] = ahora
+            self.aplicadas += 1
+
@@ -0,0 +1,143 @@
+"""
+Módulo de Estadísticas
+Estadísticas móviles por canal con actualización O(1) por muestra.
+"""
+
+import math
+from collections import deque
+import numpy as np
+from estilos import ConfigEstadisticas
+
+
+class VentanaEstadistica:
+    """
+    Media, desviación, mínimo, máximo y tasa de cambio de varios canales
+    sobre los últimos `segundos`.
+
+    La media y la varianza se mantienen con Welford (altas y bajas), y el
+    mínimo y máximo con deques monótonas; ninguna operación recorre la ventana.
+    Los valores no finitos (NaN de un sensor que falló) se omiten por canal:
+    no entran en las sumas ni en los extremos, y cada canal lleva su conteo.
+    """
+
+    def __init__(self, segundos, canales):
+        self.segundos = segundos
+        self.canales = canales
+        self._muestras = deque()   # (secuencia, marca)
+        self._secuencia = 0
+        self.n = 0
+        self._validos = [deque() for _ in range(canales)]   # (secuencia, marca, valor) finitos
+        self._medias = [0.0] * canales
+        self._m2 = [0.0] * canales
+        self._minimos = [deque() for _ in range(canales)]
+        self._maximos = [deque() for _ in range(canales)]
+
+    def agregar(self, marca, valores):
+        """Agrega una muestra (un valor por canal) y descarta las que salen de la ventana."""
+        secuencia = self._secuencia
+        self._secuencia += 1
+        self._muestras.append((secuencia, marca))
+        self.n += 1
+        for i, x in enumerate(valores):
+            if not math.isfinite(x):
+                continue
+            validos = self._validos[i]
+            validos.append((secuencia, marca, x))
+            n = len(validos)
+            delta = x - self._medias[i]
+            self._medias[i] += delta / n
+            self._m2[i] += delta * (x - self._medias[i])
+
+            minimos = self._minimos[i]
+            while minimos and minimos[-1][1] >= x:
+                minimos.pop()
+            minimos.append((secuencia, x))
+
+            maximos = self._maximos[i]
+            while maximos and maximos[-1][1] <= x:
+                maximos.pop()
+            maximos.append((secuencia, x))
+
+        limite = marca - self.segundos
+        while self._muestras[0][1] < limite:
+            self._quitar(self._muestras.popleft()[0])
+
+    def resultados(self):
+        """Retorna una lista con las estadísticas de cada canal (None sin datos válidos)."""
+        resultados = []
+        for i in range(self.canales):
+            validos = self._validos[i]
+            n = len(validos)
+            if not n:
+                resultados.append(None)
+                continue
+
+            primera, ultima = validos[0], validos[-1]
+            duracion = ultima[1] - primera[1]
+            varianza = self._m2[i] / (n - 1) if n > 1 else 0.0
+            resultados.append({
+                'media': self._medias[i],
+                'minimo': self._minimos[i][0][1],
+                'maximo': self._maximos[i][0][1],
+                'desviacion': math.sqrt(max(varianza, 0.0)),
+                # Unidades por segundo entre el valor válido más viejo y el más nuevo
+                'tasa': (ultima[2] - primera[2]) / duracion if duracion > 0 else 0.0,
+                'muestras': n
+            })
+        return resultados
+
+    def limpiar(self):
+        """Descarta todas las muestras de la ventana."""
+        self.__init__(self.segundos, self.canales)
+
+    def _quitar(self, secuencia):
+        """Baja de Welford y expiración de los extremos monótonos."""
+        self.n -= 1
+        for i in range(self.canales):
+            validos = self._validos[i]
+            if not validos or validos[0][0] != secuencia:
+                continue  # El canal no tenía un valor válido en esa muestra
+            x = validos.popleft()[2]
+            n = len(validos)
+            if n == 0:
+                self._medias[i] = 0.0
+                self._m2[i] = 0.0
+            else:
+                delta = x - self._medias[i]
+                self._medias[i] -= delta / n
+                self._m2[i] -= delta * (x - self._medias[i])
+
+            if self._minimos[i][0][0] == secuencia:
+                self._minimos[i].popleft()
+            if self._maximos[i][0][0] == secuencia:
+                self._maximos[i].popleft()
+
+
+class EstadisticasMoviles:
+    """Conjunto de ventanas (en segundos) alimentadas con los mismos lotes."""
+
+    def __init__(self, ventanas=ConfigEstadisticas.VENTANAS, canales=4):
+        self.ventanas = {segundos: VentanaEstadistica(segundos, canales) for segundos in ventanas}
+        self._mayor = max(ventanas)
+
+    def agregar_lote(self, marcas, canales):
+        """Agrega marcas (n,) y canales (c, n); solo se recorre lo que cabe en la ventana mayor."""
+        if not len(marcas):
+            return
+        # Lo anterior a la ventana mayor expiraría de inmediato: se corta antes de convertir
+        inicio = int(np.searchsorted(marcas, marcas[-1] - self._mayor, 'left'))
+        marcas = marcas[inicio:].tolist()
+        filas = canales[:, inicio:].T.tolist()
+
+        for ventana in self.ventanas.values():
+            agregar = ventana.agregar
+            for marca, fila in zip(marcas, filas):
+                agregar(marca, fila)
+
+    def obtener(self, segundos=None):
+        """Estadísticas por canal de una ventana (por defecto la de las tarjetas)."""
+        return self.ventanas[segundos or ConfigEstadisticas.VENTANA_TARJETAS].resultados()
+
+    def limpiar(self):
+        for ventana in self.ventanas.values():
+            ventana.limpiar()
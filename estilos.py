@@ -166,13 +166,44 @@ class ConfigGraficas:
     INTERPOLACION = True
     INTERPOLACION_PUNTOS = 300
 
+    # Degradación del suavizado según el número de puntos
+    SUAVIZADO_MAX_CUBICO = 2000      # Por encima: media móvil (más barata)
+    SUAVIZADO_MAX_PUNTOS = 20000     # Por encima: sin suavizado
+    SUAVIZADO_VENTANA_MEDIA = 5      # Muestras por ventana de la media móvil
+    SUAVIZADO_CACHE = 4              # Operadores cúbicos precalculados en memoria
+
+    # 'operador': spline cúbico global; 'incremental': solo recalcula la cola
+    SUAVIZADO_MODO = 'operador'
+    SUAVIZADO_SUBPUNTOS = 6          # Puntos por segmento en modo incremental
+
+    # Trazo de cada dispositivo cuando se grafican varios a la vez
+    ESTILOS_DISPOSITIVO = ['-', '--', ':', '-.']
+
+    # Pirámide de resoluciones para historiales largos
+    PIRAMIDE_ACTIVA = True
+    PIRAMIDE_FACTOR = 8              # Elementos del nivel inferior por grupo
+    PIRAMIDE_NIVELES = 7
+    PIRAMIDE_CAPACIDAD = 8192        # Elementos por nivel (los gruesos cubren más tiempo)
+    PIRAMIDE_MODO = 'minmax'         # 'minmax' (conserva picos) o 'lttb' (conserva forma)
+    VENTANAS_HISTORIAL = {'En vivo': None, '1 h': 3600, '24 h': 86400, '7 d': 604800}
+
+    # Planificación del renderizado
+    FPS_MAX = 15                 # Redibujados por segundo como máximo
+    INTERVALO_OCULTO = 250       # ms entre comprobaciones con la ventana oculta
+
+    # Blitting: solo se redibujan las líneas sobre fondos cacheados
+    BLIT = True
+    MARGEN_LIMITES = 0.1         # Holgura relativa al recalcular límites de ejes
+
 # ========== TEXTOS ==========
 class Textos:
     # Navbar
     APP_TITULO = "</> Monitor de Sistema v2"
     ESTADO_ONLINE = "Sistema Conectado"
     ESTADO_OFFLINE = "Sistema Desconectado"
-    AUTO_SYNC = "Sincronización: 1.5s"
+    TASA_DEFAULT = "Muestreo: --/s"
+    FORMATO_TASA = "Muestreo: {tasa:.1f}/s"
+    FORMATO_LATENCIAS = "p95 ms  parseo {parseo} · cola {cola} · render {render} · total {total}"
     RESET_VIEW = "Reiniciar Vista"
 
     # Secciones
@@ -191,12 +222,18 @@ class Textos:
     GRAF_HUMEDAD_AMB = "Humedad Atmosférica"
     GRAF_HUMEDAD_SUELO = "Saturación del Suelo"
     GRAF_POTENCIOMETRO = "Lectura Potenciómetro"
+    CARGANDO_GRAFICAS = "Cargando gráficas..."
+    FORMATO_ARRANQUE = ("> Arranque: ventana {ventana:.2f} s, gráficas {graficas:.2f} s "
+                        "(matplotlib {importacion:.2f} s), historial {precarga:.2f} s")
     LIVE_HISTORY = "EN VIVO"
 
     # Comunicación
     PORT_INTERFACE = "Interfaz de Puerto"
     BTN_START = "Iniciar"
     BTN_STOP = "Detener"
+    DISPOSITIVO_GRAFICADO = "Dispositivo Graficado"
+    VENTANA_GRAFICADA = "Ventana de Tiempo"
+    TODOS_DISPOSITIVOS = "Todos"
 
     # Actuadores
     SYSTEM_LIGHTING = "Iluminación LED"
@@ -206,6 +243,7 @@ class Textos:
 
     # Consola
     BTN_CLEAR = "Limpiar"
+    FILTRO_CONSOLA = "Filtrar eventos..."
 
     # Unidades
     UNIDAD_CELSIUS = "°c"
@@ -215,6 +253,9 @@ class Textos:
     # Valores por defecto
     VALOR_DEFAULT = "--.-"
     VALOR_DEFAULT_INT = "----"
+    ESTADISTICAS_DEFAULT = "μ --  ↓-- ↑--  σ --  Δ --/min"
+    FORMATO_ESTADISTICAS = ("μ {media:.{d}f}  ↓{minimo:.{d}f} ↑{maximo:.{d}f}  "
+                            "σ {desviacion:.{d}f}  Δ {tasa_minuto:+.{d}f}/min")
 
     # Puerto
     PUERTO_DEFAULT = "COM3"
@@ -235,12 +276,92 @@ class ConfigSerial:
     BAUDRATE = 115200
     TIMEOUT = 1
     DELAY_CONEXION = 2
+    TIMEOUT_LECTURA = 0.1      # s de espera bloqueante por bytes nuevos
+    TAM_LECTURA = 4096         # Bytes máximos por lectura en bloque
+    MAX_LINEA = 1024           # Descarta restos sin salto de línea más largos
+    PROTOCOLO = 'auto'         # 'auto', 'ascii' (CSV por líneas) o 'binario' (tramas)
+    MAX_DETECCION = 8192       # Bytes a observar antes de asumir ASCII en modo auto
+    ESPERA_SONDEO = 0.005      # s de espera del bucle compartido sin selectors
+    MAX_LOTES_ASYNC = 100      # Lotes retenidos para lectores asyncio (se descartan los más antiguos)
 
 # ========== ARCHIVOS ==========
 ARCHIVO_CSV = 'datos_sensores.csv'
 ENCABEZADOS_CSV = ['Fecha', 'Hora', 'Temperatura_C', 'Humedad_Ambiente_%',
                    'Humedad_Suelo_%', 'Potenciometro_ADC']
 
+class ConfigAlmacenamiento:
+    CSV_FILAS_POR_LOTE = 200       # Filas acumuladas antes de volcar a disco
+    CSV_INTERVALO_FLUSH = 1.0      # s máximos entre volcados
+    BINARIO_ACTIVO = True          # Registro binario (np.memmap) junto al CSV
+    BIN_REGISTROS_POR_SEGMENTO = 1_000_000   # ~24 MB por segmento
+    ROTACION = 'dia'               # 'dia', 'tamano' o None (un solo archivo)
+    ROTACION_MAX_BYTES = 64 * 1024 * 1024    # Tamaño del CSV activo con rotación 'tamano'
+    COMPRIMIR_SEGMENTOS = True     # gzip en segundo plano de los CSV cerrados
+    RETENCION_DIAS = None          # Borrar segmentos más antiguos (None: conservar)
+    BLOQUE_INDICE = 8 * 1024 * 1024   # Bytes por bloque al reconstruir el índice disperso de un CSV
+    PRECARGA_HORAS = 24            # Historial cargado en las gráficas al iniciar (0: ninguno)
+    NOMBRE_HISTORIAL = 'historial' # Serie del historial mostrado antes de conectar
+
+# ========== REPRODUCCIÓN ==========
+class ConfigReproduccion:
+    VELOCIDAD = 1.0              # 1.0 = tiempo real; None = lo más rápido posible
+    FILAS_POR_LOTE = 2000        # Filas leídas del archivo por lectura
+    INTERVALO_ENTREGA = 0.05     # s máximos entre lotes entregados a velocidad finita
+    NOMBRE = 'reproduccion'      # Nombre del dispositivo de reproducción
+
+# ========== SIMULADOR ==========
+class ConfigSimulador:
+    FORMATO = 'ascii'            # Uno de simulador.FORMATOS ('ascii', 'binario')
+    FRECUENCIA = 10.0            # Muestras por segundo
+    RUIDO = 0.2                  # Desviación del ruido gaussiano (en unidades del canal)
+    RAFAGA_CADA = None           # s entre ráfagas (None: sin ráfagas)
+    RAFAGA_MUESTRAS = 0          # Muestras extra emitidas de golpe en cada ráfaga
+    TASA_CORRUPTAS = 0.0         # Fracción de líneas/tramas dañadas a propósito
+    TASA_ERRORES = 0.0           # Fracción de líneas "Error ..." (solo ASCII)
+    TICK = 0.005                 # s entre escrituras al pty
+    DURACION_BENCHMARK = 10.0    # s de emisión por escenario del benchmark
+    DRENADO_BENCHMARK = 2.0      # s de espera para vaciar colas tras la emisión
+
+class ConfigEstadisticas:
+    VENTANAS = (60, 600)         # s de cada ventana móvil por canal
+    VENTANA_TARJETAS = 60        # Ventana mostrada en las tarjetas de valores
+
+# ========== LATENCIA ==========
+class ConfigLatencia:
+    MIN_HISTOGRAMA = 1e-5          # s del primer borde del histograma (escala logarítmica)
+    MAX_HISTOGRAMA = 30.0          # s del último borde; lo mayor cae en la última clase
+    CLASES_POR_DECADA = 20
+    VENTANA_TASA = 5.0             # s sobre los que se mide muestras/s
+    MIN_DURACION_TASA = 1.0        # s mínimos de medición de la tasa al arrancar
+    MAX_PENDIENTES_RENDER = 100000 # Muestras esperando el próximo render (sin render se descartan)
+    INTERVALO_OVERLAY = 1000       # ms entre actualizaciones de la tasa y las latencias
+    OVERLAY_VISIBLE = False        # Detalle de latencias visible al iniciar
+
+# ========== ADQUISICIÓN SIN INTERFAZ ==========
+class ConfigAdquisicion:
+    INTERVALO_BOMBEO = 0.1         # s entre drenados de las colas de los dispositivos
+    INTERVALO_ESTADO = 60.0        # s entre líneas de estado (0: sin estado periódico)
+    REINTENTO = 5.0                # s entre reintentos de un puerto caído (0: no reintentar)
+
+# ========== INTERFAZ ==========
+class ConfigInterfaz:
+    INTERVALO_BOMBEO = 30            # ms entre drenados de la cola de muestras
+    MAX_MUESTRAS_POR_CICLO = 5000    # Muestras procesadas por ciclo como máximo
+    MAX_COLA_MUESTRAS = 50000        # Muestras retenidas si la interfaz se atrasa
+    RETARDO_GRAFICAS = 50            # ms tras mostrar la ventana antes de cargar matplotlib
+    REPORTE_ARRANQUE = None          # CSV donde acumular los tiempos de arranque (None: no guardar)
+
+# ========== CONSOLA ==========
+class ConfigConsola:
+    MAX_LINEAS = 20000           # Líneas conservadas en memoria
+    LINEAS_VISIBLES = 500        # Líneas mostradas en el widget como máximo
+
+# ========== TARJETAS ==========
+class ConfigTarjetas:
+    # Segundos mínimos entre redibujados de cada tarjeta (ausente o None: sin límite)
+    INTERVALO_VALORES = {'temp': None, 'hum_amb': None, 'hum_suelo': None, 'pot': None}
+    INTERVALO_ESTADISTICAS = 0.5   # Líneas de estadísticas móviles de todas las tarjetas
+
 # ========== ANIMACIONES ==========
 class Animaciones:
     PULSO_DURACION = 1000      # ms
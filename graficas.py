@@ -0,0 +1,313 @@
+"""
+Módulo de Gráficas
+Planificación y renderizado de las gráficas del dashboard.
+"""
+
+import time
+from collections import OrderedDict
+import numpy as np
+from estilos import ConfigGraficas
+
+
+class PlanificadorRender:
+    """Limita el redibujado de las gráficas a un máximo de FPS."""
+
+    def __init__(self, ventana, funcion_render, fps=ConfigGraficas.FPS_MAX):
+        self.ventana = ventana
+        self.funcion_render = funcion_render
+        self.intervalo = 1.0 / fps
+
+        self._sucio = False
+        self._pendiente = None
+        self._ultimo_render = 0.0
+
+        # Estadísticas
+        self.frames = 0
+        self.marcas = 0
+        self.frames_omitidos_oculta = 0
+
+    def marcar_sucio(self):
+        """Indica que hay datos nuevos; el redibujado se agenda como máximo a FPS."""
+        self.marcas += 1
+        self._sucio = True
+        if self._pendiente is None:
+            restante = self._ultimo_render + self.intervalo - time.monotonic()
+            self._agendar(max(0, int(restante * 1000)))
+
+    def cancelar(self):
+        """Cancela el redibujado pendiente."""
+        if self._pendiente is not None:
+            self.ventana.after_cancel(self._pendiente)
+            self._pendiente = None
+
+    def obtener_estadisticas(self):
+        """Retorna frames dibujados y actualizaciones coalescidas."""
+        return {
+            'frames': self.frames,
+            'actualizaciones': self.marcas,
+            'coalescidas': self.marcas - self.frames,
+            'omitidos_oculta': self.frames_omitidos_oculta
+        }
+
+    def _agendar(self, espera_ms):
+        self._pendiente = self.ventana.after(espera_ms, self._ejecutar)
+
+    def _ventana_visible(self):
+        """Verifica que la ventana no esté minimizada ni oculta."""
+        try:
+            return self.ventana.state() not in ('iconic', 'withdrawn') and self.ventana.winfo_viewable()
+        except Exception:
+            return False
+
+    def _ejecutar(self):
+        """Redibuja si hay cambios pendientes y la ventana es visible."""
+        self._pendiente = None
+        if not self._sucio:
+            return
+
+        if not self._ventana_visible():
+            # Conservar el estado sucio y volver a comprobar más tarde
+            self.frames_omitidos_oculta += 1
+            self._agendar(ConfigGraficas.INTERVALO_OCULTO)
+            return
+
+        self._sucio = False
+        self._ultimo_render = time.monotonic()
+        self.frames += 1
+        self.funcion_render()
+
+
+class RenderizadorBlit:
+    """Redibuja solo las líneas sobre los fondos cacheados de cada eje."""
+
+    def __init__(self, canvas, ejes, margen=ConfigGraficas.MARGEN_LIMITES):
+        self.canvas = canvas
+        self.ejes = list(ejes)
+        self.margen = margen
+        self._lineas_por_eje = {ax: [] for ax in self.ejes}
+        self._fondos = None
+
+        # Estadísticas
+        self.frames_blit = 0
+        self.redibujados_completos = 0
+
+        self.canvas.mpl_connect('draw_event', self._al_dibujar)
+        self.canvas.mpl_connect('resize_event', self.invalidar)
+
+    def actualizar(self, elementos):
+        """Actualiza las líneas con una lista de (eje, línea, x, y); un eje puede tener varias."""
+        lineas_por_eje = {ax: [] for ax in self.ejes}
+        rangos = {}
+        for ax, linea, x, y in elementos:
+            # Las líneas animadas quedan fuera del dibujado completo (y del fondo)
+            linea.set_animated(True)
+            linea.set_data(x, y)
+            lineas_por_eje[ax].append(linea)
+            if len(x):
+                rango = (x[0], x[-1], np.nanmin(y), np.nanmax(y))
+                previo = rangos.get(ax, rango)
+                rangos[ax] = (min(previo[0], rango[0]), max(previo[1], rango[1]),
+                              min(previo[2], rango[2]), max(previo[3], rango[3]))
+        self._lineas_por_eje = lineas_por_eje
+
+        limites_cambiados = False
+        for ax, rango in rangos.items():
+            limites_cambiados |= self._ajustar_limites(ax, *rango)
+
+        if limites_cambiados or self._fondos is None:
+            # Un dibujado completo regenera los fondos en _al_dibujar
+            self.redibujados_completos += 1
+            self.canvas.draw()
+            return
+
+        for ax, fondo in zip(self.ejes, self._fondos):
+            self.canvas.restore_region(fondo)
+            for linea in self._lineas_por_eje[ax]:
+                ax.draw_artist(linea)
+            self.canvas.blit(ax.bbox)
+        self.frames_blit += 1
+
+    def invalidar(self, evento=None):
+        """Descarta los fondos cacheados (al redimensionar o cambiar leyendas)."""
+        self._fondos = None
+
+    def _al_dibujar(self, evento):
+        """Cachea los fondos tras un dibujado completo y pinta las líneas encima."""
+        self._fondos = [self.canvas.copy_from_bbox(ax.bbox) for ax in self.ejes]
+        for ax in self.ejes:
+            for linea in self._lineas_por_eje[ax]:
+                ax.draw_artist(linea)
+
+    def _ajustar_limites(self, ax, x_min, x_max, y_min, y_max):
+        """Amplía o reduce los límites solo cuando los datos lo requieren."""
+        cambiado = False
+        nuevos_x = self._calcular_limites(ax.get_xlim(), x_min, x_max)
+        if nuevos_x is not None:
+            ax.set_xlim(nuevos_x)
+            cambiado = True
+
+        nuevos_y = self._calcular_limites(ax.get_ylim(), y_min, y_max)
+        if nuevos_y is not None:
+            ax.set_ylim(nuevos_y)
+            cambiado = True
+
+        return cambiado
+
+    def _calcular_limites(self, actuales, minimo, maximo):
+        """Retorna límites nuevos o None si los actuales siguen siendo válidos."""
+        if not (np.isfinite(minimo) and np.isfinite(maximo)):
+            return None
+
+        rango = maximo - minimo
+        if rango <= 0:
+            rango = max(abs(maximo), 1.0) * 0.1
+
+        # Se conservan mientras contengan los datos sin demasiada holgura
+        inferior, superior = actuales
+        if inferior <= minimo and maximo <= superior and superior - inferior <= rango * (1 + 4 * self.margen):
+            return None
+
+        return (minimo - rango * self.margen, maximo + rango * self.margen)
+
+
+class MotorSuavizado:
+    """Suaviza todos los canales a la vez con un operador cúbico precalculado."""
+
+    def __init__(self, puntos=ConfigGraficas.INTERPOLACION_PUNTOS):
+        self.puntos = puntos
+        self._operadores = OrderedDict()
+
+    def suavizar(self, x, canales, total=None):
+        """
+        Suaviza una matriz de canales con forma (canales, n).
+
+        Retorna (x_suave, canales_suaves). Con pocos puntos usa interpolación
+        cúbica, con más una media móvil y por encima del límite no suaviza.
+        """
+        n = canales.shape[1]
+        if not ConfigGraficas.INTERPOLACION or n < 4 or n > ConfigGraficas.SUAVIZADO_MAX_PUNTOS:
+            return x, canales
+
+        if n > ConfigGraficas.SUAVIZADO_MAX_CUBICO:
+            return x, self._media_movil(canales, ConfigGraficas.SUAVIZADO_VENTANA_MEDIA)
+
+        x_suave, operador = self._operador(n)
+        return x[0] + x_suave, canales @ operador.T
+
+    def _operador(self, n):
+        """Retorna la malla suave y la matriz (puntos, n) del spline cúbico para n muestras."""
+        if n in self._operadores:
+            self._operadores.move_to_end(n)
+            return self._operadores[n]
+
+        from scipy import interpolate
+
+        # El spline es lineal en los datos: evaluarlo sobre la identidad da el operador
+        x = np.arange(n, dtype=np.float64)
+        x_suave = np.linspace(0, n - 1, self.puntos)
+        operador = interpolate.make_interp_spline(x, np.eye(n), k=3)(x_suave)
+
+        self._operadores[n] = (x_suave, operador)
+        if len(self._operadores) > ConfigGraficas.SUAVIZADO_CACHE:
+            self._operadores.popitem(last=False)
+        return x_suave, operador
+
+    def _media_movil(self, canales, ventana):
+        """Media móvil centrada sobre todos los canales mediante sumas acumuladas."""
+        izquierda = ventana // 2
+        relleno = np.pad(canales, ((0, 0), (izquierda, ventana - 1 - izquierda)), mode='edge')
+        acumulado = np.cumsum(relleno, axis=1)
+        acumulado = np.concatenate([np.zeros((canales.shape[0], 1)), acumulado], axis=1)
+        return (acumulado[:, ventana:] - acumulado[:, :-ventana]) / ventana
+
+
+class SuavizadorIncremental:
+    """
+    Suavizado Catmull-Rom que solo recalcula los últimos segmentos.
+
+    Cada segmento entre dos muestras depende únicamente de sus cuatro vecinas,
+    así que al llegar una muestra nueva cambian solo los dos últimos segmentos.
+    Los segmentos se guardan en un buffer circular con doble escritura para que
+    la curva completa sea siempre una vista contigua.
+    """
+
+    def __init__(self, capacidad, subpuntos=ConfigGraficas.SUAVIZADO_SUBPUNTOS):
+        self.capacidad = capacidad
+        self.subpuntos = subpuntos
+        self._segmentos = None
+        self._total = 0
+        self.segmentos_recalculados = 0
+
+        # Pesos de Catmull-Rom para t = 1/K ... 1 (el inicio del segmento es el fin del anterior)
+        t = np.arange(1, subpuntos + 1, dtype=np.float64) / subpuntos
+        t2, t3 = t * t, t * t * t
+        self._pesos = 0.5 * np.stack([
+            -t + 2 * t2 - t3,
+            2 - 5 * t2 + 3 * t3,
+            t + 4 * t2 - 3 * t3,
+            -t2 + t3
+        ])
+        self._x = np.arange(1, capacidad * subpuntos + 1, dtype=np.float64) / subpuntos
+
+    def suavizar(self, x, canales, total):
+        """
+        Suaviza una matriz de canales (canales, n) cuya última muestra es la número `total`.
+
+        Retorna (x_suave, canales_suaves) como vistas sobre el buffer interno.
+        """
+        n = canales.shape[1]
+        if not ConfigGraficas.INTERPOLACION or n < 4:
+            self._total = 0
+            return x, canales
+
+        if self._segmentos is None or self._segmentos.shape[0] != canales.shape[0]:
+            self._segmentos = np.zeros((canales.shape[0], 2 * self.capacidad * self.subpuntos))
+            self._total = 0
+
+        nuevos = total - self._total
+        if nuevos == 0:
+            return self._vista(n, total)
+
+        # Reinicio (datos limpiados) o hueco mayor que la ventana: recalcular todo
+        desde = 0
+        if 0 < nuevos < n - 1 and self._total > 0:
+            # El último segmento anterior tenía su vecino derecho extrapolado
+            desde = n - 2 - nuevos
+
+        self._recalcular(canales, total, desde)
+        self._total = total
+        return self._vista(n, total)
+
+    def _recalcular(self, canales, total, desde):
+        """Recalcula los segmentos locales desde `desde` hasta n-2."""
+        n = canales.shape[1]
+        m = n - 1 - desde
+
+        # Vecinos p0..p3 de cada segmento, replicando los extremos
+        inicio = max(desde - 1, 0)
+        puntos = canales[:, inicio:n]
+        if desde == 0:
+            puntos = np.concatenate([canales[:, :1], puntos], axis=1)
+        puntos = np.concatenate([puntos, canales[:, -1:]], axis=1)
+
+        valores = sum(
+            puntos[:, i:i + m, None] * self._pesos[i]
+            for i in range(4)
+        ).reshape(canales.shape[0], m * self.subpuntos)
+
+        # Escribir cada segmento en su ranura y en la copia desplazada
+        k = self.subpuntos
+        primero = total - n + desde
+        ranuras = (primero + np.arange(m)) % self.capacidad
+        columnas = (ranuras[:, None] * k + np.arange(k)).ravel()
+        self._segmentos[:, columnas] = valores
+        self._segmentos[:, columnas + self.capacidad * k] = valores
+        self.segmentos_recalculados += m
+
+    def _vista(self, n, total):
+        """Vista contigua de los n-1 segmentos más recientes."""
+        k = self.subpuntos
+        ultimo = (total - 2) % self.capacidad
+        fin = (ultimo + 1 + self.capacidad) * k
+        longitud = (n - 1) * k
+        return self._x[:longitud], self._segmentos[:, fin - longitud:fin]
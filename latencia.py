@@ -0,0 +1,156 @@
+"""
+Módulo de Latencia
+Histogramas de latencia por etapa (lectura, parseo, almacenamiento, render) y tasa de muestras.
+"""
+
+import math
+import time
+from collections import deque
+import numpy as np
+from estilos import ConfigLatencia
+
+# Etapa -> (marca inicial, marca final) dentro del recorrido de una muestra
+ETAPAS = {
+    'parseo': ('t_lectura', 't_parseo'),
+    'cola': ('t_parseo', 't_almacen'),
+    'render': ('t_almacen', 't_render'),
+    'total': ('t_lectura', 't_render')
+}
+
+
+class HistogramaLatencia:
+    """Histograma de clases logarítmicas con conteo, suma y máximo (en segundos)."""
+
+    def __init__(self, minimo=ConfigLatencia.MIN_HISTOGRAMA, maximo=ConfigLatencia.MAX_HISTOGRAMA,
+                 clases_por_decada=ConfigLatencia.CLASES_POR_DECADA):
+        decadas = math.log10(maximo / minimo)
+        self.bordes = np.logspace(math.log10(minimo), math.log10(maximo),
+                                  int(round(decadas * clases_por_decada)) + 1)
+        # Clase 0: menores que el primer borde; última: mayores que el último
+        self.conteos = np.zeros(len(self.bordes) + 1, dtype=np.int64)
+        self.n = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+    def agregar(self, latencias):
+        """Agrega un arreglo de latencias (los NaN se ignoran)."""
+        latencias = latencias[np.isfinite(latencias)]
+        if not len(latencias):
+            return
+        self.conteos += np.bincount(np.searchsorted(self.bordes, latencias), minlength=len(self.conteos))
+        self.n += len(latencias)
+        self.suma += float(latencias.sum())
+        self.maximo = max(self.maximo, float(latencias.max()))
+
+    def percentil(self, p):
+        """Cota superior (borde de clase) del percentil `p` (0-100), None sin datos."""
+        if not self.n:
+            return None
+        clase = int(np.searchsorted(np.cumsum(self.conteos), self.n * p / 100))
+        return float(self.bordes[min(clase, len(self.bordes) - 1)])
+
+    def resumen(self):
+        """Conteo, media, percentiles y máximo en milisegundos."""
+        def ms(valor):
+            return None if valor is None else valor * 1000
+        return {
+            'muestras': self.n,
+            'media_ms': ms(self.suma / self.n if self.n else None),
+            'p50_ms': ms(self.percentil(50)),
+            'p95_ms': ms(self.percentil(95)),
+            'p99_ms': ms(self.percentil(99)),
+            'max_ms': ms(self.maximo if self.n else None),
+            'bordes_ms': (self.bordes * 1000).tolist(),
+            'conteos': self.conteos.tolist()
+        }
+
+    def limpiar(self):
+        self.conteos[:] = 0
+        self.n = 0
+        self.suma = 0.0
+        self.maximo = 0.0
+
+
+class MonitorLatencia:
+    """
+    Acumula la latencia de cada etapa a partir de las marcas monotónicas de
+    las muestras y mide la tasa de muestras almacenadas por segundo.
+
+    Las muestras almacenadas quedan pendientes hasta el siguiente render;
+    sin render (p. ej. sin interfaz) se descartan las más antiguas.
+    """
+
+    def __init__(self, ventana_tasa=ConfigLatencia.VENTANA_TASA,
+                 max_pendientes=ConfigLatencia.MAX_PENDIENTES_RENDER):
+        self.ventana_tasa = ventana_tasa
+        self.max_pendientes = max_pendientes
+        self.histogramas = {etapa: HistogramaLatencia() for etapa in ETAPAS}
+        self._llegadas = deque()      # (instante, muestras)
+        self._en_ventana = 0
+        self._primera_llegada = None
+        self._pendientes = deque()    # (t_lectura, t_almacen) por lote
+        self._n_pendientes = 0
+
+    def registrar_almacen(self, muestras, renderizar=True):
+        """Marca `t_almacen` en un lote recién almacenado y acumula parseo y cola."""
+        ahora = time.monotonic()
+        muestras['t_almacen'] = ahora
+        self.histogramas['parseo'].agregar(muestras['t_parseo'] - muestras['t_lectura'])
+        self.histogramas['cola'].agregar(muestras['t_almacen'] - muestras['t_parseo'])
+
+        if self._primera_llegada is None:
+            self._primera_llegada = ahora
+        self._llegadas.append((ahora, len(muestras)))
+        self._en_ventana += len(muestras)
+        self._expirar(ahora)
+
+        if renderizar:
+            self._pendientes.append((muestras['t_lectura'].copy(), ahora))
+            self._n_pendientes += len(muestras)
+            while self._n_pendientes > self.max_pendientes:
+                t_lectura, _ = self._pendientes.popleft()
+                self._n_pendientes -= len(t_lectura)
+
+    def registrar_render(self):
+        """Cierra las latencias de render y total de lo almacenado desde el último render."""
+        if not self._pendientes:
+            return
+        ahora = time.monotonic()
+        t_lectura = np.concatenate([lectura for lectura, _ in self._pendientes])
+        t_almacen = np.concatenate([np.full(len(lectura), almacen) for lectura, almacen in self._pendientes])
+        self._pendientes.clear()
+        self._n_pendientes = 0
+        self.histogramas['render'].agregar(ahora - t_almacen)
+        self.histogramas['total'].agregar(ahora - t_lectura)
+
+    def muestras_por_segundo(self):
+        """Tasa medida sobre los últimos `ventana_tasa` segundos."""
+        ahora = time.monotonic()
+        self._expirar(ahora)
+        if not self._llegadas:
+            return 0.0
+        # Al arrancar la ventana real es el tiempo desde la primera llegada, con un
+        # mínimo para que el primer lote (o una ráfaga acumulada) no dispare la tasa
+        transcurrido = max(ahora - self._primera_llegada, ConfigLatencia.MIN_DURACION_TASA)
+        return self._en_ventana / min(self.ventana_tasa, transcurrido)
+
+    def obtener(self):
+        """Tasa y resumen por etapa (ver HistogramaLatencia.resumen)."""
+        return {
+            'muestras_por_segundo': self.muestras_por_segundo(),
+            'etapas': {etapa: histograma.resumen() for etapa, histograma in self.histogramas.items()}
+        }
+
+    def limpiar(self):
+        for histograma in self.histogramas.values():
+            histograma.limpiar()
+        self._llegadas.clear()
+        self._en_ventana = 0
+        self._primera_llegada = None
+        self._pendientes.clear()
+        self._n_pendientes = 0
+
+    def _expirar(self, ahora):
+        limite = ahora - self.ventana_tasa
+        while self._llegadas and self._llegadas[0][0] < limite:
+            self._en_ventana -= self._llegadas.popleft()[1]
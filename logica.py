@@ -3,80 +3,434 @@ Módulo de Lógica de Negocio
 Maneja la comunicación serial, procesamiento de datos y operaciones del ESP32.
 """
 
+import os
+import selectors
 import serial
 import time
 import threading
+from collections import deque
 from datetime import datetime
-import csv
-import os
-from estilos import ConfigSerial, ARCHIVO_CSV, ENCABEZADOS_CSV, ConfigGraficas
+import numpy as np
+from estilos import (
+    ConfigSerial, ARCHIVO_CSV, ConfigGraficas, ConfigInterfaz, ConfigAlmacenamiento,
+    ConfigReproduccion
+)
+from almacenamiento import (
+    EscritorCSV, RegistroBinario, directorio_registro, ruta_por_dispositivo
+)
+from reproduccion import FuenteReproduccion
+from cargador import cargar_csv, consultar
+from estadisticas import EstadisticasMoviles
+from latencia import MonitorLatencia
+from protocolo import (
+    CAMPOS_MUESTRA, DecodificadorTramas, SINCRONIA, muestras_vacias, parsear_lineas,
+    tramas_a_muestras
+)
+
+
+class BufferCircular:
+    """Buffer circular columnar de capacidad fija con inserción O(1)."""
+    
+    def __init__(self, capacidad, columnas):
+        self.capacidad = capacidad
+        self.columnas = tuple(columnas)
+        self._indice_columna = {nombre: i for i, nombre in enumerate(self.columnas)}
+        
+        # Cada muestra se escribe dos veces (posición p y p + capacidad) para que
+        # las últimas N muestras formen siempre un bloque contiguo en memoria.
+        self._datos = np.zeros((len(self.columnas), 2 * capacidad), dtype=np.float64)
+        self._pos = 0
+        self.longitud = 0
+        self.total = 0
+    
+    def agregar(self, *valores):
+        """Agrega una muestra (un valor por columna)."""
+        pos = self._pos
+        self._datos[:, pos] = valores
+        self._datos[:, pos + self.capacidad] = valores
+        self._pos = pos + 1 if pos + 1 < self.capacidad else 0
+        if self.longitud < self.capacidad:
+            self.longitud += 1
+        self.total += 1
+    
+    def agregar_lote(self, matriz):
+        """Agrega un lote de muestras con forma (columnas, n)."""
+        matriz = np.asarray(matriz, dtype=np.float64)
+        n = matriz.shape[1]
+        if n == 0:
+            return
+        self.total += n
+        
+        # Solo las últimas `capacidad` muestras sobreviven
+        if n > self.capacidad:
+            matriz = matriz[:, -self.capacidad:]
+            self._pos = (self._pos + n - self.capacidad) % self.capacidad
+            n = self.capacidad
+        
+        indices = (self._pos + np.arange(n)) % self.capacidad
+        self._datos[:, indices] = matriz
+        self._datos[:, indices + self.capacidad] = matriz
+        self._pos = (self._pos + n) % self.capacidad
+        self.longitud = min(self.longitud + n, self.capacidad)
+    
+    def vista(self, columna):
+        """Retorna una vista ordenada (sin copia) de una columna."""
+        fin = self._pos + self.capacidad
+        return self._datos[self._indice_columna[columna], fin - self.longitud:fin]
+    
+    def vistas(self):
+        """Retorna una vista ordenada (sin copia) de todas las columnas."""
+        fin = self._pos + self.capacidad
+        return self._datos[:, fin - self.longitud:fin]
+    
+    def limpiar(self):
+        """Descarta todas las muestras almacenadas."""
+        self._pos = 0
+        self.longitud = 0
+        self.total = 0
+
+
+class PiramideMuestreo:
+    """
+    Pirámide de resoluciones para graficar historiales largos.
+    
+    El nivel 0 guarda las muestras crudas; cada nivel superior agrupa `factor`
+    elementos del anterior y guarda, por canal, el mínimo y el máximo del grupo
+    (conserva picos) y el punto elegido por LTTB (conserva la forma). Los
+    niveles se actualizan con cada lote y tienen capacidad fija, por lo que los
+    más gruesos cubren más tiempo.
+    """
+    
+    def __init__(self, canales=4, factor=ConfigGraficas.PIRAMIDE_FACTOR,
+                 niveles=ConfigGraficas.PIRAMIDE_NIVELES,
+                 capacidad=ConfigGraficas.PIRAMIDE_CAPACIDAD):
+        self.canales = canales
+        self.factor = factor
+        self.niveles = niveles
+        
+        # Min/max: filas [marca, min_0..min_c, max_0..max_c]
+        columnas_minmax = (['marca'] + [f'min_{i}' for i in range(canales)]
+                           + [f'max_{i}' for i in range(canales)])
+        self._minmax = [BufferCircular(capacidad, columnas_minmax) for _ in range(niveles)]
+        self._pendientes_minmax = [np.empty((len(columnas_minmax), 0)) for _ in range(niveles)]
+        
+        # LTTB: filas [x_0..x_c, y_0..y_c] (cada canal elige su propio punto).
+        # El nivel 0 de LTTB son las muestras crudas del nivel 0 de min/max.
+        columnas_lttb = [f'x_{i}' for i in range(canales)] + [f'y_{i}' for i in range(canales)]
+        self._lttb = [None] + [BufferCircular(capacidad, columnas_lttb) for _ in range(1, niveles)]
+        self._pendientes_lttb = [np.empty((2 * canales, 0)) for _ in range(niveles)]
+        self._retenidos = [None] * niveles   # Cubeta que espera a la siguiente
+        self._anclas = [None] * niveles      # Último punto elegido por canal
+    
+    def agregar_lote(self, marcas, canales):
+        """Agrega muestras (marcas (n,) y canales (c, n)) a todos los niveles."""
+        marcas = np.asarray(marcas, dtype=np.float64)
+        if not len(marcas):
+            return
+        canales = np.asarray(canales, dtype=np.float64)
+        self._minmax[0].agregar_lote(np.vstack([marcas, canales, canales]))
+        
+        hijos_minmax = np.vstack([marcas, canales, canales])
+        hijos_lttb = np.vstack([np.tile(marcas, (self.canales, 1)), canales])
+        for nivel in range(1, self.niveles):
+            hijos_minmax = self._agrupar_minmax(nivel, hijos_minmax)
+            hijos_lttb = self._agrupar_lttb(nivel, hijos_lttb)
+            if not hijos_minmax.shape[1] and not hijos_lttb.shape[1]:
+                break
+    
+    def obtener(self, desde=None, hasta=None, puntos=1000, modo=ConfigGraficas.PIRAMIDE_MODO):
+        """
+        Retorna (xs, ys): una lista de arreglos por canal con unos `puntos`
+        puntos como máximo para el rango [desde, hasta].
+        
+        Usa el nivel más fino que cubre el rango sin exceder `puntos`; la cola
+        aún no agrupada se completa con los niveles inferiores.
+        """
+        presupuesto = puntos // 2 if modo == 'minmax' else puntos
+        nivel = self._elegir_nivel(desde, hasta, presupuesto)
+        if modo == 'minmax' or nivel == 0:
+            return self._obtener_minmax(nivel, desde, hasta, duplicar=modo == 'minmax')
+        return self._obtener_lttb(nivel, desde, hasta)
+    
+    def limpiar(self):
+        """Descarta todos los niveles."""
+        self.__init__(self.canales, self.factor, self.niveles, self._minmax[0].capacidad)
+    
+    def _agrupar_minmax(self, nivel, hijos):
+        """Reduce grupos completos de `factor` hijos a su mínimo y máximo."""
+        todos = np.concatenate([self._pendientes_minmax[nivel], hijos], axis=1)
+        completos = todos.shape[1] // self.factor
+        self._pendientes_minmax[nivel] = todos[:, completos * self.factor:].copy()
+        if not completos:
+            return todos[:, :0]
+        
+        c = self.canales
+        grupos = todos[:, :completos * self.factor].reshape(len(todos), completos, self.factor)
+        resultado = np.empty((len(todos), completos))
+        resultado[0] = grupos[0, :, 0]
+        resultado[1:1 + c] = np.fmin.reduce(grupos[1:1 + c], axis=2)
+        resultado[1 + c:] = np.fmax.reduce(grupos[1 + c:], axis=2)
+        self._minmax[nivel].agregar_lote(resultado)
+        return resultado
+    
+    def _agrupar_lttb(self, nivel, hijos):
+        """Elige por LTTB un punto por cubeta una vez que llega la cubeta siguiente."""
+        todos = np.concatenate([self._pendientes_lttb[nivel], hijos], axis=1)
+        completos = todos.shape[1] // self.factor
+        self._pendientes_lttb[nivel] = todos[:, completos * self.factor:].copy()
+        if not completos:
+            return todos[:, :0]
+        
+        cubetas = todos[:, :completos * self.factor].reshape(len(todos), completos, self.factor)
+        elegidos = []
+        if self._anclas[nivel] is None:
+            # El primer punto de la serie siempre se conserva
+            self._anclas[nivel] = cubetas[:, 0, 0].copy()
+            elegidos.append(self._anclas[nivel][:, None])
+            cubetas = cubetas[:, 1:]
+        if self._retenidos[nivel] is not None:
+            cubetas = np.concatenate([self._retenidos[nivel][:, None], cubetas], axis=1)
+        
+        if cubetas.shape[1]:
+            self._retenidos[nivel] = cubetas[:, -1].copy()
+        if cubetas.shape[1] > 1:
+            puntos = self._elegir_lttb(self._anclas[nivel], cubetas[:, :-1], cubetas[:, 1:].mean(axis=2))
+            self._anclas[nivel] = puntos[:, -1].copy()
+            elegidos.append(puntos)
+        
+        if not elegidos:
+            return todos[:, :0]
+        resultado = np.concatenate(elegidos, axis=1)
+        self._lttb[nivel].agregar_lote(resultado)
+        return resultado
+    
+    def _elegir_lttb(self, ancla, cubetas, medias_siguientes):
+        """
+        Elige en cada cubeta el punto que forma el triángulo de mayor área con el
+        punto elegido en la cubeta anterior y el promedio de la siguiente.
+        
+        La dependencia con la elección anterior se resuelve en pasadas
+        vectorizadas: se parte del promedio de la cubeta anterior como ancla y
+        solo se recalculan las cubetas cuya ancla cambió. El resultado es
+        idéntico al LTTB secuencial.
+        """
+        c = self.canales
+        cantidad = cubetas.shape[1]
+        anclas = np.concatenate([ancla[:, None], cubetas[:, :-1].mean(axis=2)], axis=1)
+        puntos = np.empty((2 * c, cantidad))
+        filas = np.arange(c)[:, None]
+        
+        pendientes = np.arange(cantidad)
+        while len(pendientes):
+            xs, ys = cubetas[:c, pendientes], cubetas[c:, pendientes]
+            xa, ya = anclas[:c, pendientes, None], anclas[c:, pendientes, None]
+            xm = medias_siguientes[:c, pendientes, None]
+            ym = medias_siguientes[c:, pendientes, None]
+            areas = np.abs((xa - xm) * (ys - ya) - (xa - xs) * (ym - ya))
+            indices = np.argmax(np.nan_to_num(areas, nan=-1.0), axis=2)
+            columnas = np.arange(len(pendientes))[None, :]
+            elegidos = np.concatenate([xs[filas, columnas, indices], ys[filas, columnas, indices]])
+            puntos[:, pendientes] = elegidos
+            
+            # La elección de cada cubeta es el ancla de la siguiente
+            siguientes = pendientes + 1
+            validos = siguientes < cantidad
+            siguientes, elegidos = siguientes[validos], elegidos[:, validos]
+            previas = anclas[:, siguientes]
+            iguales = (previas == elegidos) | (np.isnan(previas) & np.isnan(elegidos))
+            cambiaron = ~iguales.all(axis=0)
+            anclas[:, siguientes[cambiaron]] = elegidos[:, cambiaron]
+            pendientes = siguientes[cambiaron]
+        return puntos
+    
+    def _elegir_nivel(self, desde, hasta, presupuesto):
+        """Nivel más fino que cubre [desde, hasta] con a lo sumo `presupuesto` elementos."""
+        for nivel in range(self.niveles):
+            buffer = self._minmax[nivel]
+            marcas = buffer.vista('marca')
+            # Cubre el rango si no ha descartado datos o su dato más viejo es anterior
+            cubre = buffer.total == buffer.longitud or (
+                desde is not None and len(marcas) and marcas[0] <= desde
+            )
+            inicio = 0 if desde is None else np.searchsorted(marcas, desde, 'left')
+            fin = len(marcas) if hasta is None else np.searchsorted(marcas, hasta, 'right')
+            if cubre and fin - inicio <= presupuesto:
+                return nivel
+        return self.niveles - 1
+    
+    def _obtener_minmax(self, nivel, desde, hasta, duplicar):
+        """Grupos del nivel más los pendientes de los niveles inferiores."""
+        partes = [self._minmax[nivel].vistas()]
+        partes.extend(self._pendientes_minmax[n] for n in range(nivel, 0, -1))
+        datos = np.concatenate(partes, axis=1)
+        datos = datos[:, self._mascara(datos[0], desde, hasta)]
+        
+        c = self.canales
+        if not duplicar:
+            return [datos[0]] * c, list(datos[1:1 + c])
+        # Cada grupo se dibuja como un trazo vertical mínimo -> máximo
+        x = np.repeat(datos[0], 2)
+        ys = [np.column_stack([datos[1 + i], datos[1 + c + i]]).ravel() for i in range(c)]
+        return [x] * c, ys
+    
+    def _obtener_lttb(self, nivel, desde, hasta):
+        """Puntos LTTB del nivel más la cola aún no elegida de los niveles inferiores."""
+        partes = [self._lttb[nivel].vistas()]
+        for n in range(nivel, 0, -1):
+            if self._retenidos[n] is not None:
+                partes.append(self._retenidos[n])
+            partes.append(self._pendientes_lttb[n])
+        datos = np.concatenate(partes, axis=1)
+        
+        c = self.canales
+        xs, ys = [], []
+        for i in range(c):
+            mascara = self._mascara(datos[i], desde, hasta)
+            xs.append(datos[i, mascara])
+            ys.append(datos[c + i, mascara])
+        return xs, ys
+    
+    def _mascara(self, x, desde, hasta):
+        mascara = np.ones(len(x), dtype=bool)
+        if desde is not None:
+            mascara &= x >= desde
+        if hasta is not None:
+            mascara &= x <= hasta
+        return mascara
 
 
 class GestorDatos:
     """Gestiona el almacenamiento y procesamiento de datos de los sensores."""
     
-    def __init__(self):
-        self.tiempos = []
-        self.temperaturas = []
-        self.humedades_amb = []
-        self.humedades_suelo = []
-        self.potenciometros = []
-        self._inicializar_csv()
-    
-    def _inicializar_csv(self):
-        """Crea el archivo CSV con encabezados si no existe."""
-        if not os.path.exists(ARCHIVO_CSV):
-            with open(ARCHIVO_CSV, 'w', newline='') as file:
-                writer = csv.writer(file)
-                writer.writerow(ENCABEZADOS_CSV)
-    
-    def agregar_datos(self, temp, hum_amb, hum_suelo, pot):
-        """Agrega nuevos datos a las listas y mantiene el límite de datos."""
-        self.temperaturas.append(temp)
-        self.humedades_amb.append(hum_amb)
-        self.humedades_suelo.append(hum_suelo)
-        self.potenciometros.append(pot)
-        self.tiempos.append(len(self.tiempos))
-        
-        # Limitar datos a los últimos N valores
-        if len(self.tiempos) > ConfigGraficas.MAX_DATOS:
-            self.temperaturas.pop(0)
-            self.humedades_amb.pop(0)
-            self.humedades_suelo.pop(0)
-            self.potenciometros.pop(0)
-            self.tiempos = list(range(len(self.temperaturas)))
-    
-    def guardar_csv(self, temp, hum_amb, hum_suelo, pot):
-        """Guarda los datos en el archivo CSV."""
-        timestamp = datetime.now()
-        with open(ARCHIVO_CSV, 'a', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow([
-                timestamp.strftime('%Y-%m-%d'),
-                timestamp.strftime('%H:%M:%S'),
-                f"{temp:.2f}",
-                f"{hum_amb:.2f}",
-                f"{hum_suelo:.2f}",
-                pot
-            ])
+    COLUMNAS = ('marca', 'temperatura', 'humedad_amb', 'humedad_suelo', 'potenciometro')
+    
+    def __init__(self, capacidad=None, archivo_csv=ARCHIVO_CSV, persistir=True):
+        """
+        Con `persistir` en False (p. ej. una reproducción) las muestras solo
+        se mantienen en memoria: no se abren el CSV ni el registro binario.
+        Sin `archivo_csv` se guardan desde que se llame a abrir_almacenamiento.
+        """
+        capacidad = capacidad or ConfigGraficas.MAX_DATOS
+        self.buffer = BufferCircular(capacidad, self.COLUMNAS)
+        self._indices = np.arange(capacidad, dtype=np.float64)
+        self.piramide = PiramideMuestreo() if ConfigGraficas.PIRAMIDE_ACTIVA else None
+        self.estadisticas = EstadisticasMoviles()
+        self.archivo_csv = None
+        self.escritor_csv = None
+        self.registro = None
+        if persistir and archivo_csv is not None:
+            self.abrir_almacenamiento(archivo_csv)
+    
+    def abrir_almacenamiento(self, archivo_csv):
+        """Abre el CSV (y el registro binario) donde se guardan los lotes."""
+        self.archivo_csv = archivo_csv
+        self.escritor_csv = EscritorCSV(archivo_csv)
+        if ConfigAlmacenamiento.BINARIO_ACTIVO:
+            self.registro = RegistroBinario(directorio_registro(archivo_csv))
+    
+    def agregar_datos(self, temp, hum_amb, hum_suelo, pot, marca=None):
+        """Agrega una muestra suelta (mismo camino que agregar_muestras)."""
+        if marca is None:
+            marca = time.time()
+        muestra = muestras_vacias(1)
+        muestra[CAMPOS_MUESTRA] = (temp, hum_amb, hum_suelo, pot, marca)
+        self.agregar_muestras(muestra)
+    
+    def agregar_muestras(self, muestras):
+        """Agrega un arreglo DTYPE_MUESTRA al buffer circular en una sola operación."""
+        matriz = np.vstack([
+            muestras['t_recv'],
+            muestras['temperatura'],
+            muestras['humedad_amb'],
+            muestras['humedad_suelo'],
+            muestras['potenciometro']
+        ])
+        self.buffer.agregar_lote(matriz)
+        self.estadisticas.agregar_lote(matriz[0], matriz[1:])
+        if self.piramide is not None:
+            self.piramide.agregar_lote(matriz[0], matriz[1:])
+    
+    def precargar(self, datos):
+        """Carga en el buffer arreglos columnares históricos (ver cargador.cargar_csv)."""
+        matriz = np.vstack([datos[columna] for columna in self.COLUMNAS])
+        self.buffer.agregar_lote(matriz)
+        self.estadisticas.agregar_lote(matriz[0], matriz[1:])
+        if self.piramide is not None:
+            self.piramide.agregar_lote(matriz[0], matriz[1:])
+    
+    def guardar_csv(self, temp, hum_amb, hum_suelo, pot, marca=None):
+        """Encola los datos para el escritor CSV en segundo plano."""
+        if self.escritor_csv is None:
+            return
+        if marca is None:
+            marca = time.time()
+        self.escritor_csv.escribir(marca, temp, hum_amb, hum_suelo, pot)
+    
+    def guardar_lote(self, muestras):
+        """Encola un arreglo DTYPE_MUESTRA para el escritor CSV y el registro binario."""
+        if self.escritor_csv is None:
+            return
+        self.escritor_csv.escribir_lote(muestras)
+        if self.registro is not None:
+            self.registro.escribir_lote(muestras)
     
     def obtener_datos(self):
-        """Retorna los datos actuales para las gráficas."""
+        """
+        Retorna los datos actuales para las gráficas.
+        
+        Los arreglos son vistas sobre el buffer: reflejan las escrituras
+        posteriores, por lo que deben copiarse si se quieren conservar.
+        """
+        buffer = self.buffer
         return {
-            'tiempos': self.tiempos,
-            'temperaturas': self.temperaturas,
-            'humedades_amb': self.humedades_amb,
-            'humedades_suelo': self.humedades_suelo,
-            'potenciometros': self.potenciometros
+            'tiempos': self._indices[:buffer.longitud],
+            'marcas': buffer.vista('marca'),
+            'temperaturas': buffer.vista('temperatura'),
+            'humedades_amb': buffer.vista('humedad_amb'),
+            'humedades_suelo': buffer.vista('humedad_suelo'),
+            'potenciometros': buffer.vista('potenciometro'),
+            'canales': buffer.vistas()[1:],
+            'total': buffer.total
         }
     
+    def obtener_historial(self, segundos, puntos, modo=ConfigGraficas.PIRAMIDE_MODO):
+        """
+        Retorna (xs, ys) por canal de los últimos `segundos` reducidos a unos
+        `puntos` puntos, o None si no hay pirámide o datos.
+        """
+        if self.piramide is None or not self.buffer.longitud:
+            return None
+        hasta = self.buffer.vista('marca')[-1]
+        return self.piramide.obtener(hasta - segundos, hasta, puntos, modo)
+    
+    def consultar(self, t0, t1, canales=None):
+        """
+        Retorna como arreglos NumPy las muestras ya volcadas a disco con marca
+        en [t0, t1), por canal (ver cargador.consultar). None si no se guarda en disco.
+        """
+        if self.archivo_csv is None:
+            return None
+        return consultar(self.archivo_csv, t0, t1, canales)
+    
     def limpiar_datos(self):
         """Limpia todos los datos almacenados."""
-        self.tiempos.clear()
-        self.temperaturas.clear()
-        self.humedades_amb.clear()
-        self.humedades_suelo.clear()
-        self.potenciometros.clear()
+        self.buffer.limpiar()
+        self.estadisticas.limpiar()
+        if self.piramide is not None:
+            self.piramide.limpiar()
+    
+    def obtener_estadisticas_csv(self):
+        """Retorna las estadísticas del escritor CSV (None si no se persiste)."""
+        if self.escritor_csv is None:
+            return None
+        return self.escritor_csv.obtener_estadisticas()
+    
+    def cerrar(self):
+        """Vuelca los datos pendientes y libera los archivos."""
+        if self.escritor_csv is not None:
+            self.escritor_csv.cerrar()
+        if self.registro is not None:
+            self.registro.cerrar()
 
 
 class ComunicacionSerial:
@@ -86,45 +440,84 @@ class ComunicacionSerial:
         self.serial_port = None
         self.is_running = False
         self.thread = None
+        self.bucle = None
+        self._buffer_rx = bytearray()
+        self._t_lectura = None
+        self._lock_conexion = threading.Lock()
+        
+        # Protocolo: 'ascii', 'binario' o 'auto' (se detecta con los primeros bytes)
+        self.protocolo = ConfigSerial.PROTOCOLO
+        self._protocolo_activo = None
+        self.decodificador = DecodificadorTramas()
+        self.lineas_validas = 0
+        self.lineas_invalidas = 0
+        self.lineas_error = 0
         self.callbacks = {
-            'on_data_received': None,
+            'on_batch_received': None,
             'on_connection_success': None,
             'on_connection_error': None,
             'on_disconnect': None
         }
     
-    def conectar(self, puerto):
-        """Establece la conexión serial con el ESP32."""
+    def conectar(self, puerto, bucle=None):
+        """
+        Establece la conexión serial con el ESP32.
+        
+        Si se indica un `bucle` (BucleES) el puerto se atiende desde ese hilo
+        compartido; si no, se crea un hilo lector propio.
+        """
         try:
             self.serial_port = serial.Serial(
                 puerto, 
                 ConfigSerial.BAUDRATE, 
-                timeout=ConfigSerial.TIMEOUT
+                timeout=ConfigSerial.TIMEOUT_LECTURA,
+                write_timeout=ConfigSerial.TIMEOUT
             )
             time.sleep(ConfigSerial.DELAY_CONEXION)
             
+            self._protocolo_activo = None if self.protocolo == 'auto' else self.protocolo
+            self.decodificador = DecodificadorTramas()
             self.is_running = True
+            self._buffer_rx.clear()
             
-            # Iniciar hilo de lectura
-            self.thread = threading.Thread(target=self._leer_datos, daemon=True)
-            self.thread.start()
-            
+            # Se avisa antes del primer lote (p. ej. para abrir el almacenamiento)
             if self.callbacks['on_connection_success']:
                 self.callbacks['on_connection_success'](puerto)
             
+            # Iniciar lectura (bucle compartido o hilo propio)
+            if bucle is not None:
+                self.bucle = bucle
+                bucle.agregar(self)
+            else:
+                self.thread = threading.Thread(target=self._leer_datos, daemon=True)
+                self.thread.start()
+            
             return True, f"Conectado exitosamente a {puerto}"
             
         except Exception as e:
-            return False, f"No se pudo conectar: {str(e)}"
+            mensaje = f"No se pudo conectar a {puerto}: {str(e)}"
+            if self.serial_port is not None:
+                self.serial_port.close()
+                self.serial_port = None
+            if self.callbacks['on_connection_error']:
+                self.callbacks['on_connection_error'](mensaje)
+            return False, mensaje
     
     def desconectar(self):
-        """Cierra la conexión serial."""
-        self.is_running = False
-        if self.serial_port:
-            self.serial_port.close()
-            self.serial_port = None
+        """
+        Cierra la conexión serial (desde la interfaz o desde el hilo lector
+        cuando el puerto falla); el aviso de desconexión se emite una sola vez.
+        """
+        with self._lock_conexion:
+            self.is_running = False
+            if self.bucle is not None:
+                self.bucle.quitar(self)
+                self.bucle = None
+            puerto, self.serial_port = self.serial_port, None
+            if puerto is not None:
+                puerto.close()
         
-        if self.callbacks['on_disconnect']:
+        if puerto is not None and self.callbacks['on_disconnect']:
             self.callbacks['on_disconnect']()
     
     def enviar_comando(self, comando):
@@ -143,25 +536,117 @@ class ComunicacionSerial:
         return self.enviar_comando('0')
     
     def _leer_datos(self):
-        """Hilo que lee continuamente los datos del puerto serial."""
+        """Hilo que lee en bloque los bytes disponibles del puerto serial."""
+        self._buffer_rx.clear()
         while self.is_running:
             try:
-                if self.serial_port and self.serial_port.in_waiting > 0:
-                    linea = self.serial_port.readline().decode('latin-1').strip()
-                    
-                    # Ignorar líneas de error
-                    if linea.startswith("Error"):
-                        continue
-                    
-                    # Parsear datos
-                    datos = self._parsear_datos(linea)
-                    if datos and self.callbacks['on_data_received']:
-                        self.callbacks['on_data_received'](datos)
+                puerto = self.serial_port
+                if puerto is None:
+                    break
+                
+                # Bloquea hasta recibir al menos un byte (o vencer el timeout)
+                # y toma de una vez todo lo que ya esté en el buffer del SO.
+                pendientes = min(puerto.in_waiting, ConfigSerial.TAM_LECTURA)
+                bloque = puerto.read(max(1, pendientes))
+                if bloque:
+                    self._procesar_bloque(bloque)
                         
             except Exception as e:
-                print(f"Error leyendo datos: {e}")
-            
-            time.sleep(0.05)
+                if self.is_running:
+                    print(f"Error leyendo datos: {e}")
+                    time.sleep(ConfigSerial.TIMEOUT_LECTURA)
+    
+    def leer_disponible(self, listo=False):
+        """
+        Lee sin esperar los bytes ya recibidos (usado por el bucle compartido).
+        
+        `listo` indica que el descriptor se reportó legible; si entonces no hay
+        bytes, la lectura lanza la excepción de puerto desconectado.
+        Retorna True si se leyeron datos.
+        """
+        puerto = self.serial_port
+        if puerto is None or not self.is_running:
+            return False
+        
+        pendientes = puerto.in_waiting
+        if not pendientes and not listo:
+            return False
+        
+        self._procesar_bloque(puerto.read(min(max(pendientes, 1), ConfigSerial.TAM_LECTURA)))
+        return True
+    
+    def _procesar_bloque(self, bloque):
+        """Agrega los bytes recibidos y procesa las líneas o tramas completas."""
+        self._t_lectura = time.monotonic()
+        buffer = self._buffer_rx
+        buffer += bloque
+        
+        if self._protocolo_activo is None and not self._detectar_protocolo():
+            return
+        
+        if self._protocolo_activo == 'binario':
+            self._procesar_tramas()
+        else:
+            self._procesar_lineas()
+    
+    def _detectar_protocolo(self):
+        """Determina el protocolo a partir de los bytes acumulados."""
+        buffer = self._buffer_rx
+        
+        # Una trama con CRC correcto es inequívoca (0xAA no aparece en texto ASCII)
+        if SINCRONIA in buffer:
+            tramas, _ = DecodificadorTramas().decodificar(buffer)
+            if len(tramas):
+                self._protocolo_activo = 'binario'
+                return True
+        
+        for linea in buffer.split(b'\n')[:-1]:
+            if self._parsear_datos(linea.decode('latin-1').strip()):
+                self._protocolo_activo = 'ascii'
+                return True
+        
+        if len(buffer) > ConfigSerial.MAX_DETECCION:
+            self._protocolo_activo = 'ascii'
+            return True
+        return False
+    
+    def _procesar_tramas(self):
+        """Decodifica todas las tramas binarias completas del buffer."""
+        buffer = self._buffer_rx
+        tramas, consumidos = self.decodificador.decodificar(buffer)
+        del buffer[:consumidos]
+        
+        if len(tramas):
+            self._notificar_lote(tramas_a_muestras(tramas, time.time()))
+    
+    def _procesar_lineas(self):
+        """Parsea en lote las líneas completas y conserva el resto para la siguiente lectura."""
+        buffer = self._buffer_rx
+        
+        fin = buffer.rfind(b'\n')
+        if fin < 0:
+            # Sin salto de línea: descartar ruido que nunca formará una línea
+            if len(buffer) > ConfigSerial.MAX_LINEA:
+                buffer.clear()
+            return
+        
+        bloque = bytes(buffer[:fin])
+        del buffer[:fin + 1]
+        
+        muestras, invalidas, errores = parsear_lineas(bloque, time.time())
+        self.lineas_validas += len(muestras)
+        self.lineas_invalidas += invalidas
+        self.lineas_error += errores
+        
+        if len(muestras):
+            self._notificar_lote(muestras)
+    
+    def _notificar_lote(self, muestras):
+        """Marca la lectura y el parseo y entrega el arreglo DTYPE_MUESTRA al callback registrado."""
+        muestras['t_lectura'] = self._t_lectura
+        muestras['t_parseo'] = time.monotonic()
+        if self.callbacks['on_batch_received']:
+            self.callbacks['on_batch_received'](muestras)
     
     def _parsear_datos(self, linea):
         """Parsea la línea recibida y extrae los valores de los sensores."""
@@ -186,69 +671,474 @@ class ComunicacionSerial:
     def esta_conectado(self):
         """Verifica si hay una conexión activa."""
         return self.serial_port is not None and self.serial_port.is_open
+    
+    def obtener_estadisticas(self):
+        """Retorna el protocolo detectado y los contadores de recepción."""
+        return {
+            'protocolo': self._protocolo_activo,
+            'lineas_validas': self.lineas_validas,
+            'lineas_invalidas': self.lineas_invalidas,
+            'lineas_error': self.lineas_error,
+            **self.decodificador.obtener_estadisticas()
+        }
+
+
+class BucleES:
+    """
+    Hilo único que atiende todos los puertos seriales conectados.
+    
+    En POSIX espera con `selectors` sobre los descriptores de los puertos;
+    en otras plataformas recorre los puertos y duerme brevemente si ninguno
+    tiene datos.
+    """
+    
+    def __init__(self):
+        self._comunicaciones = []
+        self._lock = threading.Lock()
+        self._selector = selectors.DefaultSelector() if os.name == 'posix' else None
+        self._activo = False
+        self._hilo = None
+    
+    def iniciar(self):
+        """Inicia el hilo del bucle si no está en marcha."""
+        if self._activo:
+            return
+        self._activo = True
+        self._hilo = threading.Thread(target=self._ejecutar, daemon=True)
+        self._hilo.start()
+    
+    def detener(self):
+        """Detiene el hilo del bucle."""
+        self._activo = False
+        if self._hilo is not None:
+            self._hilo.join(ConfigSerial.TIMEOUT_LECTURA * 5)
+            self._hilo = None
+    
+    def agregar(self, comunicacion):
+        """Empieza a atender el puerto de una ComunicacionSerial conectada."""
+        with self._lock:
+            self._comunicaciones.append(comunicacion)
+            if self._selector is not None:
+                self._selector.register(comunicacion.serial_port.fileno(), selectors.EVENT_READ, comunicacion)
+        self.iniciar()
+    
+    def quitar(self, comunicacion):
+        """Deja de atender un puerto (antes de cerrarlo)."""
+        with self._lock:
+            if comunicacion not in self._comunicaciones:
+                return
+            self._comunicaciones.remove(comunicacion)
+            if self._selector is not None:
+                try:
+                    self._selector.unregister(comunicacion.serial_port.fileno())
+                except (KeyError, ValueError, AttributeError):
+                    pass
+    
+    def _ejecutar(self):
+        """Atiende los puertos con datos hasta que se detenga el bucle."""
+        while self._activo:
+            if self._selector is not None:
+                listas = [clave.data for clave, _ in self._selector.select(ConfigSerial.TIMEOUT_LECTURA)]
+            else:
+                with self._lock:
+                    listas = list(self._comunicaciones)
+            
+            hubo_datos = False
+            for comunicacion in listas:
+                try:
+                    hubo_datos |= comunicacion.leer_disponible(listo=self._selector is not None)
+                except Exception as e:
+                    print(f"Error leyendo datos: {e}")
+                    # Un puerto caído quedaría siempre "listo": cerrarlo y avisar
+                    comunicacion.desconectar()
+            
+            if self._selector is None and not hubo_datos:
+                time.sleep(ConfigSerial.ESPERA_SONDEO)
+
+
+class Dispositivo:
+    """Un ESP32 con su conexión, buffer de datos y archivo CSV propios."""
+    
+    def __init__(self, nombre, archivo_csv=ARCHIVO_CSV, comunicacion=None, persistir=True,
+                 asignar_archivo=None):
+        """
+        Sin `archivo_csv`, `asignar_archivo(dispositivo)` abre el almacenamiento
+        la primera vez que la conexión tiene éxito, antes del primer lote.
+        """
+        self.nombre = nombre
+        # Cualquier fuente con la interfaz de ComunicacionSerial (p. ej. FuenteReproduccion)
+        self.comunicacion = comunicacion or ComunicacionSerial()
+        self.gestor_datos = GestorDatos(archivo_csv=archivo_csv, persistir=persistir)
+        
+        # Cola de lotes hilo lector -> hilo de la interfaz
+        self._cola_muestras = deque()
+        self._muestras_en_cola = 0
+        self._lock_cola = threading.Lock()
+        self.muestras_descartadas = 0
+        # La fuente reinició su línea de tiempo (búsqueda o nueva reproducción)
+        self._reiniciar = False
+        
+        # Eventos de conexión hilo lector -> hilo de la interfaz
+        self._eventos = deque()
+        self.conectando = False
+        self._asignar_archivo = asignar_archivo if persistir and archivo_csv is None else None
+        
+        self.comunicacion.registrar_callback('on_batch_received', self._procesar_datos_recibidos)
+        self.comunicacion.registrar_callback('on_connection_success', self._al_conectar)
+        for evento in ('on_connection_error', 'on_disconnect'):
+            self.comunicacion.registrar_callback(evento, self._encolador(evento))
+        self.comunicacion.registrar_callback('on_reset', self._reiniciar_datos)
+    
+    def _encolador(self, evento):
+        """Callback que solo encola el evento; se entrega en procesar_pendientes."""
+        def encolar(*argumentos):
+            self._eventos.append((evento, argumentos))
+        return encolar
+    
+    def _al_conectar(self, puerto):
+        """Abre el almacenamiento si aún no tiene archivo y encola el aviso."""
+        if self._asignar_archivo is not None and self.gestor_datos.escritor_csv is None:
+            self._asignar_archivo(self)
+        self._eventos.append(('on_connection_success', (puerto,)))
+    
+    def esperando_archivo(self):
+        """True si aún no se conectó nunca y su archivo está por asignar."""
+        return self._asignar_archivo is not None and self.gestor_datos.escritor_csv is None
+    
+    def extraer_eventos(self):
+        """Retira los eventos de conexión pendientes en orden de llegada."""
+        eventos = []
+        while self._eventos:
+            eventos.append(self._eventos.popleft())
+        return eventos
+    
+    def _reiniciar_datos(self):
+        """
+        Descarta lo encolado y pide limpiar los datos en memoria antes del
+        siguiente lote (hilo lector; la limpieza ocurre en extraer_pendientes).
+        """
+        with self._lock_cola:
+            self._cola_muestras.clear()
+            self._muestras_en_cola = 0
+            self._reiniciar = True
+    
+    def _procesar_datos_recibidos(self, muestras):
+        """Procesa un lote DTYPE_MUESTRA recibido del ESP32 (hilo lector)."""
+        # Persistir y entregar a la interfaz sin tocar widgets desde este hilo
+        self.gestor_datos.guardar_lote(muestras)
+        
+        with self._lock_cola:
+            self._cola_muestras.append(muestras)
+            self._muestras_en_cola += len(muestras)
+            
+            # Si la interfaz se atrasa se descartan los lotes más antiguos
+            while self._muestras_en_cola > ConfigInterfaz.MAX_COLA_MUESTRAS:
+                descartado = self._cola_muestras.popleft()
+                self._muestras_en_cola -= len(descartado)
+                self.muestras_descartadas += len(descartado)
+    
+    def extraer_pendientes(self, maximo):
+        """Retira de la cola hasta `maximo` muestras como un único arreglo."""
+        lotes = []
+        n = 0
+        with self._lock_cola:
+            reiniciar, self._reiniciar = self._reiniciar, False
+            while self._cola_muestras and n < maximo:
+                lote = self._cola_muestras.popleft()
+                if n + len(lote) > maximo:
+                    corte = maximo - n
+                    self._cola_muestras.appendleft(lote[corte:])
+                    lote = lote[:corte]
+                lotes.append(lote)
+                n += len(lote)
+            self._muestras_en_cola -= n
+        
+        # Buffer, pirámide y estadísticas son de marcas crecientes: se reinician
+        if reiniciar:
+            self.gestor_datos.limpiar_datos()
+        
+        if not lotes:
+            return None
+        return lotes[0] if len(lotes) == 1 else np.concatenate(lotes)
+    
+    def cerrar(self):
+        """Desconecta y vuelca los datos pendientes."""
+        if self.comunicacion.esta_conectado():
+            self.comunicacion.desconectar()
+        self.gestor_datos.cerrar()
 
 
 class ControladorSistema:
-    """Controlador principal que coordina la lógica del sistema."""
+    """Controlador principal que coordina uno o varios ESP32."""
     
     def __init__(self):
-        self.gestor_datos = GestorDatos()
-        self.comunicacion = ComunicacionSerial()
+        self.dispositivos = {}
+        self.bucle_es = BucleES()
+        
+        # Dispositivos graficados (None: todos)
+        self.seleccion = None
+        
+        # Latencia por etapa y tasa de muestras (el render lo marca la interfaz)
+        self.latencia = MonitorLatencia()
+        
+        # Historial de ARCHIVO_CSV graficado antes de que se conecte un dispositivo
+        self.historial = None
+        self._datos_historial = None
+        self._historiales_cargados = deque()   # Hilo de carga -> hilo de la interfaz
+        self._por_precargar = set()
+        self._lock_archivos = threading.Lock()
         
         # Callbacks para la interfaz
         self.ui_callbacks = {
             'actualizar_valores': None,
             'actualizar_graficas': None,
-            'agregar_registro': None
+            'actualizar_estadisticas': None,
+            'agregar_registro': None,
+            'historial_cargado': None
         }
+        self._callbacks_comunicacion = {}
     
     def inicializar(self):
-        """Inicializa el controlador y registra callbacks internos."""
-        self.comunicacion.registrar_callback(
-            'on_data_received', 
-            self._procesar_datos_recibidos
-        )
+        """Inicializa el controlador y arranca el bucle de E/S compartido."""
+        self.bucle_es.iniciar()
     
-    def conectar_esp32(self, puerto):
-        """Conecta al ESP32 en el puerto especificado."""
-        return self.comunicacion.conectar(puerto)
+    def agregar_dispositivo(self, nombre, archivo_csv=None, comunicacion=None, precargar=True,
+                            persistir=True):
+        """
+        Registra un dispositivo con nombre (o retorna el existente).
+        
+        Sin `archivo_csv` el archivo se elige al conectarse por primera vez:
+        el primer dispositivo que se conecta escribe en ARCHIVO_CSV y los
+        demás en uno propio con su nombre como sufijo. Con `precargar` se
+        carga el historial reciente del archivo (solo para puertos seriales);
+        sin `persistir` las muestras no se guardan en disco.
+        """
+        if nombre in self.dispositivos:
+            return self.dispositivos[nombre]
+        
+        dispositivo = Dispositivo(nombre, archivo_csv, comunicacion, persistir, self._asignar_archivo)
+        if precargar and persistir and comunicacion is None:
+            if archivo_csv is None:
+                # Se precarga al entregar su primer aviso de conexión
+                self._por_precargar.add(nombre)
+            else:
+                self._precargar(dispositivo)
+        self.dispositivos[nombre] = dispositivo
+        return dispositivo
     
-    def desconectar_esp32(self):
-        """Desconecta del ESP32."""
-        self.comunicacion.desconectar()
+    def _asignar_archivo(self, dispositivo):
+        """Abre el almacenamiento del dispositivo que se acaba de conectar (hilo de conexión)."""
+        with self._lock_archivos:
+            archivo = ARCHIVO_CSV
+            if self._archivo_en_uso(archivo):
+                archivo = ruta_por_dispositivo(ARCHIVO_CSV, dispositivo.nombre)
+            dispositivo.gestor_datos.abrir_almacenamiento(archivo)
     
-    def encender_led(self):
-        """Enciende el LED del ESP32."""
-        return self.comunicacion.encender_led()
+    def _precargar(self, dispositivo):
+        """Carga en el buffer las últimas PRECARGA_HORAS del archivo del dispositivo."""
+        archivo = dispositivo.gestor_datos.archivo_csv
+        if archivo == ARCHIVO_CSV and self._datos_historial is not None:
+            # Ya cargado para las gráficas iniciales; nadie escribió desde entonces
+            datos = self._datos_historial
+        elif ConfigAlmacenamiento.PRECARGA_HORAS:
+            desde = time.time() - ConfigAlmacenamiento.PRECARGA_HORAS * 3600
+            datos = cargar_csv(archivo, desde)
+        else:
+            return
+        dispositivo.gestor_datos.precargar(datos)
     
-    def apagar_led(self):
-        """Apaga el LED del ESP32."""
-        return self.comunicacion.apagar_led()
+    def precargar_historial(self, esperar=False):
+        """
+        Grafica el historial reciente de ARCHIVO_CSV sin registrar ningún
+        dispositivo; el primero que se conecte y escriba en ese archivo lo
+        adopta.
+        
+        La lectura ocurre en un hilo aparte y el historial se entrega en
+        procesar_pendientes (callback 'historial_cargado' con las muestras
+        cargadas). Con `esperar` se carga en el hilo actual. Retorna False si
+        no hay nada que precargar.
+        """
+        if not ConfigAlmacenamiento.PRECARGA_HORAS or self._archivo_en_uso(ARCHIVO_CSV):
+            return False
+        
+        if esperar:
+            self._entregar_historial(*self._cargar_historial())
+        else:
+            threading.Thread(
+                target=lambda: self._historiales_cargados.append(self._cargar_historial()), daemon=True
+            ).start()
+        return True
+    
+    def _cargar_historial(self):
+        """Lee el historial y arma su GestorDatos en memoria (hilo de carga)."""
+        desde = time.time() - ConfigAlmacenamiento.PRECARGA_HORAS * 3600
+        datos = cargar_csv(ARCHIVO_CSV, desde)
+        gestor = GestorDatos(persistir=False)
+        gestor.precargar(datos)
+        return datos, gestor
+    
+    def _entregar_historial(self, datos, gestor):
+        """Publica el historial cargado (hilo de la interfaz)."""
+        # Si un dispositivo adoptó ARCHIVO_CSV mientras se cargaba, ya precargó el suyo
+        if not self._archivo_en_uso(ARCHIVO_CSV):
+            self._datos_historial = datos
+            self.historial = gestor
+            if self.ui_callbacks['actualizar_graficas']:
+                self.ui_callbacks['actualizar_graficas'](self.obtener_datos_actuales())
+        if self.ui_callbacks['historial_cargado']:
+            self.ui_callbacks['historial_cargado'](len(datos['marca']))
+    
+    def _archivo_en_uso(self, archivo):
+        return any(d.gestor_datos.archivo_csv == archivo for d in list(self.dispositivos.values()))
+    
+    def conectar_esp32(self, puerto, nombre=None, esperar=False):
+        """
+        Conecta un ESP32 en el puerto especificado (nombre por defecto: el puerto).
+        
+        La apertura (con la espera de reinicio del ESP32) ocurre en un hilo
+        aparte; el resultado llega como evento 'on_connection_success' u
+        'on_connection_error' en procesar_pendientes. Con `esperar` se abre
+        en el hilo actual y se retorna el resultado.
+        """
+        dispositivo = self.agregar_dispositivo(nombre or puerto)
+        if dispositivo.conectando:
+            return False, f"{dispositivo.nombre} ya se está conectando"
+        if dispositivo.comunicacion.esta_conectado():
+            return False, f"{dispositivo.nombre} ya está conectado"
+        
+        dispositivo.conectando = True
+        if esperar:
+            return self._abrir_puerto(dispositivo, puerto)
+        threading.Thread(target=self._abrir_puerto, args=(dispositivo, puerto), daemon=True).start()
+        return True, f"Conectando a {puerto}..."
     
-    def _procesar_datos_recibidos(self, datos):
-        """Procesa los datos recibidos del ESP32."""
-        temp = datos['temperatura']
-        hum_amb = datos['humedad_amb']
-        hum_suelo = datos['humedad_suelo']
-        pot = datos['potenciometro']
+    def _abrir_puerto(self, dispositivo, puerto):
+        try:
+            return dispositivo.comunicacion.conectar(puerto, self.bucle_es)
+        finally:
+            dispositivo.conectando = False
+    
+    def reproducir(self, origen, velocidad=ConfigReproduccion.VELOCIDAD,
+                   nombre=ConfigReproduccion.NOMBRE):
+        """
+        Reproduce un CSV o registro binario guardado como un dispositivo más.
         
-        # Guardar datos
-        self.gestor_datos.agregar_datos(temp, hum_amb, hum_suelo, pot)
-        self.gestor_datos.guardar_csv(temp, hum_amb, hum_suelo, pot)
+        Las muestras recorren el mismo camino que las del puerto serial pero
+        no se vuelven a guardar: sus marcas son históricas y retroceden en
+        cada búsqueda, lo que rompería el CSV, su índice y el registro binario.
+        """
+        dispositivo = self.agregar_dispositivo(nombre, comunicacion=FuenteReproduccion(velocidad),
+                                               persistir=False)
+        if dispositivo.comunicacion.esta_conectado():
+            return False, f"{dispositivo.nombre} ya está en curso"
+        dispositivo.comunicacion.establecer_velocidad(velocidad)
+        return dispositivo.comunicacion.conectar(origen)
+    
+    def desconectar_esp32(self, nombre=None):
+        """Desconecta un ESP32 (o todos si no se indica nombre)."""
+        for dispositivo in self._destinos(nombre):
+            if dispositivo.comunicacion.esta_conectado():
+                dispositivo.comunicacion.desconectar()
+    
+    def encender_led(self, nombre=None):
+        """Enciende el LED de un ESP32 (o de todos los conectados)."""
+        resultados = [d.comunicacion.encender_led() for d in self._destinos(nombre)]
+        return any(resultados)
+    
+    def apagar_led(self, nombre=None):
+        """Apaga el LED de un ESP32 (o de todos los conectados)."""
+        resultados = [d.comunicacion.apagar_led() for d in self._destinos(nombre)]
+        return any(resultados)
+    
+    def seleccionar_dispositivos(self, nombres=None):
+        """Define qué dispositivos se grafican (None: todos)."""
+        self.seleccion = list(nombres) if nombres is not None else None
+    
+    def nombres_seleccionados(self):
+        """Retorna los nombres de los dispositivos graficados."""
+        if self.seleccion is None:
+            return list(self.dispositivos)
+        return [nombre for nombre in self.seleccion if nombre in self.dispositivos]
+    
+    def procesar_pendientes(self, maximo=ConfigInterfaz.MAX_MUESTRAS_POR_CICLO):
+        """
+        Drena las colas de todos los dispositivos y notifica a la interfaz una
+        sola vez por ciclo.
+        
+        Debe llamarse desde el hilo de la interfaz. Retorna las muestras procesadas.
+        """
+        while self._historiales_cargados:
+            self._entregar_historial(*self._historiales_cargados.popleft())
+        
+        seleccionados = self.nombres_seleccionados()
+        varios = len(self.dispositivos) > 1
+        total = 0
+        ultima = None
+        origen_ultima = None
+        graficas_sucias = False
+        
+        for nombre, dispositivo in list(self.dispositivos.items()):
+            # Conexiones, errores y desconexiones avisados desde otros hilos
+            for evento, argumentos in dispositivo.extraer_eventos():
+                if evento == 'on_connection_success':
+                    self._al_conectar(dispositivo)
+                elif evento == 'on_connection_error' and dispositivo.esperando_archivo():
+                    # Nunca se conectó: no queda registrado ni como serie vacía
+                    del self.dispositivos[nombre]
+                    self._por_precargar.discard(nombre)
+                if self._callbacks_comunicacion.get(evento):
+                    self._callbacks_comunicacion[evento](*argumentos)
+            
+            muestras = dispositivo.extraer_pendientes(maximo)
+            if muestras is None:
+                continue
+            
+            dispositivo.gestor_datos.agregar_muestras(muestras)
+            self.latencia.registrar_almacen(muestras, renderizar=nombre in seleccionados)
+            total += len(muestras)
+            
+            if nombre in seleccionados:
+                graficas_sucias = True
+                if ultima is None:
+                    ultima = muestras[-1]
+                    origen_ultima = dispositivo
+            
+            if self.ui_callbacks['agregar_registro']:
+                prefijo = f"{nombre} " if varios else ""
+                for temp, hum_amb, hum_suelo, pot, marca in muestras[CAMPOS_MUESTRA].tolist():
+                    timestamp = datetime.fromtimestamp(marca).strftime('%H:%M:%S')
+                    registro = (f"[{timestamp}] {prefijo}T:{temp:.1f}°C | H.Amb:{hum_amb:.1f}% | "
+                               f"H.Suelo:{hum_suelo:.1f}% | Pot:{int(pot)}")
+                    self.ui_callbacks['agregar_registro'](registro)
         
         # Notificar a la interfaz
-        if self.ui_callbacks['actualizar_valores']:
+        if ultima is not None and self.ui_callbacks['actualizar_valores']:
+            temp, hum_amb, hum_suelo, pot, _ = ultima[CAMPOS_MUESTRA].tolist()
             self.ui_callbacks['actualizar_valores'](temp, hum_amb, hum_suelo, pot)
         
-        if self.ui_callbacks['actualizar_graficas']:
-            datos_grafica = self.gestor_datos.obtener_datos()
-            self.ui_callbacks['actualizar_graficas'](datos_grafica)
+        if origen_ultima is not None and self.ui_callbacks['actualizar_estadisticas']:
+            self.ui_callbacks['actualizar_estadisticas'](origen_ultima.gestor_datos.estadisticas.obtener())
+        
+        if graficas_sucias and self.ui_callbacks['actualizar_graficas']:
+            self.ui_callbacks['actualizar_graficas'](self.obtener_datos_actuales())
         
-        if self.ui_callbacks['agregar_registro']:
-            timestamp = datetime.now().strftime('%H:%M:%S')
-            registro = (f"[{timestamp}] T:{temp:.1f}°C | H.Amb:{hum_amb:.1f}% | "
-                       f"H.Suelo:{hum_suelo:.1f}% | Pot:{pot}")
-            self.ui_callbacks['agregar_registro'](registro)
+        return total
+    
+    def _al_conectar(self, dispositivo):
+        """Precarga pendiente del dispositivo; el historial inicial pasa a ser suyo."""
+        if dispositivo.nombre in self._por_precargar:
+            self._por_precargar.discard(dispositivo.nombre)
+            self._precargar(dispositivo)
+        if dispositivo.gestor_datos.archivo_csv == ARCHIVO_CSV and self.historial is not None:
+            self.historial = self._datos_historial = None
+    
+    def marcar_render(self):
+        """La interfaz avisa que dibujó los datos almacenados hasta ahora."""
+        self.latencia.registrar_render()
+    
+    def obtener_latencias(self):
+        """Tasa de muestras/s y latencias por etapa (lectura, parseo, cola, render)."""
+        return self.latencia.obtener()
     
     def registrar_callback_ui(self, evento, funcion):
         """Registra callbacks para actualizar la interfaz."""
@@ -256,13 +1146,56 @@ class ControladorSistema:
             self.ui_callbacks[evento] = funcion
     
     def registrar_callback_comunicacion(self, evento, funcion):
-        """Registra callbacks para eventos de comunicación."""
-        self.comunicacion.registrar_callback(evento, funcion)
+        """
+        Registra callbacks para eventos de comunicación de todos los dispositivos.
+        
+        Se llaman desde procesar_pendientes (hilo de la interfaz), nunca desde
+        los hilos lectores.
+        """
+        self._callbacks_comunicacion[evento] = funcion
+    
+    def obtener_gestor(self, nombre):
+        """GestorDatos de un dispositivo o del historial inicial."""
+        if nombre == ConfigAlmacenamiento.NOMBRE_HISTORIAL and nombre not in self.dispositivos:
+            return self.historial
+        return self.dispositivos[nombre].gestor_datos
+    
+    def nombres_graficados(self):
+        """Dispositivos seleccionados más el historial inicial mientras se muestra."""
+        nombres = self.nombres_seleccionados()
+        if self.historial is not None and self.seleccion is None:
+            nombres.insert(0, ConfigAlmacenamiento.NOMBRE_HISTORIAL)
+        return nombres
     
     def obtener_datos_actuales(self):
-        """Obtiene los datos actuales almacenados."""
-        return self.gestor_datos.obtener_datos()
+        """Obtiene los datos almacenados de los dispositivos graficados, por nombre."""
+        return {
+            nombre: self.obtener_gestor(nombre).obtener_datos()
+            for nombre in self.nombres_graficados()
+        }
+    
+    def obtener_historial(self, segundos, puntos):
+        """Historial reducido de los dispositivos graficados, por nombre."""
+        historial = {}
+        for nombre in self.nombres_graficados():
+            datos = self.obtener_gestor(nombre).obtener_historial(segundos, puntos)
+            if datos is not None:
+                historial[nombre] = datos
+        return historial
     
     def esta_conectado(self):
-        """Verifica si el sistema está conectado."""
-        return self.comunicacion.esta_conectado()
+        """Verifica si algún dispositivo está conectado."""
+        return any(d.comunicacion.esta_conectado() for d in self.dispositivos.values())
+    
+    def cerrar(self):
+        """Desconecta y vuelca los datos pendientes antes de salir."""
+        for dispositivo in self.dispositivos.values():
+            dispositivo.cerrar()
+        self.bucle_es.detener()
+    
+    def _destinos(self, nombre):
+        """Dispositivos afectados por una orden (todos si nombre es None)."""
+        if nombre is None:
+            return list(self.dispositivos.values())
+        dispositivo = self.dispositivos.get(nombre)
+        return [dispositivo] if dispositivo else []
@@ -3,18 +3,23 @@ System Monitor v2 - Dashboard Minimalista Profesional
 Interfaz de monitoreo de sensores ESP32 con diseño moderno.
 """
 
+import time
+
+# Referencia para el reporte de arranque (antes de las importaciones pesadas)
+INICIO_PROCESO = time.perf_counter()
+
+import os
 import customtkinter as ctk
 from datetime import datetime
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.figure import Figure
-import numpy as np
-from scipy import interpolate
 
 from logica import ControladorSistema
+from reproduccion import es_registro
+from graficas import PlanificadorRender, RenderizadorBlit, MotorSuavizado, SuavizadorIncremental
+from componentes import ConsolaEventos, ActualizadorTarjetas
 from estilos import (
     APPEARANCE_MODE, COLOR_THEME, WINDOW_TITLE, WINDOW_SIZE, WINDOW_MIN_SIZE,
     Colores, Fuentes, Dimensiones, Espaciado, Textos, Iconos,
-    ConfigGraficas, CORNER_RADIUS, CORNER_RADIUS_SM, Animaciones
+    ConfigGraficas, ConfigInterfaz, ConfigLatencia, ConfigTarjetas, CORNER_RADIUS, CORNER_RADIUS_SM, Animaciones
 )
 
 
@@ -48,12 +53,32 @@ class InterfazSistema:
         # Crear interfaz
         self._crear_interfaz()
 
+        # Redibujado de gráficas limitado a ConfigGraficas.FPS_MAX
+        self.tiempos_arranque = {}
+        self._datos_graficas = None
+        self._motores_suavizado = {}
+        self._ventana_historial = None
+        self.planificador_render = PlanificadorRender(self.window, self._renderizar_graficas)
+
+        # Cierre ordenado (vuelca el CSV pendiente)
+        self.window.protocol("WM_DELETE_WINDOW", self._al_cerrar)
+
+        # Bombeo periódico de muestras desde el hilo serial
+        self._bombear_datos()
+        self._refrescar_latencias()
+
+        # Las gráficas (matplotlib) se construyen cuando la ventana ya está visible
+        self.window.after_idle(self._al_mostrar_ventana)
+
     def _registrar_callbacks(self):
         """Registra los callbacks entre la lógica y la interfaz."""
         self.controlador.registrar_callback_ui('actualizar_valores', self._actualizar_valores_ui)
         self.controlador.registrar_callback_ui('actualizar_graficas', self._actualizar_graficas_ui)
+        self.controlador.registrar_callback_ui('actualizar_estadisticas', self._actualizar_estadisticas_ui)
         self.controlador.registrar_callback_ui('agregar_registro', self._agregar_registro_ui)
+        self.controlador.registrar_callback_ui('historial_cargado', self._on_historial_cargado)
         self.controlador.registrar_callback_comunicacion('on_connection_success', self._on_conexion_exitosa)
+        self.controlador.registrar_callback_comunicacion('on_connection_error', self._on_error_conexion)
         self.controlador.registrar_callback_comunicacion('on_disconnect', self._on_desconexion)
 
     def _crear_interfaz(self):
@@ -121,13 +146,25 @@ class InterfazSistema:
         right_frame = ctk.CTkFrame(navbar_inner, fg_color="transparent")
         right_frame.pack(side="right", fill="y")
 
-        # Auto-sync info
-        ctk.CTkLabel(
+        # Tasa medida de muestras (clic: muestra u oculta las latencias por etapa)
+        self.label_latencias = ctk.CTkLabel(
             right_frame,
-            text=Textos.AUTO_SYNC,
+            text="",
             font=Fuentes.TEXTO_PEQUENO,
             text_color=Colores.TEXTO_TERCIARIO
-        ).pack(side="left", padx=Espaciado.PADDING_MD)
+        )
+        self.label_tasa = ctk.CTkLabel(
+            right_frame,
+            text=Textos.TASA_DEFAULT,
+            font=Fuentes.TEXTO_PEQUENO,
+            text_color=Colores.TEXTO_TERCIARIO,
+            cursor="hand2"
+        )
+        self.label_tasa.pack(side="left", padx=Espaciado.PADDING_MD)
+        self.label_tasa.bind("<Button-1>", self._alternar_latencias)
+        self._latencias_visibles = False
+        if ConfigLatencia.OVERLAY_VISIBLE:
+            self._alternar_latencias()
 
         # Botón Reset View
         ctk.CTkButton(
@@ -262,6 +299,52 @@ class InterfazSistema:
         )
         self.btn_stop.pack(side="left")
 
+        # Selector de dispositivo graficado
+        ctk.CTkLabel(
+            contenido,
+            text=Textos.DISPOSITIVO_GRAFICADO,
+            font=Fuentes.TEXTO_PEQUENO,
+            text_color=Colores.TEXTO_TERCIARIO
+        ).pack(anchor="w", pady=(Espaciado.PADDING_MD, Espaciado.PADDING_XS))
+
+        self.selector_dispositivo = ctk.CTkOptionMenu(
+            contenido,
+            values=[Textos.TODOS_DISPOSITIVOS],
+            font=Fuentes.TEXTO_NORMAL,
+            fg_color=Colores.FONDO_INPUT,
+            button_color=Colores.BTN_PRIMARIO,
+            button_hover_color=Colores.BTN_PRIMARIO_HOVER,
+            text_color=Colores.TEXTO_PRINCIPAL,
+            dropdown_fg_color=Colores.FONDO_PANEL,
+            height=Dimensiones.INPUT_HEIGHT,
+            corner_radius=CORNER_RADIUS_SM,
+            command=self._seleccionar_dispositivo
+        )
+        self.selector_dispositivo.pack(fill="x")
+
+        # Ventana de tiempo graficada (en vivo o historial reducido)
+        ctk.CTkLabel(
+            contenido,
+            text=Textos.VENTANA_GRAFICADA,
+            font=Fuentes.TEXTO_PEQUENO,
+            text_color=Colores.TEXTO_TERCIARIO
+        ).pack(anchor="w", pady=(Espaciado.PADDING_MD, Espaciado.PADDING_XS))
+
+        self.selector_ventana = ctk.CTkOptionMenu(
+            contenido,
+            values=list(ConfigGraficas.VENTANAS_HISTORIAL),
+            font=Fuentes.TEXTO_NORMAL,
+            fg_color=Colores.FONDO_INPUT,
+            button_color=Colores.BTN_PRIMARIO,
+            button_hover_color=Colores.BTN_PRIMARIO_HOVER,
+            text_color=Colores.TEXTO_PRINCIPAL,
+            dropdown_fg_color=Colores.FONDO_PANEL,
+            height=Dimensiones.INPUT_HEIGHT,
+            corner_radius=CORNER_RADIUS_SM,
+            command=self._seleccionar_ventana
+        )
+        self.selector_ventana.pack(fill="x")
+
     def _crear_seccion_actuadores(self, parent):
         """Crea la sección de actuadores (LED)."""
         frame = ctk.CTkFrame(
@@ -373,6 +456,21 @@ class InterfazSistema:
             command=self._limpiar_consola
         ).pack(side="right")
 
+        # Filtro (se aplica sobre el registro en memoria, no sobre el widget)
+        self.filtro_consola = ctk.CTkEntry(
+            frame,
+            font=Fuentes.TEXTO_PEQUENO,
+            fg_color=Colores.FONDO_INPUT,
+            border_color=Colores.BORDE_SUTIL,
+            text_color=Colores.TEXTO_PRINCIPAL,
+            placeholder_text=Textos.FILTRO_CONSOLA,
+            placeholder_text_color=Colores.TEXTO_MUTED,
+            height=28,
+            corner_radius=CORNER_RADIUS_SM
+        )
+        self.filtro_consola.pack(fill="x", padx=Espaciado.PADDING_LG, pady=(0, Espaciado.PADDING_SM))
+        self.filtro_consola.bind("<KeyRelease>", self._filtrar_consola)
+
         # Consola
         self.consola = ctk.CTkTextbox(
             frame,
@@ -384,6 +482,7 @@ class InterfazSistema:
             wrap="word"
         )
         self.consola.pack(fill="both", expand=True, padx=Espaciado.PADDING_LG, pady=(0, Espaciado.PADDING_LG))
+        self.consola_eventos = ConsolaEventos(self.consola)
 
         # Mensajes iniciales
         self._log_consola("> Sistema inicializado...")
@@ -418,11 +517,19 @@ class InterfazSistema:
         ]
 
         self.labels_valores = {}
+        self.labels_estadisticas = {}
+        self.tarjetas = ActualizadorTarjetas()
+        self.tarjetas.registrar("tasa", self.label_tasa)
+        self.tarjetas.registrar("latencias", self.label_latencias)
 
         for i, (titulo, valor, unidad, color, key) in enumerate(tarjetas_config):
             tarjeta = self._crear_tarjeta_valor(frame, titulo, valor, unidad, color)
             tarjeta.grid(row=0, column=i, sticky="nsew", padx=(0 if i == 0 else Espaciado.PADDING_SM, 0))
             self.labels_valores[key] = tarjeta.label_valor
+            self.labels_estadisticas[key] = tarjeta.label_estadisticas
+            self.tarjetas.registrar(key, tarjeta.label_valor, ConfigTarjetas.INTERVALO_VALORES.get(key))
+            self.tarjetas.registrar(("estadisticas", key), tarjeta.label_estadisticas,
+                                    ConfigTarjetas.INTERVALO_ESTADISTICAS)
 
     def _crear_tarjeta_valor(self, parent, titulo, valor, unidad, color):
         """Crea una tarjeta individual de valor."""
@@ -477,20 +584,67 @@ class InterfazSistema:
             text_color=Colores.TEXTO_TERCIARIO
         ).pack(side="left", anchor="s", pady=(0, 5))
 
+        # Estadísticas móviles de la ventana de las tarjetas
+        label_estadisticas = ctk.CTkLabel(
+            contenido,
+            text=Textos.ESTADISTICAS_DEFAULT,
+            font=Fuentes.TEXTO_PEQUENO,
+            text_color=Colores.TEXTO_TERCIARIO
+        )
+        label_estadisticas.pack(anchor="w")
+
         frame.label_valor = label_valor
+        frame.label_estadisticas = label_estadisticas
         return frame
 
     # ==================== GRÁFICAS ====================
     def _crear_graficas(self, parent):
-        """Crea el grid de gráficas 2x2."""
-        frame = ctk.CTkFrame(
+        """Crea el contenedor de las gráficas con un aviso mientras se carga matplotlib."""
+        self.frame_graficas = ctk.CTkFrame(
             parent,
             fg_color=Colores.FONDO_PANEL,
             corner_radius=CORNER_RADIUS,
             border_width=1,
             border_color=Colores.BORDE_SUTIL
         )
-        frame.pack(fill="both", expand=True)
+        self.frame_graficas.pack(fill="both", expand=True)
+
+        self.aviso_graficas = ctk.CTkLabel(
+            self.frame_graficas,
+            text=Textos.CARGANDO_GRAFICAS,
+            font=Fuentes.TEXTO_NORMAL,
+            text_color=Colores.TEXTO_TERCIARIO
+        )
+        self.aviso_graficas.pack(expand=True)
+
+        # Se asignan en _construir_graficas
+        self.fig = None
+        self.canvas = None
+        self.renderizador_blit = None
+        self._ejes = []
+        self._lineas = {}
+
+    def _al_mostrar_ventana(self):
+        """Registra el tiempo hasta la ventana y agenda las gráficas y el historial."""
+        self.tiempos_arranque['ventana'] = time.perf_counter() - INICIO_PROCESO
+        self.window.after(ConfigInterfaz.RETARDO_GRAFICAS, self._construir_graficas)
+
+        # Historial reciente de ARCHIVO_CSV en segundo plano (llega por procesar_pendientes)
+        if not self.controlador.precargar_historial():
+            self.tiempos_arranque['precarga'] = self.tiempos_arranque['ventana']
+
+    def _on_historial_cargado(self, muestras):
+        """Callback cuando el historial inicial ya está en memoria."""
+        if 'precarga' not in self.tiempos_arranque:
+            self.tiempos_arranque['precarga'] = time.perf_counter() - INICIO_PROCESO
+            self._reportar_arranque()
+
+    def _construir_graficas(self):
+        """Importa matplotlib y crea el grid de gráficas 2x2 en lugar del aviso."""
+        inicio = time.perf_counter()
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from matplotlib.figure import Figure
+        self.tiempos_arranque['importacion'] = time.perf_counter() - inicio
 
         # Crear figura de matplotlib
         self.fig = Figure(
@@ -514,18 +668,94 @@ class InterfazSistema:
         self._configurar_subplot(self.ax3, Textos.GRAF_HUMEDAD_SUELO, Colores.HUMEDAD_SUELO)
         self._configurar_subplot(self.ax4, Textos.GRAF_POTENCIOMETRO, Colores.POTENCIOMETRO)
 
-        # Crear líneas vacías
-        self.line1, = self.ax1.plot([], [], color=Colores.TEMPERATURA, linewidth=Dimensiones.GRAFICA_LINEWIDTH)
-        self.line2, = self.ax2.plot([], [], color=Colores.HUMEDAD_AMBIENTE, linewidth=Dimensiones.GRAFICA_LINEWIDTH)
-        self.line3, = self.ax3.plot([], [], color=Colores.HUMEDAD_SUELO, linewidth=Dimensiones.GRAFICA_LINEWIDTH)
-        self.line4, = self.ax4.plot([], [], color=Colores.POTENCIOMETRO, linewidth=Dimensiones.GRAFICA_LINEWIDTH)
+        # Las líneas se crean por dispositivo graficado (ver _reconstruir_lineas)
+        self._ejes = [self.ax1, self.ax2, self.ax3, self.ax4]
+        self._colores_ejes = [Colores.TEMPERATURA, Colores.HUMEDAD_AMBIENTE, Colores.HUMEDAD_SUELO, Colores.POTENCIOMETRO]
+        self._lineas = {}
 
         self.fig.tight_layout(pad=1.5)
 
-        # Canvas
-        self.canvas = FigureCanvasTkAgg(self.fig, master=frame)
+        # Canvas en lugar del aviso
+        self.aviso_graficas.destroy()
+        self.canvas = FigureCanvasTkAgg(self.fig, master=self.frame_graficas)
         self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=Espaciado.PADDING_SM, pady=Espaciado.PADDING_SM)
 
+        # Blitting: fondos cacheados, solo se redibujan las líneas
+        if ConfigGraficas.BLIT:
+            self.renderizador_blit = RenderizadorBlit(self.canvas, self._ejes)
+
+        self.canvas.draw()
+        self.window.update_idletasks()
+        self.tiempos_arranque['graficas'] = time.perf_counter() - INICIO_PROCESO
+        self._reportar_arranque()
+
+        # Datos recibidos mientras se cargaba la figura
+        if self._datos_graficas is not None:
+            self.planificador_render.marcar_sucio()
+
+    def _reportar_arranque(self):
+        """
+        Muestra los tiempos de arranque y los acumula en ConfigInterfaz.REPORTE_ARRANQUE
+        (una vez que terminaron tanto las gráficas como el historial).
+        """
+        if not {'graficas', 'precarga'} <= self.tiempos_arranque.keys():
+            return
+        mensaje = Textos.FORMATO_ARRANQUE.format(**self.tiempos_arranque)
+        self._log_consola(mensaje)
+
+        ruta = ConfigInterfaz.REPORTE_ARRANQUE
+        if not ruta:
+            return
+        try:
+            nuevo = not os.path.exists(ruta)
+            with open(ruta, 'a', encoding='utf-8') as archivo:
+                if nuevo:
+                    archivo.write("Fecha,Ventana_s,Graficas_s,Importacion_s,Precarga_s\n")
+                archivo.write(
+                    f"{datetime.now().strftime('%Y-%m-%d %H:%M:%S')},"
+                    f"{self.tiempos_arranque['ventana']:.3f},"
+                    f"{self.tiempos_arranque['graficas']:.3f},"
+                    f"{self.tiempos_arranque['importacion']:.3f},"
+                    f"{self.tiempos_arranque['precarga']:.3f}\n"
+                )
+        except OSError as e:
+            print(f"Error guardando el reporte de arranque: {e}")
+
+    def _reconstruir_lineas(self, nombres):
+        """Crea las 4 líneas de cada dispositivo graficado (un trazo por dispositivo)."""
+        for lineas in self._lineas.values():
+            for linea in lineas:
+                linea.remove()
+        self._lineas = {}
+
+        for i, nombre in enumerate(nombres):
+            estilo = ConfigGraficas.ESTILOS_DISPOSITIVO[i % len(ConfigGraficas.ESTILOS_DISPOSITIVO)]
+            self._lineas[nombre] = [
+                ax.plot([], [], color=color, linewidth=Dimensiones.GRAFICA_LINEWIDTH,
+                        linestyle=estilo, label=nombre)[0]
+                for ax, color in zip(self._ejes, self._colores_ejes)
+            ]
+
+        # Leyenda solo si hay más de un dispositivo en pantalla
+        leyenda = self.ax1.get_legend()
+        if leyenda is not None:
+            leyenda.remove()
+        if len(nombres) > 1:
+            self.ax1.legend(loc='upper left', fontsize=8, frameon=False, labelcolor=Colores.TEXTO_SECUNDARIO)
+
+        if self.renderizador_blit is not None:
+            self.renderizador_blit.invalidar()
+
+    def _motor_suavizado(self, nombre):
+        """Retorna el motor de suavizado de un dispositivo (el incremental guarda estado)."""
+        if nombre not in self._motores_suavizado:
+            if ConfigGraficas.SUAVIZADO_MODO == 'incremental':
+                capacidad = self.controlador.obtener_gestor(nombre).buffer.capacidad
+                self._motores_suavizado[nombre] = SuavizadorIncremental(capacidad)
+            else:
+                self._motores_suavizado[nombre] = MotorSuavizado()
+        return self._motores_suavizado[nombre]
+
     def _configurar_subplot(self, ax, titulo, color):
         """Configura un subplot con el estilo minimalista."""
         ax.set_facecolor(Colores.FONDO_GRAFICA)
@@ -567,20 +797,6 @@ class InterfazSistema:
         # Color del indicador en título
         ax.title.set_color(color)
 
-    def _suavizar_datos(self, x, y):
-        """Interpola los datos para líneas más suaves."""
-        if len(x) < 4:
-            return x, y
-
-        try:
-            # Crear interpolación cúbica
-            f = interpolate.interp1d(x, y, kind='cubic', fill_value='extrapolate')
-            x_smooth = np.linspace(min(x), max(x), ConfigGraficas.INTERPOLACION_PUNTOS)
-            y_smooth = f(x_smooth)
-            return x_smooth, y_smooth
-        except:
-            return x, y
-
     # ==================== ANIMACIÓN DE PULSO ====================
     def _iniciar_pulso(self):
         """Inicia la animación de pulso del indicador de conexión."""
@@ -627,27 +843,41 @@ class InterfazSistema:
 
     # ==================== MÉTODOS DE CONTROL ====================
     def _conectar_serial(self):
-        """Conecta al puerto serial seleccionado."""
-        puerto = self.puerto_entry.get().strip().upper()
-        exito, mensaje = self.controlador.conectar_esp32(puerto)
-
-        if exito:
-            self.estado_label.configure(text=Textos.ESTADO_ONLINE, text_color=Colores.CONECTADO)
-            self._iniciar_pulso()
-            self.btn_start.configure(state="disabled")
-            self.btn_stop.configure(
-                fg_color=Colores.BTN_PRIMARIO,
-                text_color=Colores.BTN_PRIMARIO_TEXTO
-            )
-
-        timestamp = datetime.now().strftime('%H:%M:%S')
-        simbolo = ">" if exito else "!"
-        self._log_consola(f"[{timestamp}] {simbolo} {mensaje}")
-
-    def _desconectar_serial(self):
-        """Desconecta del puerto serial."""
-        self.controlador.desconectar_esp32()
+        """
+        Conecta a los puertos seriales indicados (separados por comas).
+
+        Un archivo CSV o un directorio de registro binario se reproduce en
+        lugar de abrir un puerto; las rutas de dispositivo (/dev/ttyUSB0,
+        /dev/pts/N) se abren como puertos.
+        """
+        puertos = [p.strip() for p in self.puerto_entry.get().split(',') if p.strip()]
+
+        # Los puertos se abren en segundo plano: el estado en línea lo fija _on_conexion_exitosa
+        for puerto in puertos:
+            if es_registro(puerto):
+                exito, mensaje = self.controlador.reproducir(puerto)
+            else:
+                # Solo los nombres de Windows (com3 -> COM3); las rutas POSIX distinguen mayúsculas
+                exito, mensaje = self.controlador.conectar_esp32(puerto if puerto.startswith('/') else puerto.upper())
+
+            timestamp = datetime.now().strftime('%H:%M:%S')
+            simbolo = ">" if exito else "!"
+            self._log_consola(f"[{timestamp}] {simbolo} {mensaje}")
+
+        self._actualizar_selector_dispositivos()
+
+    def _mostrar_conectado(self):
+        """Estado en línea: indicador, pulso y botones."""
+        self.estado_label.configure(text=Textos.ESTADO_ONLINE, text_color=Colores.CONECTADO)
+        self._iniciar_pulso()
+        self.btn_start.configure(state="disabled")
+        self.btn_stop.configure(
+            fg_color=Colores.BTN_PRIMARIO,
+            text_color=Colores.BTN_PRIMARIO_TEXTO
+        )
 
+    def _mostrar_desconectado(self):
+        """Estado fuera de línea: permite volver a conectar."""
         self.estado_label.configure(text=Textos.ESTADO_OFFLINE, text_color=Colores.TEXTO_SECUNDARIO)
         self._detener_pulso()
         self.btn_start.configure(state="normal")
@@ -656,9 +886,33 @@ class InterfazSistema:
             text_color=Colores.BTN_SECUNDARIO_TEXTO
         )
 
+    def _desconectar_serial(self):
+        """Desconecta todos los puertos seriales."""
+        self.controlador.desconectar_esp32()
+        self._mostrar_desconectado()
+
         timestamp = datetime.now().strftime('%H:%M:%S')
         self._log_consola(f"[{timestamp}] > Transmisión suspendida por el usuario.")
 
+    def _actualizar_selector_dispositivos(self):
+        """Refleja en el selector los dispositivos registrados."""
+        self.selector_dispositivo.configure(
+            values=[Textos.TODOS_DISPOSITIVOS] + list(self.controlador.dispositivos)
+        )
+
+    def _seleccionar_dispositivo(self, valor):
+        """Cambia el dispositivo (o todos) que se grafica."""
+        if valor == Textos.TODOS_DISPOSITIVOS:
+            self.controlador.seleccionar_dispositivos(None)
+        else:
+            self.controlador.seleccionar_dispositivos([valor])
+        self._actualizar_graficas_ui(self.controlador.obtener_datos_actuales())
+
+    def _seleccionar_ventana(self, valor):
+        """Cambia entre la ventana en vivo y un historial (en segundos)."""
+        self._ventana_historial = ConfigGraficas.VENTANAS_HISTORIAL[valor]
+        self._actualizar_graficas_ui(self.controlador.obtener_datos_actuales())
+
     def _toggle_led(self):
         """Alterna el estado del LED."""
         self._led_estado = self.led_switch.get()
@@ -674,55 +928,130 @@ class InterfazSistema:
 
     def _limpiar_consola(self):
         """Limpia el contenido de la consola."""
-        self.consola.delete("1.0", "end")
+        self.consola_eventos.limpiar()
         self._log_consola("> Consola limpiada.")
 
+    def _filtrar_consola(self, event=None):
+        """Aplica el texto del filtro sobre el registro de eventos."""
+        self.consola_eventos.filtrar(self.filtro_consola.get())
+
     def _log_consola(self, mensaje, color=None):
-        """Añade un mensaje a la consola."""
-        self.consola.insert("end", mensaje + "\n")
-        self.consola.see("end")
+        """Añade un mensaje a la consola (se inserta en lote en el próximo ciclo)."""
+        self.consola_eventos.registrar(mensaje)
+
+    # ==================== BOMBEO DE DATOS ====================
+    def _bombear_datos(self):
+        """Drena en lote las muestras recibidas y reprograma el siguiente ciclo."""
+        try:
+            self.controlador.procesar_pendientes()
+            self.consola_eventos.volcar()
+            self.tarjetas.volcar()
+        except Exception as e:
+            print(f"Error procesando datos: {e}")
+        self._bombeo_id = self.window.after(ConfigInterfaz.INTERVALO_BOMBEO, self._bombear_datos)
+
+    def _refrescar_latencias(self):
+        """Actualiza la tasa medida y, si están visibles, las latencias p95 por etapa."""
+        latencias = self.controlador.obtener_latencias()
+        self.tarjetas.fijar("tasa", Textos.FORMATO_TASA.format(tasa=latencias['muestras_por_segundo']))
+        if self._latencias_visibles:
+            self.tarjetas.fijar("latencias", Textos.FORMATO_LATENCIAS.format(**{
+                etapa: f"{resumen['p95_ms']:.1f}" if resumen['muestras'] else "--"
+                for etapa, resumen in latencias['etapas'].items()
+            }))
+        self._latencias_id = self.window.after(ConfigLatencia.INTERVALO_OVERLAY, self._refrescar_latencias)
+
+    def _alternar_latencias(self, event=None):
+        """Muestra u oculta el detalle de latencias junto a la tasa."""
+        self._latencias_visibles = not self._latencias_visibles
+        if self._latencias_visibles:
+            self.label_latencias.pack(side="left", before=self.label_tasa)
+        else:
+            self.label_latencias.pack_forget()
 
     # ==================== CALLBACKS ====================
     def _actualizar_valores_ui(self, temp, hum_amb, hum_suelo, pot):
-        """Actualiza los valores en las tarjetas."""
-        self.labels_valores["temp"].configure(text=f"{temp:.1f}")
-        self.labels_valores["hum_amb"].configure(text=f"{hum_amb:.1f}")
-        self.labels_valores["hum_suelo"].configure(text=f"{hum_suelo:.1f}")
-        self.labels_valores["pot"].configure(text=f"{int(pot)}")
+        """Actualiza los valores en las tarjetas (se dibujan al final del ciclo)."""
+        self.tarjetas.fijar("temp", f"{temp:.1f}")
+        self.tarjetas.fijar("hum_amb", f"{hum_amb:.1f}")
+        self.tarjetas.fijar("hum_suelo", f"{hum_suelo:.1f}")
+        self.tarjetas.fijar("pot", f"{int(pot)}")
+
+    def _actualizar_estadisticas_ui(self, estadisticas):
+        """Muestra en cada tarjeta las estadísticas móviles de su canal."""
+        for (key, decimales), valores in zip(
+                (("temp", 1), ("hum_amb", 1), ("hum_suelo", 1), ("pot", 0)), estadisticas):
+            if valores is None:
+                continue
+            self.tarjetas.fijar(("estadisticas", key), Textos.FORMATO_ESTADISTICAS.format(
+                d=decimales, tasa_minuto=valores['tasa'] * 60, **valores
+            ))
 
     def _actualizar_graficas_ui(self, datos):
-        """Actualiza las gráficas con datos suavizados."""
+        """Registra los datos nuevos (por dispositivo); el redibujado lo agenda el planificador."""
+        self._datos_graficas = datos
+        self.planificador_render.marcar_sucio()
+
+    def _renderizar_graficas(self):
+        """Redibuja las gráficas con datos suavizados de los dispositivos seleccionados."""
+        datos_por_dispositivo = self._datos_graficas
+        if datos_por_dispositivo is None or self.canvas is None:
+            # Sin datos, o la figura aún se está construyendo (la reagenda _construir_graficas)
+            return
+
         try:
-            tiempos = datos['tiempos']
-
-            # Temperatura - suavizada
-            x, y = self._suavizar_datos(tiempos, datos['temperaturas'])
-            self.line1.set_data(x, y)
-            self.ax1.relim()
-            self.ax1.autoscale_view()
-
-            # Humedad Ambiente - suavizada
-            x, y = self._suavizar_datos(tiempos, datos['humedades_amb'])
-            self.line2.set_data(x, y)
-            self.ax2.relim()
-            self.ax2.autoscale_view()
-
-            # Humedad Suelo - suavizada
-            x, y = self._suavizar_datos(tiempos, datos['humedades_suelo'])
-            self.line3.set_data(x, y)
-            self.ax3.relim()
-            self.ax3.autoscale_view()
-
-            # Potenciómetro - suavizada
-            x, y = self._suavizar_datos(tiempos, datos['potenciometros'])
-            self.line4.set_data(x, y)
-            self.ax4.relim()
-            self.ax4.autoscale_view()
-
-            self.canvas.draw()
+            if list(self._lineas) != list(datos_por_dispositivo):
+                self._reconstruir_lineas(list(datos_por_dispositivo))
+
+            if self._ventana_historial:
+                # Historial ya reducido por la pirámide: se grafica sin suavizar
+                elementos = self._elementos_historial()
+            else:
+                # Temperatura, humedad ambiente, humedad suelo y potenciómetro - suavizadas juntas
+                elementos = []
+                for nombre, datos in datos_por_dispositivo.items():
+                    motor = self._motor_suavizado(nombre)
+                    x, canales = motor.suavizar(datos['tiempos'], datos['canales'], datos['total'])
+                    elementos.extend(
+                        (ax, linea, x, y)
+                        for ax, linea, y in zip(self._ejes, self._lineas[nombre], canales)
+                    )
+
+            if self.renderizador_blit is not None:
+                self.renderizador_blit.actualizar(elementos)
+            else:
+                for ax, linea, x, y in elementos:
+                    linea.set_data(x, y)
+                for ax in self._ejes:
+                    ax.relim()
+                    ax.autoscale_view()
+                self.canvas.draw()
+
+            self.controlador.marcar_render()
         except Exception as e:
             print(f"Error actualizando gráficas: {e}")
 
+    def _elementos_historial(self):
+        """
+        Elementos (ax, linea, x, y) del historial reducido a un punto por píxel.
+
+        El eje x queda en horas relativas al último dato.
+        """
+        ancho = max(int(self._ejes[0].bbox.width), 1)
+        historial = self.controlador.obtener_historial(self._ventana_historial, ancho)
+        finales = [xs[0][-1] for xs, ys in historial.values() if len(xs[0])]
+        if not finales:
+            return []
+        referencia = max(finales)
+
+        elementos = []
+        for nombre, (xs, ys) in historial.items():
+            elementos.extend(
+                (ax, linea, (x - referencia) / 3600, y)
+                for ax, linea, x, y in zip(self._ejes, self._lineas[nombre], xs, ys)
+            )
+        return elementos
+
     def _agregar_registro_ui(self, mensaje):
         """Agrega un mensaje al registro."""
         self._log_consola(mensaje)
@@ -730,10 +1059,27 @@ class InterfazSistema:
     def _on_conexion_exitosa(self, puerto):
         """Callback cuando la conexión es exitosa."""
         self._log_consola(f"> Escuchando en puerto serial {puerto}")
+        self._mostrar_conectado()
+
+    def _on_error_conexion(self, mensaje):
+        """Callback cuando un puerto no se pudo abrir."""
+        timestamp = datetime.now().strftime('%H:%M:%S')
+        self._log_consola(f"[{timestamp}] ! {mensaje}")
+        self._actualizar_selector_dispositivos()
 
     def _on_desconexion(self):
-        """Callback cuando se desconecta."""
-        self._log_consola("> Conexión restablecida.")
+        """Callback cuando se desconecta (por el usuario o porque el puerto falló)."""
+        self._log_consola("> Conexión finalizada.")
+        if not self.controlador.esta_conectado():
+            self._mostrar_desconectado()
+
+    def _al_cerrar(self):
+        """Cierra la conexión y el almacenamiento antes de destruir la ventana."""
+        self.window.after_cancel(self._bombeo_id)
+        self.window.after_cancel(self._latencias_id)
+        self.planificador_render.cancelar()
+        self.controlador.cerrar()
+        self.window.destroy()
 
     def run(self):
         """Inicia el loop principal."""
@@ -0,0 +1,256 @@
+"""
+Módulo de Protocolo
+Formatos de telemetría del ESP32: líneas CSV en ASCII y tramas binarias con CRC.
+
+Línea ASCII:
+    temperatura,humedad_amb,humedad_suelo,potenciometro\n
+
+Trama (little-endian, 20 bytes):
+    AA 55 | seq u16 | temperatura f32 | humedad_amb f32 | humedad_suelo f32 |
+    potenciometro u16 | crc16 u16
+
+El CRC es CRC-16/CCITT-FALSE (polinomio 0x1021, valor inicial 0xFFFF)
+calculado sobre los bytes entre la sincronía y el propio CRC.
+"""
+
+import binascii
+import struct
+import numpy as np
+
+SINCRONIA = b'\xaa\x55'
+
+DTYPE_TRAMA = np.dtype([
+    ('sincronia', '<u2'),
+    ('seq', '<u2'),
+    ('temperatura', '<f4'),
+    ('humedad_amb', '<f4'),
+    ('humedad_suelo', '<f4'),
+    ('potenciometro', '<u2'),
+    ('crc', '<u2')
+])
+TAM_TRAMA = DTYPE_TRAMA.itemsize
+
+# Muestra ya decodificada (independiente del protocolo) con su instante de recepción
+# y los instantes monotónicos (time.monotonic) de cada etapa; NaN si no aplica
+DTYPE_MUESTRA = np.dtype([
+    ('temperatura', '<f8'),
+    ('humedad_amb', '<f8'),
+    ('humedad_suelo', '<f8'),
+    ('potenciometro', '<f8'),
+    ('t_recv', '<f8'),
+    ('t_lectura', '<f8'),
+    ('t_parseo', '<f8'),
+    ('t_almacen', '<f8')
+])
+
+# Campos de datos (los que se guardan y muestran), en el orden de DTYPE_MUESTRA
+CAMPOS_MUESTRA = ['temperatura', 'humedad_amb', 'humedad_suelo', 'potenciometro', 't_recv']
+
+_FORMATO_CUERPO = struct.Struct('<H3fH')
+_INICIO_CRC = len(SINCRONIA)
+_FIN_CRC = TAM_TRAMA - 2
+
+
+def _tabla_crc16():
+    """Tabla de 256 entradas para CRC-16/CCITT-FALSE."""
+    tabla = np.zeros(256, dtype=np.uint16)
+    for i in range(256):
+        crc = i << 8
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x1021) if crc & 0x8000 else (crc << 1)
+        tabla[i] = crc & 0xFFFF
+    return tabla
+
+
+_TABLA_CRC = _tabla_crc16()
+
+
+def crc16(datos):
+    """CRC-16/CCITT-FALSE de un bloque de bytes."""
+    return binascii.crc_hqx(datos, 0xFFFF)
+
+
+def muestras_vacias(n):
+    """Arreglo DTYPE_MUESTRA de `n` muestras con todos los campos en NaN."""
+    return np.full(n, np.nan, dtype=DTYPE_MUESTRA)
+
+
+def codificar_trama(seq, temp, hum_amb, hum_suelo, pot):
+    """Empaqueta una muestra en una trama binaria."""
+    cuerpo = _FORMATO_CUERPO.pack(seq & 0xFFFF, temp, hum_amb, hum_suelo, int(pot) & 0xFFFF)
+    return SINCRONIA + cuerpo + struct.pack('<H', crc16(cuerpo))
+
+
+def parsear_lineas(bloque, t_recv):
+    """
+    Convierte un bloque de líneas ASCII completas en un arreglo DTYPE_MUESTRA.
+
+    Retorna (muestras, invalidas, errores). Las líneas que empiezan con
+    "Error" y las mal formadas se cuentan y se descartan, nunca se lanzan.
+    """
+    lineas = [linea.strip() for linea in bloque.split(b'\n')]
+    errores = 0
+    candidatas = []
+    invalidas = 0
+    for linea in lineas:
+        if not linea:
+            continue
+        if linea.startswith(b'Error'):
+            errores += 1
+        elif linea.count(b',') == 3:
+            candidatas.append(linea)
+        else:
+            invalidas += 1
+
+    try:
+        valores = _convertir_campos(candidatas)
+    except ValueError:
+        # Algún campo no numérico: aislar las líneas inválidas una por una
+        buenas = []
+        for linea in candidatas:
+            try:
+                _convertir_campos([linea])
+                buenas.append(linea)
+            except ValueError:
+                invalidas += 1
+        valores = _convertir_campos(buenas)
+
+    muestras = muestras_vacias(len(valores))
+    muestras['temperatura'] = valores[:, 0]
+    muestras['humedad_amb'] = valores[:, 1]
+    muestras['humedad_suelo'] = valores[:, 2]
+    muestras['potenciometro'] = np.trunc(valores[:, 3])
+    muestras['t_recv'] = t_recv
+    return muestras, invalidas, errores
+
+
+def _convertir_campos(lineas):
+    """Convierte líneas de 4 campos en una matriz (n, 4) de float64."""
+    if not lineas:
+        return np.empty((0, 4), dtype=np.float64)
+    campos = b','.join(lineas).split(b',')
+    return np.array(campos).astype(np.float64).reshape(-1, 4)
+
+
+def tramas_a_muestras(tramas, t_recv):
+    """Convierte tramas binarias decodificadas en un arreglo DTYPE_MUESTRA."""
+    muestras = muestras_vacias(len(tramas))
+    for campo in ('temperatura', 'humedad_amb', 'humedad_suelo', 'potenciometro'):
+        muestras[campo] = tramas[campo]
+    muestras['t_recv'] = t_recv
+    return muestras
+
+
+def _crc16_filas(filas):
+    """CRC-16 de cada fila de una matriz (n, m) de bytes, vectorizado sobre las filas."""
+    crc = np.full(filas.shape[0], 0xFFFF, dtype=np.uint16)
+    for columna in filas.T:
+        indice = ((crc >> 8) ^ columna) & 0xFF
+        crc = (crc << 8) ^ _TABLA_CRC[indice]
+    return crc
+
+
+def _inicio_parcial(cola):
+    """
+    Primera posición de `cola` donde puede empezar una trama incompleta: la
+    sincronía entera o, en el último byte, su primer byte. Se toma la más
+    temprana porque el 0xAA también puede aparecer dentro de la carga útil.
+    Retorna -1 si no hay ninguna.
+    """
+    inicio = cola.find(SINCRONIA)
+    if inicio >= 0:
+        return inicio
+    return len(cola) - 1 if cola.endswith(SINCRONIA[:1]) else -1
+
+
+class DecodificadorTramas:
+    """Decodifica tramas binarias sobre buffers completos y contabiliza errores."""
+
+    def __init__(self):
+        self._ultima_seq = None
+        self.tramas_validas = 0
+        self.tramas_corruptas = 0
+        self.tramas_perdidas = 0
+        self.bytes_descartados = 0
+
+    def decodificar(self, buffer):
+        """
+        Busca tramas válidas en `buffer`.
+
+        Retorna (tramas, consumidos): un arreglo estructurado DTYPE_TRAMA y el
+        número de bytes del inicio del buffer que ya pueden descartarse.
+        """
+        datos = np.frombuffer(buffer, dtype=np.uint8)
+        n = len(datos)
+        if n < TAM_TRAMA:
+            return np.empty(0, dtype=DTYPE_TRAMA), 0
+
+        # Candidatas: posiciones con la sincronía y espacio para una trama completa
+        limite = n - TAM_TRAMA + 1
+        candidatas = np.flatnonzero((datos[:limite] == SINCRONIA[0]) & (datos[1:limite + 1] == SINCRONIA[1]))
+
+        tramas = np.empty(0, dtype=DTYPE_TRAMA)
+        consumidos = 0
+        if len(candidatas):
+            filas = datos[candidatas[:, None] + np.arange(TAM_TRAMA)]
+            crc_calculado = _crc16_filas(filas[:, _INICIO_CRC:_FIN_CRC])
+            crc_recibido = filas[:, _FIN_CRC].astype(np.uint16) | (filas[:, _FIN_CRC + 1].astype(np.uint16) << 8)
+            validas = crc_calculado == crc_recibido
+
+            # Descartar válidas que se solapan con una trama anterior aceptada
+            aceptadas = []
+            siguiente = 0
+            for pos in candidatas[validas]:
+                if pos >= siguiente:
+                    aceptadas.append(int(pos))
+                    siguiente = int(pos) + TAM_TRAMA
+
+            # Solo cuentan como corruptas las que no caen dentro de una trama aceptada
+            self.tramas_corruptas += int(np.count_nonzero(~validas)) - self._solapadas(candidatas[~validas], aceptadas)
+
+            if aceptadas:
+                indices = np.searchsorted(candidatas, aceptadas)
+                tramas = filas[indices].copy().view(DTYPE_TRAMA).ravel()
+                consumidos = siguiente
+                self.bytes_descartados += consumidos - len(aceptadas) * TAM_TRAMA
+                self._contar_perdidas(tramas['seq'])
+                self.tramas_validas += len(tramas)
+
+        # Sin tramas completas pendientes: conservar solo una posible trama parcial al final
+        resto = n - consumidos
+        if resto >= TAM_TRAMA:
+            cola = bytes(buffer[n - TAM_TRAMA + 1:])
+            inicio_parcial = _inicio_parcial(cola)
+            conservar = len(cola) - inicio_parcial if inicio_parcial >= 0 else 0
+            self.bytes_descartados += resto - conservar
+            consumidos = n - conservar
+
+        return tramas, consumidos
+
+    def obtener_estadisticas(self):
+        """Retorna los contadores del decodificador."""
+        return {
+            'tramas_validas': self.tramas_validas,
+            'tramas_corruptas': self.tramas_corruptas,
+            'tramas_perdidas': self.tramas_perdidas,
+            'bytes_descartados': self.bytes_descartados
+        }
+
+    def _solapadas(self, posiciones, aceptadas):
+        """Cuenta posiciones que caen dentro de alguna trama aceptada."""
+        if not aceptadas or not len(posiciones):
+            return 0
+        inicios = np.asarray(aceptadas)
+        previa = np.searchsorted(inicios, posiciones, side='right') - 1
+        dentro = (previa >= 0) & (posiciones < inicios[np.maximum(previa, 0)] + TAM_TRAMA)
+        return int(np.count_nonzero(dentro))
+
+    def _contar_perdidas(self, secuencias):
+        """Contabiliza saltos en el número de secuencia (módulo 2^16)."""
+        secuencias = secuencias.astype(np.int64)
+        if self._ultima_seq is not None:
+            secuencias = np.concatenate([[self._ultima_seq], secuencias])
+        saltos = (np.diff(secuencias) - 1) % 65536
+        # Un salto hacia atrás grande indica que el dispositivo se reinició
+        self.tramas_perdidas += int(saltos[saltos < 32768].sum())
+        self._ultima_seq = int(secuencias[-1])
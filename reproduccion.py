@@ -0,0 +1,251 @@
+"""
+Módulo de Reproducción
+Fuente de datos que reproduce un registro guardado como si fuera un ESP32.
+"""
+
+import csv
+import itertools
+import os
+import threading
+import time
+import numpy as np
+from estilos import ConfigReproduccion
+from almacenamiento import (
+    abrir_csv, leer_registro, marca_fila, registros_a_muestras, segmentos_csv
+)
+from protocolo import CAMPOS_MUESTRA, muestras_vacias
+
+
+def es_registro(ruta):
+    """Un CSV o un directorio de registro binario (no un puerto como /dev/ttyUSB0)."""
+    return os.path.isfile(ruta) or os.path.isdir(ruta)
+
+
+def filas_a_muestras(filas):
+    """Convierte filas CSV (Fecha, Hora, 4 canales) en un arreglo DTYPE_MUESTRA."""
+    marcas = {}
+    valores = []
+    for fila in filas:
+        if len(fila) < 6:
+            continue
+        try:
+            clave = (fila[0], fila[1])
+            marca = marcas.get(clave)
+            if marca is None:
+                marca = marcas[clave] = marca_fila(*clave)
+            valores.append((float(fila[2]), float(fila[3]), float(fila[4]), float(fila[5]), marca))
+        except ValueError:
+            continue
+    muestras = muestras_vacias(len(valores))
+    muestras[CAMPOS_MUESTRA] = valores
+    return muestras
+
+
+def lotes_csv(ruta, desde=None, filas_por_lote=ConfigReproduccion.FILAS_POR_LOTE):
+    """Genera lotes DTYPE_MUESTRA leyendo el CSV (y sus segmentos rotados) por tramos."""
+    for segmento in segmentos_csv(ruta, desde):
+        with abrir_csv(segmento) as archivo:
+            lector = csv.reader(archivo)
+            next(lector, None)  # Encabezados
+            while True:
+                filas = list(itertools.islice(lector, filas_por_lote))
+                if not filas:
+                    break
+                muestras = filas_a_muestras(filas)
+                if desde is not None:
+                    muestras = muestras[muestras['t_recv'] >= desde]
+                if len(muestras):
+                    yield muestras
+
+
+def lotes_registro(directorio, desde=None, filas_por_lote=ConfigReproduccion.FILAS_POR_LOTE):
+    """Genera lotes DTYPE_MUESTRA desde los segmentos de un registro binario."""
+    for registros in leer_registro(directorio, desde):
+        for inicio in range(0, len(registros), filas_por_lote):
+            yield registros_a_muestras(registros[inicio:inicio + filas_por_lote])
+
+
+class FuenteReproduccion:
+    """
+    Reproduce un CSV o un registro binario con la misma interfaz que
+    ComunicacionSerial.
+
+    Los lotes se entregan por el callback 'on_batch_received' respetando el
+    ritmo original multiplicado por `velocidad` (None: sin esperas). El
+    archivo se lee por tramos, nunca completo.
+
+    Al iniciar y en cada búsqueda las marcas vuelven atrás: se avisa con
+    'on_reset' antes del primer lote para que el destino descarte lo previo.
+    """
+
+    def __init__(self, velocidad=ConfigReproduccion.VELOCIDAD,
+                 filas_por_lote=ConfigReproduccion.FILAS_POR_LOTE):
+        self.origen = None
+        self.is_running = False
+        self.thread = None
+        self.velocidad = velocidad
+        self.filas_por_lote = filas_por_lote
+
+        self._reanudar = threading.Event()
+        self._reanudar.set()
+        self._busqueda = None
+        self._lock = threading.Lock()
+
+        self.muestras_reproducidas = 0
+        self.posicion = None
+        self.callbacks = {
+            'on_batch_received': None,
+            'on_connection_success': None,
+            'on_connection_error': None,
+            'on_disconnect': None,
+            'on_reset': None
+        }
+
+    def conectar(self, origen, bucle=None):
+        """Inicia la reproducción de un CSV o de un directorio de registro binario."""
+        if not es_registro(origen):
+            return False, f"No existe el registro {origen}"
+
+        self.origen = origen
+        self.muestras_reproducidas = 0
+        self.posicion = None
+        self._busqueda = None
+        self._reanudar.set()
+        self._notificar_reinicio()
+        self.is_running = True
+        self.thread = threading.Thread(target=self._reproducir, daemon=True)
+        self.thread.start()
+
+        if self.callbacks['on_connection_success']:
+            self.callbacks['on_connection_success'](origen)
+
+        return True, f"Reproduciendo {origen}"
+
+    def desconectar(self):
+        """Detiene la reproducción."""
+        self.is_running = False
+        self._reanudar.set()
+        if self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join(1.0)
+
+        if self.callbacks['on_disconnect']:
+            self.callbacks['on_disconnect']()
+
+    def pausar(self):
+        """Pausa la reproducción en la posición actual."""
+        self._reanudar.clear()
+
+    def reanudar(self):
+        """Continúa una reproducción pausada."""
+        self._reanudar.set()
+
+    def esta_pausado(self):
+        return not self._reanudar.is_set()
+
+    def buscar(self, marca):
+        """Salta a la primera muestra con marca de tiempo >= `marca`."""
+        with self._lock:
+            self._busqueda = marca
+
+    def establecer_velocidad(self, velocidad):
+        """Cambia la velocidad (1.0 tiempo real, N veces, None lo más rápido posible)."""
+        self.velocidad = velocidad
+
+    def enviar_comando(self, comando):
+        """Un registro no acepta comandos."""
+        return False
+
+    def encender_led(self):
+        return self.enviar_comando('1')
+
+    def apagar_led(self):
+        return self.enviar_comando('0')
+
+    def registrar_callback(self, evento, funcion):
+        """Registra un callback para eventos."""
+        if evento in self.callbacks:
+            self.callbacks[evento] = funcion
+
+    def esta_conectado(self):
+        """Verifica si la reproducción está en curso."""
+        return self.is_running
+
+    def obtener_estadisticas(self):
+        """Retorna el avance de la reproducción."""
+        return {
+            'origen': self.origen,
+            'muestras_reproducidas': self.muestras_reproducidas,
+            'posicion': self.posicion,
+            'velocidad': self.velocidad,
+            'pausado': self.esta_pausado()
+        }
+
+    def _lotes(self, desde):
+        if os.path.isdir(self.origen):
+            return lotes_registro(self.origen, desde, self.filas_por_lote)
+        return lotes_csv(self.origen, desde, self.filas_por_lote)
+
+    def _reproducir(self):
+        """Hilo de reproducción: reinicia la lectura en cada búsqueda."""
+        desde = None
+        while self.is_running:
+            desde = self._emitir(self._lotes(desde))
+            if desde is None:
+                break
+            self._notificar_reinicio()
+
+        # Fin del registro: se notifica como una desconexión
+        if self.is_running:
+            self.is_running = False
+            if self.callbacks['on_disconnect']:
+                self.callbacks['on_disconnect']()
+
+    def _emitir(self, lotes):
+        """
+        Entrega los lotes al ritmo indicado.
+
+        Retorna la marca de una búsqueda pendiente o None al terminar.
+        """
+        reloj = None  # (marca base, instante base, velocidad)
+        for lote in lotes:
+            marcas = lote['t_recv']
+            inicio = 0
+            while inicio < len(lote):
+                if not self._reanudar.is_set():
+                    self._reanudar.wait()
+                    reloj = None
+                if not self.is_running:
+                    return None
+                with self._lock:
+                    marca, self._busqueda = self._busqueda, None
+                if marca is not None:
+                    return marca
+
+                velocidad = self.velocidad
+                if not velocidad:
+                    fin = len(lote)
+                else:
+                    if reloj is None or reloj[2] != velocidad:
+                        reloj = (marcas[inicio], time.monotonic(), velocidad)
+                    actual = reloj[0] + (time.monotonic() - reloj[1]) * velocidad
+                    if marcas[inicio] > actual:
+                        espera = (marcas[inicio] - actual) / velocidad
+                        time.sleep(min(espera, ConfigReproduccion.INTERVALO_ENTREGA))
+                        continue
+                    fin = inicio + max(1, np.searchsorted(marcas[inicio:], actual, 'right'))
+
+                self._entregar(lote[inicio:fin])
+                inicio = fin
+        return None
+
+    def _notificar_reinicio(self):
+        if self.callbacks['on_reset']:
+            self.callbacks['on_reset']()
+
+    def _entregar(self, muestras):
+        # La "lectura" de un registro es el instante en que se entrega
+        muestras['t_lectura'] = muestras['t_parseo'] = time.monotonic()
+        self.muestras_reproducidas += len(muestras)
+        self.posicion = float(muestras['t_recv'][-1])
+        if self.callbacks['on_batch_received']:
+            self.callbacks['on_batch_received'](muestras)
@@ -0,0 +1,256 @@
+"""
+Módulo de Simulador
+ESP32 simulado sobre un par pty de Linux para probar y medir la adquisición sin hardware.
+"""
+
+import argparse
+import bisect
+import math
+import os
+import select
+import threading
+import time
+import tty
+import numpy as np
+from estilos import ConfigSimulador
+from protocolo import TAM_TRAMA, codificar_trama
+
+
+def codificar_ascii(seq, temp, hum_amb, hum_suelo, pot):
+    """Línea `temp,hum_amb,hum_suelo,pot` tal como la imprime el firmware."""
+    return f"{temp:.2f},{hum_amb:.2f},{hum_suelo:.2f},{int(pot)}\n".encode()
+
+
+def corromper_ascii(datos, rng):
+    """Reemplaza un byte (salvo el salto de línea) por uno no numérico."""
+    datos = bytearray(datos)
+    datos[rng.integers(len(datos) - 1)] = ord('#')
+    return bytes(datos)
+
+
+def corromper_binario(datos, rng):
+    """Altera un byte posterior a la sincronía: el CRC deja de coincidir."""
+    datos = bytearray(datos)
+    datos[rng.integers(2, TAM_TRAMA)] ^= int(rng.integers(1, 256))
+    return bytes(datos)
+
+
+# Formatos emitibles: nombre -> (codificar, corromper). Un formato nuevo solo
+# necesita su par de funciones aquí.
+FORMATOS = {
+    'ascii': (codificar_ascii, corromper_ascii),
+    'binario': (codificar_trama, corromper_binario)
+}
+
+LINEA_ERROR = b"Error al leer el sensor DHT\n"
+
+
+class SimuladorESP32:
+    """
+    Emite telemetría por el extremo maestro de un pty; el esclavo se abre
+    como un puerto serial cualquiera (ComunicacionSerial.conectar(ruta)).
+
+    Responde a los comandos '1'/'0' del LED. Si el lector no consume a
+    tiempo y el buffer del pty se llena, los bytes se pierden como en un
+    desbordamiento de UART y se cuentan en 'muestras_desbordadas'.
+    """
+
+    def __init__(self, formato=ConfigSimulador.FORMATO, frecuencia=ConfigSimulador.FRECUENCIA,
+                 ruido=ConfigSimulador.RUIDO, rafaga_cada=ConfigSimulador.RAFAGA_CADA,
+                 rafaga_muestras=ConfigSimulador.RAFAGA_MUESTRAS,
+                 tasa_corruptas=ConfigSimulador.TASA_CORRUPTAS,
+                 tasa_errores=ConfigSimulador.TASA_ERRORES, semilla=None):
+        if formato not in FORMATOS:
+            raise ValueError(f"Formato desconocido: {formato}")
+        self.formato = formato
+        self.frecuencia = frecuencia
+        self.ruido = ruido
+        self.rafaga_cada = rafaga_cada
+        self.rafaga_muestras = rafaga_muestras
+        self.tasa_corruptas = tasa_corruptas
+        self.tasa_errores = tasa_errores if formato == 'ascii' else 0.0
+
+        self._rng = np.random.default_rng(semilla)
+        self._maestro = None
+        self._esclavo = None
+        self.ruta = None
+        self.is_running = False
+        self.thread = None
+
+        self.led = False
+        self._seq = 0
+        self._pot = 2048.0
+
+        # Estadísticas
+        self.muestras_enviadas = 0      # Válidas escritas completas en el pty
+        self.muestras_corruptas = 0
+        self.muestras_desbordadas = 0
+        self.lineas_error = 0
+        self.rafagas = 0
+        self.comandos = {'1': 0, '0': 0}
+
+    def abrir(self):
+        """Crea el par pty y retorna la ruta del extremo esclavo."""
+        if self._maestro is None:
+            self._maestro, self._esclavo = os.openpty()
+            # Sin eco ni traducción de saltos de línea, como un puerto serial
+            tty.setraw(self._esclavo)
+            os.set_blocking(self._maestro, False)
+            self.ruta = os.ttyname(self._esclavo)
+        return self.ruta
+
+    def iniciar(self):
+        """Empieza a emitir muestras (abre el pty si hace falta)."""
+        self.abrir()
+        if self.is_running:
+            return self.ruta
+        self.is_running = True
+        self.thread = threading.Thread(target=self._ejecutar, daemon=True)
+        self.thread.start()
+        return self.ruta
+
+    def detener(self):
+        """Deja de emitir; el pty sigue abierto."""
+        self.is_running = False
+        if self.thread is not None:
+            self.thread.join(1.0)
+            self.thread = None
+
+    def cerrar(self):
+        """Detiene la emisión y cierra ambos extremos del pty."""
+        self.detener()
+        for descriptor in (self._maestro, self._esclavo):
+            if descriptor is not None:
+                os.close(descriptor)
+        self._maestro = self._esclavo = None
+
+    def obtener_estadisticas(self):
+        """Retorna los contadores de emisión y de comandos recibidos."""
+        return {
+            'formato': self.formato,
+            'muestras_enviadas': self.muestras_enviadas,
+            'muestras_corruptas': self.muestras_corruptas,
+            'muestras_desbordadas': self.muestras_desbordadas,
+            'lineas_error': self.lineas_error,
+            'rafagas': self.rafagas,
+            'comandos': dict(self.comandos),
+            'led': self.led
+        }
+
+    def _ejecutar(self):
+        """Hilo emisor: escribe las muestras debidas en cada tick y atiende comandos."""
+        inicio = time.monotonic()
+        emitidas = 0
+        proxima_rafaga = inicio + self.rafaga_cada if self.rafaga_cada else None
+
+        while self.is_running:
+            ahora = time.monotonic()
+            debidas = int((ahora - inicio) * self.frecuencia) - emitidas
+            emitidas += max(debidas, 0)
+
+            if proxima_rafaga is not None and ahora >= proxima_rafaga:
+                debidas += self.rafaga_muestras
+                self.rafagas += 1
+                proxima_rafaga += self.rafaga_cada
+
+            if debidas > 0:
+                self._emitir(debidas, ahora)
+
+            legibles, _, _ = select.select([self._maestro], [], [], ConfigSimulador.TICK)
+            if legibles:
+                self._leer_comandos()
+
+    def _emitir(self, n, ahora):
+        """Genera `n` muestras, las codifica (dañando algunas) y las escribe de una vez."""
+        codificar, corromper = FORMATOS[self.formato]
+        temp, hum_amb, hum_suelo, pot = self._generar(n, ahora)
+        corruptas = self._rng.random(n) < self.tasa_corruptas
+        errores = self._rng.random(n) < self.tasa_errores
+
+        paquetes = []
+        validas = []
+        for i in range(n):
+            if errores[i]:
+                paquetes.append(LINEA_ERROR)
+                validas.append(False)
+                self.lineas_error += 1
+                continue
+            datos = codificar(self._seq, temp[i], hum_amb[i], hum_suelo[i], pot[i])
+            self._seq = (self._seq + 1) & 0xFFFF
+            if corruptas[i]:
+                datos = corromper(datos, self._rng)
+                self.muestras_corruptas += 1
+            paquetes.append(datos)
+            validas.append(not corruptas[i])
+
+        escritos = self._escribir(b''.join(paquetes))
+
+        # Solo cuentan como enviadas las muestras válidas escritas completas
+        finales = list(np.cumsum([len(p) for p in paquetes]))
+        completas = bisect.bisect_right(finales, escritos)
+        enviadas = sum(validas[:completas])
+        self.muestras_enviadas += enviadas
+        self.muestras_desbordadas += sum(validas) - enviadas
+
+    def _generar(self, n, ahora):
+        """Canales con tendencia lenta, ruido gaussiano y un potenciómetro que deriva."""
+        t = ahora + np.arange(n) / max(self.frecuencia, 1.0)
+        ruido = self._rng.normal(0.0, self.ruido, (3, n)) if self.ruido else np.zeros((3, n))
+        temp = 24.0 + 3.0 * np.sin(2 * math.pi * t / 600.0) + ruido[0]
+        hum_amb = 55.0 + 10.0 * np.sin(2 * math.pi * t / 900.0) + ruido[1]
+        hum_suelo = 40.0 + 5.0 * np.cos(2 * math.pi * t / 1800.0) + ruido[2]
+
+        pasos = self._rng.normal(0.0, 8.0, n)
+        pot = np.clip(self._pot + np.cumsum(pasos), 0, 4095)
+        self._pot = float(pot[-1])
+        return temp, hum_amb, hum_suelo, np.round(pot)
+
+    def _escribir(self, datos):
+        """Escribe sin bloquear; retorna los bytes aceptados por el pty."""
+        escritos = 0
+        try:
+            while escritos < len(datos):
+                escritos += os.write(self._maestro, datos[escritos:])
+        except BlockingIOError:
+            pass
+        except OSError:
+            # El lector cerró el esclavo: se descarta lo pendiente
+            pass
+        return escritos
+
+    def _leer_comandos(self):
+        """Procesa los comandos '1'/'0' recibidos del lado del puerto."""
+        try:
+            datos = os.read(self._maestro, 1024)
+        except (BlockingIOError, OSError):
+            return
+        for caracter in datos.decode('latin-1'):
+            if caracter in self.comandos:
+                self.comandos[caracter] += 1
+                self.led = caracter == '1'
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="ESP32 simulado sobre un pty")
+    parser.add_argument('--formato', choices=sorted(FORMATOS), default=ConfigSimulador.FORMATO)
+    parser.add_argument('--frecuencia', type=float, default=ConfigSimulador.FRECUENCIA)
+    parser.add_argument('--ruido', type=float, default=ConfigSimulador.RUIDO)
+    parser.add_argument('--rafaga-cada', type=float, default=ConfigSimulador.RAFAGA_CADA)
+    parser.add_argument('--rafaga-muestras', type=int, default=ConfigSimulador.RAFAGA_MUESTRAS)
+    parser.add_argument('--corruptas', type=float, default=ConfigSimulador.TASA_CORRUPTAS)
+    parser.add_argument('--errores', type=float, default=ConfigSimulador.TASA_ERRORES)
+    parser.add_argument('--semilla', type=int)
+    argumentos = parser.parse_args()
+
+    simulador = SimuladorESP32(
+        argumentos.formato, argumentos.frecuencia, argumentos.ruido, argumentos.rafaga_cada,
+        argumentos.rafaga_muestras, argumentos.corruptas, argumentos.errores, argumentos.semilla
+    )
+    print(f"Puerto simulado: {simulador.iniciar()}  (Ctrl+C para terminar)")
+    try:
+        while True:
+            time.sleep(1.0)
+    except KeyboardInterrupt:
+        pass
+    simulador.cerrar()
+    print(simulador.obtener_estadisticas())
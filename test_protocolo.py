@@ -0,0 +1,34 @@
+"""
+Pruebas del protocolo binario
+Tramas partidas entre lecturas con 0xAA en la carga útil.
+"""
+
+from protocolo import DecodificadorTramas, TAM_TRAMA, codificar_trama
+
+
+def _decodificar_en_dos_lecturas(primera, segunda):
+    """Decodifica como lo hace ComunicacionSerial: buffer acumulado y recorte de lo consumido."""
+    decodificador = DecodificadorTramas()
+    buffer = bytearray(primera)
+    tramas, consumidos = decodificador.decodificar(buffer)
+    secuencias = tramas['seq'].tolist()
+    del buffer[:consumidos]
+    buffer += segunda
+    tramas, consumidos = decodificador.decodificar(buffer)
+    return secuencias + tramas['seq'].tolist(), decodificador
+
+
+def test_trama_partida_con_sincronia_en_la_carga():
+    valida = codificar_trama(1, 20.0, 50.0, 40.0, 100)
+    corrupta = bytearray(codificar_trama(2, 20.0, 50.0, 40.0, 100))
+    corrupta[5] ^= 0xFF
+    # El potenciómetro 0xAA deja un byte de sincronía dentro de la carga útil
+    partida = codificar_trama(3, 21.5, 55.0, 40.0, 0xAA)
+    assert b'\xaa' in partida[2:]
+
+    for corte in range(1, TAM_TRAMA):
+        secuencias, decodificador = _decodificar_en_dos_lecturas(
+            valida + bytes(corrupta) + partida[:corte], partida[corte:]
+        )
+        assert secuencias == [1, 3], f"corte en el byte {corte}"
+        assert decodificador.tramas_corruptas == 1
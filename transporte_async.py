@@ -0,0 +1,245 @@
+"""
+Módulo de Transporte Asíncrono
+Variante asyncio de la comunicación serial y puente con el bucle de Tk.
+
+Uso típico desde la interfaz:
+    puente = PuenteAsyncioTk(window)
+    com = ComunicacionSerialAsync()
+    puente.ejecutar(com.conectar_async("/dev/ttyUSB0"), al_terminar=mostrar_resultado)
+    puente.suscribir(com, procesar_lote)   # lotes DTYPE_MUESTRA en el hilo de Tk
+"""
+
+import asyncio
+import os
+import queue
+import threading
+import serial
+from estilos import ConfigSerial, ConfigInterfaz
+from logica import ComunicacionSerial
+from protocolo import DecodificadorTramas
+
+
+class ComunicacionSerialAsync(ComunicacionSerial):
+    """
+    ComunicacionSerial sobre un descriptor no bloqueante atendido por asyncio.
+    
+    Reutiliza la detección de protocolo y el parseo en lote de la clase base.
+    La interfaz síncrona (desconectar, enviar_comando, encender_led...) se
+    conserva; las variantes asíncronas llevan el sufijo `_async`. Requiere
+    POSIX (add_reader sobre el descriptor del puerto).
+    
+    Los lotes para `leer()` se retienen en una cola acotada: si nadie la
+    consume se descartan los más antiguos (ver `lotes_descartados`).
+    """
+    
+    def __init__(self, max_lotes=ConfigSerial.MAX_LOTES_ASYNC):
+        super().__init__()
+        self.max_lotes = max_lotes
+        self.lotes_descartados = 0
+        self._loop = None
+        self._fd = None
+        self._cola = None
+    
+    async def conectar_async(self, puerto):
+        """Abre el puerto y empieza a leer desde el bucle de eventos."""
+        if os.name != 'posix':
+            return False, "El transporte asyncio requiere un sistema POSIX"
+        
+        loop = asyncio.get_running_loop()
+        try:
+            self.serial_port = await loop.run_in_executor(None, self._abrir, puerto)
+            await asyncio.sleep(ConfigSerial.DELAY_CONEXION)
+        except Exception as e:
+            mensaje = f"No se pudo conectar a {puerto}: {str(e)}"
+            if self.serial_port is not None:
+                self.serial_port.close()
+                self.serial_port = None
+            if self.callbacks['on_connection_error']:
+                self.callbacks['on_connection_error'](mensaje)
+            return False, mensaje
+        
+        self._loop = loop
+        self._cola = asyncio.Queue()
+        self._fd = self.serial_port.fileno()
+        os.set_blocking(self._fd, False)
+        
+        self._protocolo_activo = None if self.protocolo == 'auto' else self.protocolo
+        self.decodificador = DecodificadorTramas()
+        self._buffer_rx.clear()
+        self.is_running = True
+        loop.add_reader(self._fd, self._al_poder_leer)
+        
+        if self.callbacks['on_connection_success']:
+            self.callbacks['on_connection_success'](puerto)
+        
+        return True, f"Conectado exitosamente a {puerto}"
+    
+    def desconectar(self):
+        """
+        Deja de leer, cierra el puerto y avisa una sola vez (desde cualquier hilo).
+        
+        Fuera del hilo del bucle el cierre se agenda en el bucle: el descriptor
+        nunca se cierra mientras el lector sigue registrado.
+        """
+        loop = self._loop
+        if loop is None or not loop.is_running() or self._en_bucle():
+            self._cerrar_en_bucle()
+        else:
+            self.is_running = False
+            loop.call_soon_threadsafe(self._cerrar_en_bucle)
+    
+    async def desconectar_async(self):
+        """Variante asíncrona de desconectar."""
+        self.desconectar()
+    
+    async def enviar_comando_async(self, comando):
+        """Envía un comando esperando a que el puerto acepte escritura."""
+        if not self.esta_conectado():
+            return False
+        
+        datos = comando.encode()
+        while datos:
+            try:
+                escritos = os.write(self._fd, datos)
+                datos = datos[escritos:]
+            except BlockingIOError:
+                await self._esperar_escritura()
+        return True
+    
+    async def leer(self):
+        """Espera el siguiente lote DTYPE_MUESTRA (None al desconectarse)."""
+        if self._cola is None:
+            return None
+        return await self._cola.get()
+    
+    def __aiter__(self):
+        return self
+    
+    async def __anext__(self):
+        lote = await self.leer()
+        if lote is None:
+            raise StopAsyncIteration
+        return lote
+    
+    def _abrir(self, puerto):
+        """Abre el puerto en modo no bloqueante (se ejecuta fuera del bucle)."""
+        return serial.Serial(puerto, ConfigSerial.BAUDRATE, timeout=0, write_timeout=0)
+    
+    def _al_poder_leer(self):
+        """Lee lo disponible cuando el descriptor está listo."""
+        if self._fd is None:
+            return
+        try:
+            bloque = os.read(self._fd, ConfigSerial.TAM_LECTURA)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            print(f"Error leyendo datos: {e}")
+            self.desconectar()
+            return
+        
+        # Descriptor legible sin datos: el dispositivo se desconectó
+        if not bloque:
+            self.desconectar()
+            return
+        
+        self._procesar_bloque(bloque)
+    
+    def _notificar_lote(self, muestras):
+        """Entrega el lote a los callbacks registrados y a la cola de lectores asíncronos."""
+        super()._notificar_lote(muestras)
+        self._encolar(muestras)
+    
+    def _encolar(self, lote):
+        """Agrega a la cola descartando el lote más antiguo si está llena (hilo del bucle)."""
+        while self._cola.qsize() >= self.max_lotes:
+            self._cola.get_nowait()
+            self.lotes_descartados += 1
+        self._cola.put_nowait(lote)
+    
+    async def _esperar_escritura(self):
+        """Espera a que el descriptor acepte escritura."""
+        futuro = self._loop.create_future()
+        self._loop.add_writer(self._fd, futuro.set_result, None)
+        try:
+            await futuro
+        finally:
+            self._loop.remove_writer(self._fd)
+    
+    def _en_bucle(self):
+        try:
+            return asyncio.get_running_loop() is self._loop
+        except RuntimeError:
+            return False
+    
+    def _cerrar_en_bucle(self):
+        """Quita el lector, despierta a quien espera en leer() y cierra el puerto."""
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            self._loop.remove_reader(fd)
+            self._encolar(None)
+        super().desconectar()
+    
+    def obtener_estadisticas(self):
+        """Contadores de la clase base más los lotes descartados de la cola asíncrona."""
+        return {**super().obtener_estadisticas(), 'lotes_descartados': self.lotes_descartados}
+
+
+class PuenteAsyncioTk:
+    """Ejecuta un bucle asyncio en un hilo y entrega los resultados en el hilo de Tk."""
+    
+    def __init__(self, ventana, intervalo=ConfigInterfaz.INTERVALO_BOMBEO):
+        self.ventana = ventana
+        self.intervalo = intervalo
+        self.loop = asyncio.new_event_loop()
+        self._resultados = queue.SimpleQueue()
+        
+        self._hilo = threading.Thread(target=self._ejecutar_bucle, daemon=True)
+        self._hilo.start()
+        self._despacho_id = self.ventana.after(self.intervalo, self._despachar)
+    
+    def ejecutar(self, corrutina, al_terminar=None):
+        """
+        Agenda una corrutina en el bucle asyncio.
+        
+        Si se indica `al_terminar`, se invoca con el resultado desde el hilo de Tk.
+        Retorna un concurrent.futures.Future.
+        """
+        futuro = asyncio.run_coroutine_threadsafe(corrutina, self.loop)
+        if al_terminar is not None:
+            futuro.add_done_callback(lambda f: self._entregar(al_terminar, f))
+        return futuro
+    
+    def suscribir(self, comunicacion, funcion):
+        """Consume los lotes de una ComunicacionSerialAsync y los entrega a Tk."""
+        async def consumir():
+            async for lote in comunicacion:
+                self._resultados.put((funcion, lote))
+        return self.ejecutar(consumir())
+    
+    def detener(self):
+        """Detiene el despacho y el bucle asyncio."""
+        self.ventana.after_cancel(self._despacho_id)
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._hilo.join(1.0)
+    
+    def _ejecutar_bucle(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+    
+    def _entregar(self, funcion, futuro):
+        """Encola el resultado de una tarea terminada para el hilo de Tk."""
+        try:
+            self._resultados.put((funcion, futuro.result()))
+        except Exception as e:
+            print(f"Error en tarea asíncrona: {e}")
+    
+    def _despachar(self):
+        """Invoca en el hilo de Tk los resultados pendientes."""
+        while True:
+            try:
+                funcion, valor = self._resultados.get_nowait()
+            except queue.Empty:
+                break
+            funcion(valor)
+        self._despacho_id = self.ventana.after(self.intervalo, self._despachar)